@@ -0,0 +1,270 @@
+"""
+Mesin analitik konsentrasi pasar: HHI, CR4/CR8, kurva Pareto/Lorenz dan
+koefisien Gini per dimensi (publisher, platform, genre, game), untuk total
+pasar atau dikelompokkan per region / tahun rilis.
+
+Fakta penjualan dimuat sekali ke array NumPy (kolom biner, lihat
+columnar.py) dan hanya dimuat ulang saat versi data (query `sales_version`)
+berubah. Semua metrik dihitung vektorial
+dari matriks (grup x entitas) yang diurutkan per baris, lalu disimpan per
+(dimensi, pengelompokan) sampai versi berikutnya.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+import columnar
+import queries
+
+SALES = queries.SALES
+
+# dimensi -> (kolom fakta, "tabel.atribut" label di registry dimensi)
+DIMENSIONS = {
+    "publisher": ("publisher", "publishers.publisher_name"),
+    "platform": ("platform", "platforms.platform_name"),
+    "genre": ("genre", "genres.genre_name"),
+    "game": ("game", "games.game_name"),
+}
+GROUPINGS = ("total", "region", "year")
+
+PARETO_SHARE = 0.8
+TOTAL_LABEL = "Global"
+UNKNOWN_YEAR = "N/A"
+
+
+# ============================================================================
+# FAKTA DALAM ARRAY
+# ============================================================================
+class SalesFacts:
+    """Fakta penjualan sebagai array kolom; genre dieksplode lewat indeks fakta"""
+
+    __slots__ = (
+        "region", "year", "game", "platform", "publisher", "sales",
+        "genre_fact", "genre", "genre_pair", "pair_weights",
+    )
+
+    def __init__(self, facts, pairs):
+        """`facts` / `pairs` = kolom hasil queries.fetch_columns (sales_facts / game_genre_pairs)"""
+        self.region = facts["region_id"].astype(np.int64)
+        # release_year NULL sudah dikirim sebagai 0 (ditampilkan sebagai N/A)
+        self.year = facts["release_year"].astype(np.int64)
+        self.game = facts["game_id"].astype(np.int64)
+        self.platform = facts["platform_id"].astype(np.int64)
+        self.publisher = facts["publisher_id"].astype(np.int64)
+        self.sales = facts["sales_in_millions"]
+        self.genre_fact, self.genre, self.genre_pair = self._explode_genres(pairs)
+
+    def _explode_genres(self, pairs):
+        """Indeks fakta + genre_id untuk setiap pasangan (fakta, genre game-nya)
+
+        Sekaligus menyiapkan bobot atribusi per pasangan: `split` = 1/jumlah
+        genre game, `primary` = 1 hanya untuk genre_id terkecil game tsb.
+        """
+        pair_game = pairs["game_id"].astype(np.int64)
+        pair_genre = pairs["genre_id"].astype(np.int64)
+        if not len(self.game) or not len(pair_game):
+            empty = np.empty(0, dtype=np.int64)
+            self.pair_weights = {mode: np.empty(0) for mode in queries.GENRE_ATTRIBUTIONS}
+            return empty, empty, empty
+        # Pasangan sudah urut per (game_id, genre_id), jadi cukup offset awal per game
+        counts = np.bincount(pair_game, minlength=max(self.game.max(), pair_game.max()) + 1)
+        starts = np.cumsum(counts) - counts
+        self.pair_weights = {
+            "full": np.ones(len(pair_game)),
+            "split": 1.0 / counts[pair_game],
+            "primary": (np.arange(len(pair_game)) == starts[pair_game]).astype(np.float64),
+        }
+        per_fact = counts[self.game]
+        fact_index = np.repeat(np.arange(len(self.game)), per_fact)
+        offset = np.arange(per_fact.sum()) - np.repeat(np.cumsum(per_fact) - per_fact, per_fact)
+        pair_index = np.repeat(starts[self.game], per_fact) + offset
+        return fact_index, pair_genre[pair_index], pair_index
+
+    def __len__(self):
+        return len(self.sales)
+
+    def columns(self, dimension, attribution=None):
+        """(entitas, bobot sales, indeks fakta) untuk satu dimensi"""
+        if dimension == "genre":
+            weights = self.pair_weights[queries.genre_attribution(attribution)][self.genre_pair]
+            return self.genre, self.sales[self.genre_fact] * weights, self.genre_fact
+        return getattr(self, DIMENSIONS[dimension][0]), self.sales, slice(None)
+
+
+def load_facts(cursor=None):
+    return SalesFacts(
+        queries.fetch_columns("sales_facts", cursor), queries.fetch_columns("game_genre_pairs", cursor)
+    )
+
+
+# ============================================================================
+# METRIK VEKTORIAL
+# ============================================================================
+def sales_matrix(facts, dimension, by="total", attribution=None):
+    """Matriks total sales (grup x entitas) beserta kode grup yang dipakai"""
+    entity, weights, index = facts.columns(dimension, attribution)
+    if by == "total":
+        group_values = np.zeros(len(entity), dtype=np.int64)
+    else:
+        group_values = getattr(facts, by)[index]
+    groups, group_code = np.unique(group_values, return_inverse=True)
+    n_entities = int(entity.max()) + 1 if len(entity) else 0
+    flat = np.bincount(
+        group_code * n_entities + entity, weights=weights, minlength=len(groups) * n_entities
+    )
+    return groups, flat.reshape(len(groups), n_entities)
+
+
+def concentration_metrics(matrix):
+    """HHI, CR4, CR8, Pareto 80% dan Gini untuk setiap baris matriks"""
+    n = matrix.shape[1]
+    totals = matrix.sum(axis=1)
+    active = (matrix > 0).sum(axis=1)
+    safe_totals = np.where(totals > 0, totals, 1.0)
+    safe_active = np.where(active > 0, active, 1)
+
+    ascending = np.sort(matrix, axis=1)
+    shares = ascending[:, ::-1] / safe_totals[:, None]
+    cumulative = np.cumsum(shares, axis=1)
+
+    hhi = (shares ** 2).sum(axis=1) * 10000
+    cr4 = cumulative[:, min(4, n) - 1] if n else np.zeros(len(matrix))
+    cr8 = cumulative[:, min(8, n) - 1] if n else np.zeros(len(matrix))
+    pareto = (cumulative < PARETO_SHARE - 1e-9).sum(axis=1) + 1
+
+    # Gini atas entitas aktif: nol ada di depan baris terurut, jadi rank aktif = posisi - (n - active)
+    positions = np.arange(1, n + 1)
+    weighted = (ascending * positions).sum(axis=1) - (n - active) * totals
+    gini = np.clip(2 * weighted / (safe_active * safe_totals) - (active + 1) / safe_active, 0.0, 1.0)
+
+    empty = totals <= 0
+    return {
+        "Entities": active,
+        SALES: totals,
+        "HHI": np.where(empty, np.nan, hhi),
+        "CR4": np.where(empty, np.nan, cr4),
+        "CR8": np.where(empty, np.nan, cr8),
+        "Pareto 80% (Entities)": np.where(empty, 0, np.minimum(pareto, active)),
+        "Pareto 80% (Share)": np.where(empty, np.nan, np.minimum(pareto, active) / safe_active),
+        "Gini": np.where(empty, np.nan, gini),
+    }
+
+
+def hhi_level(hhi):
+    """Kategori konsentrasi berdasarkan ambang HHI yang umum dipakai regulator"""
+    if hhi < 1500:
+        return "Tidak terkonsentrasi"
+    if hhi < 2500:
+        return "Konsentrasi sedang"
+    return "Sangat terkonsentrasi"
+
+
+# ============================================================================
+# ENGINE (DIMUAT ULANG HANYA SAAT VERSI DATA BERUBAH)
+# ============================================================================
+class ConcentrationEngine:
+    """Fakta + hasil metrik per proses, di-invalidate oleh versi data"""
+
+    def __init__(self):
+        self.version = None
+        self.facts = None
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def sync(self, cursor=None):
+        """Cek versi data; muat ulang fakta jika berubah. Return versi aktif"""
+        version = queries.fetch_rows("sales_version", cursor)[0][0]
+        if version != self.version:
+            facts = load_facts(cursor)
+            with self._lock:
+                self.facts, self.version, self._results = facts, version, {}
+        return self.version
+
+    def _ensure_synced(self):
+        if self.facts is None:
+            self.sync()
+
+    def _computed(self, dimension, by, attribution=None):
+        """(label grup, kode grup, matriks terurut desc, indeks entitas desc, metrik)"""
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"dimensi harus salah satu dari {list(DIMENSIONS)}, bukan {dimension!r}")
+        if by not in GROUPINGS:
+            raise ValueError(f"pengelompokan harus salah satu dari {list(GROUPINGS)}, bukan {by!r}")
+        # Atribusi hanya relevan untuk genre; dimensi lain berbagi satu entri cache
+        attribution = queries.genre_attribution(attribution) if dimension == "genre" else None
+        self._ensure_synced()
+        key = (dimension, by, attribution)
+        with self._lock:
+            result = self._results.get(key)
+            if result is None:
+                groups, matrix = sales_matrix(self.facts, dimension, by, attribution)
+                order = np.argsort(-matrix, axis=1, kind="stable")
+                result = (
+                    self._group_labels(groups, by),
+                    groups,
+                    np.take_along_axis(matrix, order, axis=1),
+                    order,
+                    concentration_metrics(matrix),
+                )
+                self._results[key] = result
+        return result
+
+    def _group_labels(self, groups, by):
+        if by == "total":
+            return [TOTAL_LABEL]
+        if by == "region":
+            return queries.resolve_labels(lambda ids, dims: [dims.regions.record(g).region_name for g in ids], groups)
+        return [str(g) if g else UNKNOWN_YEAR for g in groups]
+
+    def summary(self, dimension, by="total", attribution=None):
+        """Satu baris metrik konsentrasi per grup"""
+        labels, _, _, _, metrics = self._computed(dimension, by, attribution)
+        df = pd.DataFrame(metrics)
+        df.insert(0, "Group", labels)
+        return df
+
+    def _group_row(self, dimension, by, group, attribution):
+        labels, _, ordered, order, metrics = self._computed(dimension, by, attribution)
+        row = labels.index(group) if group is not None else 0
+        return ordered[row], order[row], int(metrics["Entities"][row])
+
+    def pareto(self, dimension, by="total", group=None, attribution=None):
+        """Entitas terurut desc dengan share kumulatif (kurva Pareto)"""
+        values, entity_ids, active = self._group_row(dimension, by, group, attribution)
+        values, entity_ids = values[:active], entity_ids[:active]
+        total = values.sum() or 1.0
+        table, attr = DIMENSIONS[dimension][1].split(".")
+        entities = queries.resolve_labels(
+            lambda ids, dims: columnar.labels(ids, getattr(dims, table), attr), entity_ids
+        )
+        return pd.DataFrame({
+            "Rank": np.arange(1, active + 1),
+            "Entity": entities.to_pandas(),
+            SALES: values,
+            "Share": values / total,
+            "Cumulative Share": np.cumsum(values) / total,
+        })
+
+    def lorenz(self, dimension, by="total", group=None, attribution=None):
+        """Titik kurva Lorenz (share entitas vs share sales, urut naik)"""
+        values, _, active = self._group_row(dimension, by, group, attribution)
+        ascending = values[:active][::-1]
+        total = ascending.sum() or 1.0
+        return pd.DataFrame({
+            "Entity Share": np.arange(active + 1) / max(active, 1),
+            "Sales Share": np.concatenate(([0.0], np.cumsum(ascending) / total)),
+        })
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def engine():
+    """Engine konsentrasi per proses (fakta dimuat saat pertama dipakai)"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ConcentrationEngine()
+    return _engine
@@ -0,0 +1,378 @@
+"""
+Bootstrap database cepat: pengganti replay dbrev.sql + data1.sql untuk
+database tes/benchmark.
+
+Urutan fase:
+    1. database   buat (atau clone dari template) database target
+    2. schema     jalankan dbrev.sql, simpan definisi PK/UNIQUE/FK/index lalu drop
+    3. load       COPY data1.sql (diparse sekali) ke tabel tanpa index, opsional
+                  digandakan --scale kali dengan offset ID
+    4. keys       bangun ulang PRIMARY KEY / UNIQUE
+    5. indexes    bangun ulang index biasa
+    6. foreign_keys  tambahkan FK (divalidasi sekali per constraint)
+    7. sequences  setval sequence SERIAL ke MAX(id)
+    8. analyze    VACUUM ANALYZE (statistik planner + visibility map)
+
+    python bootstrap.py --database vgsales_ci                    # data1.sql apa adanya
+    python bootstrap.py --database vgsales_x1000 --scale 1000    # ~1 juta baris sales
+    python bootstrap.py --database vgsales_x1000 --scale 1000 --mark-template
+    python bootstrap.py --database ci_run_42 --clone vgsales_x1000  # CREATE DATABASE ... TEMPLATE
+
+Koneksi memakai config.DB_PARAMS (host, user, password); hanya nama database
+yang diganti. Jalankan pada PostgreSQL lokal/CI, bukan database produksi.
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import random
+import re
+import time
+
+import psycopg2
+from psycopg2 import sql
+
+import config
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_FILE = os.path.join(BASE_DIR, "dbrev.sql")
+DATA_FILE = os.path.join(BASE_DIR, "data1.sql")
+
+# Urutan load (parent dulu) dan kolom ID SERIAL yang nilainya diisi eksplisit
+TABLES = ["regions", "genres", "platforms", "publishers", "games", "game_genres", "game_releases", "regional_sales"]
+SERIAL_IDS = {
+    "regions": "region_id",
+    "genres": "genre_id",
+    "platforms": "platform_id",
+    "publishers": "publisher_id",
+    "games": "game_id",
+    "game_releases": "game_release_id",
+    "regional_sales": "sale_id",
+}
+COPY_CHUNK_ROWS = 5000
+
+_TOKEN = re.compile(r"--[^\n]*|'(?:[^']|'')*'|[A-Za-z_][A-Za-z_0-9]*|-?\d+(?:\.\d+)?|[(),;]|\s+")
+
+CONSTRAINTS_SQL = '''
+    SELECT c.conrelid::regclass::text, c.conname, c.contype, pg_get_constraintdef(c.oid)
+    FROM pg_constraint c
+    WHERE c.connamespace = 'public'::regnamespace
+      AND c.contype IN ('p', 'u', 'f')
+      AND c.conrelid::regclass::text = ANY(%s)
+    ORDER BY c.contype DESC, c.conrelid::regclass::text, c.conname
+'''
+
+# Index yang tidak dimiliki constraint PK/UNIQUE (FK menunjuk index tabel induk, jadi dikecualikan)
+INDEXES_SQL = '''
+    SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid)
+    FROM pg_index i
+    WHERE i.indrelid::regclass::text = ANY(%s)
+      AND NOT EXISTS (
+          SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid AND c.contype IN ('p', 'u', 'x')
+      )
+    ORDER BY 1
+'''
+
+
+# ============================================================================
+# PARSE DATA SEED
+# ============================================================================
+def _literal(token):
+    if token.upper() == "NULL":
+        return None
+    if token.startswith("'"):
+        return token[1:-1].replace("''", "'")
+    return float(token) if "." in token else int(token)
+
+
+def parse_seed(path=DATA_FILE):
+    """{tabel: (kolom, [baris])} dari blok `INSERT INTO t (kolom) VALUES (...), ...;`
+
+    ID SERIAL ditambahkan sebagai kolom pertama (1..n sesuai urutan insert),
+    sama dengan nilai yang dihasilkan replay INSERT ke tabel kosong.
+    """
+    with open(path, encoding="utf-8") as f:
+        tokens = [t for t in _TOKEN.findall(f.read()) if t.strip() and not t.startswith("--")]
+    tables = {}
+    pos = 0
+    while pos < len(tokens):
+        if tokens[pos].upper() != "INSERT":
+            pos += 1
+            continue
+        table = tokens[pos + 2].lower()
+        pos += 4  # INSERT INTO <tabel> (
+        columns = []
+        while tokens[pos] != ")":
+            if tokens[pos] != ",":
+                columns.append(tokens[pos].lower())
+            pos += 1
+        pos += 2  # ) VALUES
+        rows = []
+        while tokens[pos] != ";":
+            if tokens[pos] == "(":
+                end = tokens.index(")", pos)
+                rows.append(tuple(_literal(t) for t in tokens[pos + 1:end] if t != ","))
+                pos = end
+            pos += 1
+        _, existing = tables.setdefault(table, (columns, []))
+        existing.extend(rows)
+    for table, id_column in SERIAL_IDS.items():
+        if table in tables:
+            columns, rows = tables[table]
+            tables[table] = ([id_column] + columns, [(i,) + row for i, row in enumerate(rows, 1)])
+    missing = [t for t in TABLES if t not in tables]
+    if missing:
+        raise ValueError(f"{path} tidak berisi data untuk tabel: {', '.join(missing)}")
+    return tables
+
+
+def scaled_rows(seed, table, scale, rng):
+    """Baris tabel untuk salinan k = 0..scale-1 (tabel dimensi tidak digandakan)"""
+    columns, rows = seed[table]
+    if scale == 1 or table not in ("games", "game_genres", "game_releases", "regional_sales"):
+        yield from rows
+        return
+    n_games = max(r[0] for r in seed["games"][1])
+    n_releases = max(r[0] for r in seed["game_releases"][1])
+    n_sales = max(r[0] for r in seed["regional_sales"][1])
+    for k in range(scale):
+        if table == "games":
+            for game_id, name, publisher_id in rows:
+                yield game_id + k * n_games, name if k == 0 else f"{name} #{k}", publisher_id
+        elif table == "game_genres":
+            for game_id, genre_id in rows:
+                yield game_id + k * n_games, genre_id
+        elif table == "game_releases":
+            for release_id, game_id, platform_id, year in rows:
+                yield release_id + k * n_releases, game_id + k * n_games, platform_id, year
+        else:
+            for sale_id, release_id, region_id, sales in rows:
+                if k:
+                    sales = round(sales * (0.5 + rng.random()), 2)
+                yield sale_id + k * n_sales, release_id + k * n_releases, region_id, sales
+
+
+# ============================================================================
+# COPY
+# ============================================================================
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    if not isinstance(value, str):
+        return str(value)
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class CopyStream:
+    """File-like untuk cursor.copy_expert: teks COPY dibangkitkan per potongan baris"""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = b""
+        self.count = 0
+
+    def _fill(self):
+        chunk = list(itertools.islice(self._rows, COPY_CHUNK_ROWS))
+        self.count += len(chunk)
+        return "".join("\t".join(map(_copy_value, row)) + "\n" for row in chunk).encode("utf-8")
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            data = self._fill()
+            if not data:
+                break
+            self._buffer += data
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    readline = read
+
+
+def copy_table(cur, table, columns, rows):
+    stream = CopyStream(rows)
+    statement = sql.SQL("COPY {} ({}) FROM STDIN").format(
+        sql.Identifier(table), sql.SQL(", ").join(map(sql.Identifier, columns))
+    )
+    cur.copy_expert(statement.as_string(cur), stream, size=1 << 16)
+    return stream.count
+
+
+# ============================================================================
+# FASE
+# ============================================================================
+class Timer:
+    """Durasi per fase (urutan sesuai eksekusi)"""
+
+    def __init__(self):
+        self.phases = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        print(f"▶️ {name}...")
+        started = time.perf_counter()
+        yield
+        self.phases[name] = time.perf_counter() - started
+        print(f"   ✅ {name}: {self.phases[name]:.3f}s")
+
+
+def connect(dbname):
+    return psycopg2.connect(**dict(config.DB_PARAMS, dbname=dbname))
+
+
+def create_database(args):
+    """Buat database target (kosong atau clone template)"""
+    conn = connect(args.maintenance_db)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            target = sql.Identifier(args.database)
+            if args.drop_existing:
+                # Database template harus dilepas statusnya sebelum bisa di-drop
+                cur.execute("SELECT datistemplate FROM pg_database WHERE datname = %s", (args.database,))
+                row = cur.fetchone()
+                if row and row[0]:
+                    cur.execute(sql.SQL("ALTER DATABASE {} WITH IS_TEMPLATE false").format(target))
+                cur.execute(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(target))
+            if args.clone:
+                cur.execute(sql.SQL("CREATE DATABASE {} TEMPLATE {}").format(target, sql.Identifier(args.clone)))
+            else:
+                cur.execute(sql.SQL("CREATE DATABASE {}").format(target))
+    finally:
+        conn.close()
+
+
+def mark_template(args):
+    conn = connect(args.maintenance_db)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("ALTER DATABASE {} WITH IS_TEMPLATE true").format(sql.Identifier(args.database)))
+    finally:
+        conn.close()
+
+
+def bootstrap(args):
+    """Jalankan semua fase; return (durasi per fase, jumlah baris per tabel)"""
+    timer = Timer()
+    counts = {}
+    if not args.existing:
+        with timer.phase("database"):
+            create_database(args)
+    if args.clone:
+        return timer.phases, counts
+
+    seed = parse_seed(args.data_file)
+    conn = connect(args.database)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET maintenance_work_mem = %s", (args.maintenance_work_mem,))
+            cur.execute("SET synchronous_commit = off")
+
+            with timer.phase("schema"):
+                with open(args.schema_file, encoding="utf-8") as f:
+                    cur.execute(f.read())
+                cur.execute(CONSTRAINTS_SQL, (TABLES,))
+                constraints = cur.fetchall()
+                cur.execute(INDEXES_SQL, (TABLES,))
+                indexes = cur.fetchall()
+                # FK di-drop dulu (bergantung pada PK/UNIQUE tabel induk)
+                for table, name, kind, _ in sorted(constraints, key=lambda c: c[2] != "f"):
+                    cur.execute(sql.SQL("ALTER TABLE {} DROP CONSTRAINT {}").format(
+                        sql.Identifier(table), sql.Identifier(name)))
+                for name, _ in indexes:
+                    cur.execute(sql.SQL("DROP INDEX {}").format(sql.Identifier(name)))
+                conn.commit()
+
+            with timer.phase("load"):
+                rng = random.Random(args.seed)
+                for table in TABLES:
+                    columns, _ = seed[table]
+                    counts[table] = copy_table(cur, table, columns, scaled_rows(seed, table, args.scale, rng))
+                conn.commit()
+
+            with timer.phase("keys"):
+                for table, name, kind, definition in constraints:
+                    if kind in ("p", "u"):
+                        cur.execute(sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} ").format(
+                            sql.Identifier(table), sql.Identifier(name)) + sql.SQL(definition))
+                conn.commit()
+
+            with timer.phase("indexes"):
+                for _, definition in indexes:
+                    cur.execute(definition)
+                conn.commit()
+
+            with timer.phase("foreign_keys"):
+                for table, name, kind, definition in constraints:
+                    if kind == "f":
+                        cur.execute(sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} ").format(
+                            sql.Identifier(table), sql.Identifier(name)) + sql.SQL(definition))
+                conn.commit()
+
+            with timer.phase("sequences"):
+                for table, column in SERIAL_IDS.items():
+                    cur.execute(
+                        sql.SQL("SELECT setval(pg_get_serial_sequence(%s, %s), COALESCE(MAX({}), 1), MAX({}) IS NOT NULL) FROM {}")
+                        .format(sql.Identifier(column), sql.Identifier(column), sql.Identifier(table)),
+                        (table, column),
+                    )
+                conn.commit()
+
+        with timer.phase("analyze"):
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                for table in TABLES:
+                    cur.execute(sql.SQL("VACUUM ANALYZE {}").format(sql.Identifier(table)))
+    finally:
+        conn.close()
+
+    if args.mark_template:
+        with timer.phase("template"):
+            mark_template(args)
+    return timer.phases, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bootstrap database dashboard dengan COPY + index setelah load")
+    parser.add_argument("--database", required=True, help="nama database target")
+    parser.add_argument("--maintenance-db", default="postgres", help="database untuk CREATE/DROP DATABASE")
+    parser.add_argument("--existing", action="store_true", help="pakai database yang sudah ada (lewati CREATE)")
+    parser.add_argument("--drop-existing", action="store_true", help="DROP database target dulu jika ada")
+    parser.add_argument("--clone", metavar="TEMPLATE", help="buat database dari template yang sudah di-bootstrap")
+    parser.add_argument("--mark-template", action="store_true", help="tandai database hasil sebagai template")
+    parser.add_argument("--scale", type=int, default=1, help="gandakan games/releases/sales sebanyak N kali")
+    parser.add_argument("--seed", type=int, default=42, help="seed variasi sales pada salinan hasil --scale")
+    parser.add_argument("--schema-file", default=SCHEMA_FILE)
+    parser.add_argument("--data-file", default=DATA_FILE)
+    parser.add_argument("--maintenance-work-mem", default="256MB", help="memori untuk build index")
+    parser.add_argument("--json", help="simpan durasi fase + jumlah baris ke file JSON")
+    args = parser.parse_args()
+    if args.clone and args.existing:
+        parser.error("--clone tidak bisa digabung dengan --existing")
+
+    started = time.perf_counter()
+    phases, counts = bootstrap(args)
+    total = time.perf_counter() - started
+
+    print(f"\n🗄️ Database {args.database}" + (f" (clone dari {args.clone})" if args.clone else f", skala x{args.scale}"))
+    for table, count in counts.items():
+        print(f"  {table:<18}{count:>12,} baris")
+    print(f"{'Fase':<18}{'detik':>12}")
+    for name, seconds in phases.items():
+        print(f"  {name:<16}{seconds:>12.3f}")
+    print(f"  {'total':<16}{total:>12.3f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "database": args.database, "scale": args.scale, "clone": args.clone,
+                "phases_s": {k: round(v, 4) for k, v in phases.items()}, "total_s": round(total, 4),
+                "rows": counts,
+            }, f, indent=2)
+        print(f"💾 Laporan disimpan ke {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Jalur data kolumnar dari PostgreSQL ke Plotly tanpa tuple Python per baris.
+
+Query dengan deklarasi `wire` (lihat queries.py) diambil dalam format biner
+PostgreSQL berlebar tetap lalu dibaca langsung oleh np.frombuffer:
+
+    COPY (SELECT COALESCE(q.platform_id, 0)::int4, ... FROM (<query>) q) TO STDOUT (FORMAT binary)
+
+psycopg2 menolak COPY selama wait callback pembatalan query
+(queries.enable_cancellation, dipasang dashboard) aktif. Di sana server
+mengemas setiap kolom menjadi satu bytea dengan fungsi send tipe yang sama
+dengan encoding COPY (int4send, float8send, ...), satu baris hasil biasa:
+
+    SELECT string_agg(int4send(COALESCE(q.platform_id, 0)::int4), ''::bytea) AS platform_id, ...
+    FROM (<query>) q
+
+Hasilnya array NumPy per kolom yang dibungkus tabel Arrow. Label dimensi
+ditambahkan sebagai DictionaryArray (indeks per baris + kamus label unik)
+sehingga menjadi kolom category di pandas, sementara array numerik tetap
+ter-encode biner (base64) saat figure Plotly diserialisasi.
+"""
+import numpy as np
+import pyarrow as pa
+
+# tipe wire -> dtype NumPy big-endian (urutan byte format send PostgreSQL)
+WIRE_TYPES = {
+    "int2": ">i2",
+    "int4": ">i4",
+    "int8": ">i8",
+    "float4": ">f4",
+    "float8": ">f8",
+}
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+
+
+def _wire_values(wire):
+    """Ekspresi nilai per kolom; NULL dikirim sebagai 0 agar setiap nilai punya lebar tetap"""
+    for column, wire_type in wire:
+        if wire_type not in WIRE_TYPES:
+            raise ValueError(f"tipe wire {column} harus salah satu dari {list(WIRE_TYPES)}, bukan {wire_type!r}")
+    return [(column, f"COALESCE(q.{column}, 0)::{wire_type}", wire_type) for column, wire_type in wire]
+
+
+def copy_select(sql, wire):
+    """SELECT yang dijalankan di dalam COPY copy_sql (untuk EXPLAIN, lihat plan_guard.py)"""
+    values = ", ".join(f"{value} AS {column}" for column, value, _ in _wire_values(wire))
+    return f"SELECT {values} FROM ({sql}) q"
+
+
+def copy_sql(sql, wire):
+    """COPY BINARY atas kolom `wire` dari hasil `sql` (parameter sudah di-mogrify)"""
+    return f"COPY ({copy_select(sql, wire)}) TO STDOUT (FORMAT binary)"
+
+
+def packed_sql(sql, wire):
+    """SQL satu baris: satu bytea per kolom `wire`, urutan nilai mengikuti urutan baris `sql`"""
+    aggregates = ",\n".join(
+        f"            string_agg({wire_type}send({value}), ''::bytea) AS {column}"
+        for column, value, wire_type in _wire_values(wire)
+    )
+    return f"\n        SELECT\n{aggregates}\n        FROM ({sql}) q\n    "
+
+
+def decode_copy(buffer, wire):
+    """{kolom: array NumPy native} dari output COPY BINARY copy_sql
+
+    Setiap record: jumlah field (int16) lalu per field panjang (int32) + nilai,
+    jadi seluruh body dibaca sebagai satu array structured dtype.
+    """
+    data = memoryview(buffer)
+    if bytes(data[:len(COPY_SIGNATURE)]) != COPY_SIGNATURE:
+        raise ValueError("buffer bukan output COPY (FORMAT binary)")
+    # signature + flags (int32) + panjang header extension (int32) + extension
+    flags_end = len(COPY_SIGNATURE) + 4
+    start = flags_end + 4 + int.from_bytes(data[flags_end:flags_end + 4], "big")
+    fields = [("count", ">i2")]
+    for column, wire_type in wire:
+        fields += [(f"{column}__length", ">i4"), (column, WIRE_TYPES[wire_type])]
+    record = np.dtype(fields)
+    body = len(data) - start - 2  # trailer int16 -1
+    if body < 0 or body % record.itemsize:
+        raise ValueError(f"panjang output COPY tidak cocok dengan layout wire {wire}")
+    rows = np.frombuffer(data, dtype=record, count=body // record.itemsize, offset=start)
+    if (rows["count"] != len(wire)).any():
+        raise ValueError("jumlah field per record COPY tidak cocok dengan layout wire")
+    columns = {}
+    for column, wire_type in wire:
+        if (rows[f"{column}__length"] != record[column].itemsize).any():
+            raise ValueError(f"kolom {column} berisi NULL atau lebar nilai tidak tetap")
+        values = rows[column]
+        columns[column] = values.astype(values.dtype.newbyteorder("="))
+    return columns
+
+
+def decode_packed(row, wire):
+    """{kolom: array NumPy native} dari satu baris hasil packed_sql"""
+    columns = {}
+    length = None
+    for (column, wire_type), packed in zip(wire, row):
+        # string_agg atas nol baris menghasilkan NULL
+        values = np.frombuffer(packed if packed is not None else b"", dtype=WIRE_TYPES[wire_type])
+        if length is not None and len(values) != length:
+            raise ValueError(f"kolom {column} berisi {len(values)} nilai, kolom lain {length}")
+        length = len(values)
+        columns[column] = values.astype(values.dtype.newbyteorder("="))
+    return columns
+
+
+# ============================================================================
+# LABEL DIMENSI
+# ============================================================================
+def lookup(ids, table, attr):
+    """Atribut numerik record dimensi per ID (mis. games.publisher_id)"""
+    return np.asarray(table.values(attr, ids), dtype=np.int64)
+
+
+def labels(ids, table, attr):
+    """Label dimensi per ID sebagai DictionaryArray Arrow
+
+    Kamus berisi label unik urut abjad, jadi urutan category pandas hasilnya
+    sama dengan pengurutan string biasa (spec `sort` tetap berlaku).
+    """
+    unique_ids, codes = np.unique(ids, return_inverse=True)
+    names = table.values(attr, unique_ids).astype(str)
+    dictionary, name_codes = np.unique(names, return_inverse=True)
+    return pa.DictionaryArray.from_arrays(
+        pa.array(name_codes[codes].astype(np.int32)), pa.array(dictionary, type=pa.string())
+    )
+
+
+def to_table(names, arrays):
+    """Tabel Arrow dari array NumPy / Arrow (array numerik tanpa salinan)"""
+    return pa.table(dict(zip(names, arrays)))
@@ -1,28 +1,111 @@
 import psycopg2
 from psycopg2 import extras
 import os
+import threading
 from dotenv import load_dotenv
+from dimensions import DimensionRegistry
+from pool import ConnectionPool
+from replicas import ReplicaRouter, parse_replicas
+import queries
 
 # Load environment variables
 load_dotenv()
 
-# Koneksi ke database Supabase PostgreSQL
-try:
-    conn = psycopg2.connect(
-        host=os.getenv("SUPABASE_HOST", "aws-1-ap-south-1.pooler.supabase.com"),
-        port=os.getenv("SUPABASE_PORT", "5432"),
-        user=os.getenv("SUPABASE_USER", "postgres.sdzgspgymazncfktpcrp"),
-        password=os.getenv("SUPABASE_PASSWORD", "postgres"),
-        dbname=os.getenv("SUPABASE_DB", "postgres"),
-        sslmode="require"  # Supabase memerlukan SSL
-    )
-    print("✅ Koneksi Supabase PostgreSQL berhasil!")
-except psycopg2.Error as e:
-    print(f"❌ Gagal terhubung ke Supabase: {e}")
-    raise
-
-# Membuat cursor
-c = conn.cursor()
+# Mode transfer ringkas: query fakta hanya mengirim ID integer, nama
+# di-resolve di sisi klien dari registry dimensi (lihat dimensions.py).
+# Semua SQL baca dideklarasikan di queries.py.
+COMPACT_TRANSFER = os.getenv("COMPACT_TRANSFER", "0") == "1"
+DIMENSION_REFRESH_INTERVAL = int(os.getenv("DIMENSION_REFRESH_INTERVAL", "300"))
+
+# Parameter koneksi (dipakai juga oleh tool seperti loadtest.py)
+DB_PARAMS = {
+    "host": os.getenv("SUPABASE_HOST", "aws-1-ap-south-1.pooler.supabase.com"),
+    "port": os.getenv("SUPABASE_PORT", "5432"),
+    "user": os.getenv("SUPABASE_USER", "postgres.sdzgspgymazncfktpcrp"),
+    "password": os.getenv("SUPABASE_PASSWORD", "postgres"),
+    "dbname": os.getenv("SUPABASE_DB", "postgres"),
+    "sslmode": os.getenv("SUPABASE_SSLMODE", "require"),  # Supabase memerlukan SSL
+}
+
+# Batas waktu koneksi (detik) agar halaman tidak menggantung saat DB tidak terjangkau
+DB_PARAMS["connect_timeout"] = int(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5"))
+
+# Read replica (opsional): query baca dirutekan ke sini, tulis tetap ke primary
+READ_REPLICAS = parse_replicas(os.getenv("SUPABASE_READ_REPLICAS", ""), DB_PARAMS)
+READ_ROUTING = os.getenv("READ_ROUTING", "round_robin")
+REPLICA_MAX_LAG = float(os.getenv("REPLICA_MAX_LAG", "30"))
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "10"))
+
+# Query baca (queries.execute) dan tulis (upsert_regional_sales) meminjam koneksi
+# dari pool per server; koneksi modul di bawah hanya untuk kompatibilitas
+# `config.conn`/`config.c`
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+
+# Koneksi dibuat saat pertama kali dipakai (lazy), bukan saat `import config`
+_conn = None
+_cursor = None
+_router = None
+_pool = None
+_lazy_lock = threading.Lock()
+
+def get_connection():
+    """Koneksi ke database Supabase PostgreSQL (dibuat saat pertama kali dipakai)"""
+    global _conn, _cursor
+    if _conn is None or _conn.closed:
+        try:
+            _conn = psycopg2.connect(**DB_PARAMS)
+            _cursor = None
+            print("✅ Koneksi Supabase PostgreSQL berhasil!")
+        except psycopg2.Error as e:
+            print(f"❌ Gagal terhubung ke Supabase: {e}")
+            raise
+    return _conn
+
+def get_cursor():
+    """Cursor bersama milik modul (dibuat saat pertama kali dipakai)"""
+    global _cursor
+    conn = get_connection()
+    if _cursor is None or _cursor.closed:
+        _cursor = conn.cursor()
+    return _cursor
+
+def get_pool():
+    """Pool koneksi baca ke primary (dibuat saat pertama kali dipakai)"""
+    global _pool
+    if _pool is None:
+        with _lazy_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PARAMS, DB_POOL_SIZE)
+    return _pool
+
+def get_router():
+    """Router read replica per proses (None jika tidak ada replica dikonfigurasi)"""
+    global _router
+    if _router is None and READ_REPLICAS:
+        with _lazy_lock:
+            if _router is None:
+                _router = ReplicaRouter(
+                    READ_REPLICAS, READ_ROUTING, REPLICA_MAX_LAG, REPLICA_CHECK_INTERVAL, DB_POOL_SIZE
+                )
+    return _router
+
+def read_replicas():
+    """Replica yang boleh melayani query baca berikutnya, urut sesuai policy routing"""
+    router = get_router()
+    return router.candidates() if router else []
+
+def replica_status():
+    """Status routing: policy, fallback ke primary, dan kondisi tiap replica"""
+    router = get_router()
+    return router.status() if router else None
+
+def __getattr__(name):
+    # Kompatibilitas: `from config import conn, c` tetap bekerja, koneksi dibuat saat itu
+    if name == "conn":
+        return get_connection()
+    if name == "c":
+        return get_cursor()
+    raise AttributeError(f"module 'config' has no attribute {name!r}")
 
 # ============================
 # Fungsi ambil data dari tabel
@@ -30,174 +113,196 @@ c = conn.cursor()
 
 def view_games():
     """Menampilkan semua games dengan informasi publisher"""
-    query = '''
-        SELECT 
-            g.game_id, 
-            g.game_name, 
-            p.publisher_name
-        FROM games g
-        JOIN publishers p ON g.publisher_id = p.publisher_id
-        ORDER BY g.game_name ASC
-    '''
-    c.execute(query)
-    return c.fetchall()
+    return queries.fetch_rows("games")
 
 def view_games_with_genres():
     """Menampilkan games dengan genre-genrenya"""
-    query = '''
-        SELECT 
-            g.game_id,
-            g.game_name,
-            STRING_AGG(ge.genre_name, ', ') AS genres,
-            p.publisher_name
-        FROM games g
-        JOIN publishers p ON g.publisher_id = p.publisher_id
-        LEFT JOIN game_genres gg ON g.game_id = gg.game_id
-        LEFT JOIN genres ge ON gg.genre_id = ge.genre_id
-        GROUP BY g.game_id, g.game_name, p.publisher_name
-        ORDER BY g.game_name ASC
-    '''
-    c.execute(query)
-    return c.fetchall()
-
-def view_game_releases():
+    return queries.fetch_rows("games_with_genres")
+
+_registry = None
+
+def view_dimensions(refresh=False):
+    """Registry dimensi per proses (dimuat sekali, dicek versinya di background)"""
+    global _registry
+    if _registry is None:
+        # Query registry meminjam koneksi pool: koneksi yang diputus server
+        # diganti saat dipinjam lagi, dan load yang gagal tidak meninggalkan koneksi
+        pool = get_pool()
+        with _lazy_lock:
+            if _registry is None:
+                _registry = DimensionRegistry(pool).load()
+                _registry.start_background_refresh(DIMENSION_REFRESH_INTERVAL)
+    elif refresh:
+        _registry.refresh_if_changed()
+    return _registry
+
+def view_game_releases(compact=None):
     """Menampilkan rilis game per platform"""
-    query = '''
-        SELECT 
-            gr.game_release_id,
-            g.game_name,
-            pl.platform_name,
-            pl.platform_code,
-            gr.release_year,
-            p.publisher_name
-        FROM game_releases gr
-        JOIN games g ON gr.game_id = g.game_id
-        JOIN platforms pl ON gr.platform_id = pl.platform_id
-        JOIN publishers p ON g.publisher_id = p.publisher_id
-        ORDER BY gr.release_year DESC, g.game_name ASC
-    '''
-    c.execute(query)
-    return c.fetchall()
-
-def view_regional_sales():
+    if COMPACT_TRANSFER if compact is None else compact:
+        return queries.fetch_rows("game_releases_compact")
+    return queries.fetch_rows("game_releases")
+
+def view_regional_sales(compact=None):
     """Menampilkan data penjualan regional"""
-    query = '''
-        SELECT 
-            rs.sale_id,
-            g.game_name,
-            pl.platform_code,
-            r.region_name,
-            rs.sales_in_millions,
-            gr.release_year
-        FROM regional_sales rs
-        JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
-        JOIN games g ON gr.game_id = g.game_id
-        JOIN platforms pl ON gr.platform_id = pl.platform_id
-        JOIN regions r ON rs.region_id = r.region_id
-        ORDER BY rs.sales_in_millions DESC
-    '''
-    c.execute(query)
-    return c.fetchall()
+    if COMPACT_TRANSFER if compact is None else compact:
+        return queries.fetch_rows("regional_sales_detail_compact")
+    return queries.fetch_rows("regional_sales_detail")
 
 def view_top_selling_games(limit=10):
     """Menampilkan top N games berdasarkan total penjualan"""
-    query = '''
-        SELECT 
-            g.game_name,
-            p.publisher_name,
-            SUM(rs.sales_in_millions) AS total_sales
-        FROM regional_sales rs
-        JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
-        JOIN games g ON gr.game_id = g.game_id
-        JOIN publishers p ON g.publisher_id = p.publisher_id
-        GROUP BY g.game_id, g.game_name, p.publisher_name
-        ORDER BY total_sales DESC
-        LIMIT %s
-    '''
-    c.execute(query, (limit,))
-    return c.fetchall()
+    return queries.fetch_rows("top_games", limit=limit)
 
 def view_sales_by_region():
     """Menampilkan total penjualan per region"""
-    query = '''
-        SELECT 
-            r.region_name,
-            SUM(rs.sales_in_millions) AS total_sales
-        FROM regional_sales rs
-        JOIN regions r ON rs.region_id = r.region_id
-        GROUP BY r.region_id, r.region_name
-        ORDER BY total_sales DESC
-    '''
-    c.execute(query)
-    return c.fetchall()
+    return queries.fetch_rows("regional_sales")
 
 def view_sales_by_platform():
     """Menampilkan total penjualan per platform"""
-    query = '''
-        SELECT 
-            pl.platform_name,
-            pl.platform_code,
-            COUNT(DISTINCT gr.game_id) AS game_count,
-            SUM(rs.sales_in_millions) AS total_sales
-        FROM regional_sales rs
-        JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
-        JOIN platforms pl ON gr.platform_id = pl.platform_id
-        GROUP BY pl.platform_id, pl.platform_name, pl.platform_code
-        ORDER BY total_sales DESC
-    '''
-    c.execute(query)
-    return c.fetchall()
-
-def view_sales_by_genre():
-    """Menampilkan total penjualan per genre"""
-    query = '''
-        SELECT 
-            ge.genre_name,
-            COUNT(DISTINCT g.game_id) AS game_count,
-            SUM(rs.sales_in_millions) AS total_sales
-        FROM regional_sales rs
-        JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
-        JOIN games g ON gr.game_id = g.game_id
-        JOIN game_genres gg ON g.game_id = gg.game_id
-        JOIN genres ge ON gg.genre_id = ge.genre_id
-        GROUP BY ge.genre_id, ge.genre_name
-        ORDER BY total_sales DESC
-    '''
-    c.execute(query)
-    return c.fetchall()
+    return queries.fetch_rows("platform_sales")
+
+def view_sales_by_genre(attribution=None):
+    """Menampilkan total penjualan per genre (atribusi: full / split / primary)"""
+    return queries.fetch_rows("genre_sales", attribution=queries.genre_attribution(attribution))
 
 def view_publishers():
-    """Menampilkan semua publishers"""
-    query = '''
-        SELECT publisher_id, publisher_name, country, founded_year
-        FROM publishers
-        ORDER BY publisher_name ASC
-    '''
-    c.execute(query)
-    return c.fetchall()
+    """Menampilkan semua publishers (dari registry dimensi)"""
+    return [
+        (p.publisher_id, p.publisher_name, p.country, p.founded_year)
+        for p in view_dimensions().publishers.records
+    ]
 
 def view_platforms():
-    """Menampilkan semua platforms"""
-    query = '''
-        SELECT platform_id, platform_code, platform_name, manufacturer, release_year
-        FROM platforms
-        ORDER BY platform_name ASC
-    '''
-    c.execute(query)
-    return c.fetchall()
+    """Menampilkan semua platforms (dari registry dimensi)"""
+    return [
+        (p.platform_id, p.platform_code, p.platform_name, p.manufacturer, p.release_year)
+        for p in view_dimensions().platforms.records
+    ]
 
 def view_genres():
-    """Menampilkan semua genres"""
-    query = '''
-        SELECT genre_id, genre_name, description
-        FROM genres
-        ORDER BY genre_name ASC
-    '''
-    c.execute(query)
-    return c.fetchall()
+    """Menampilkan semua genres (dari registry dimensi)"""
+    return [
+        (g.genre_id, g.genre_name, g.description)
+        for g in view_dimensions().genres.records
+    ]
+
+# ============================
+# Fungsi tulis data penjualan
+# ============================
+
+WRITE_PAGE_SIZE = int(os.getenv("WRITE_PAGE_SIZE", "5000"))
+
+_UPSERT_SALES_SQL = {
+    "delta": '''
+        INSERT INTO regional_sales (game_release_id, region_id, sales_in_millions)
+        SELECT gr.game_release_id, v.region_id, v.sales
+        FROM (VALUES %s) AS v(game_id, platform_id, region_id, sales)
+        JOIN game_releases gr ON gr.game_id = v.game_id AND gr.platform_id = v.platform_id
+        ON CONFLICT (game_release_id, region_id) DO UPDATE
+        SET sales_in_millions = regional_sales.sales_in_millions + EXCLUDED.sales_in_millions,
+            updated_at = CURRENT_TIMESTAMP
+        RETURNING 1
+    ''',
+    "set": '''
+        INSERT INTO regional_sales (game_release_id, region_id, sales_in_millions)
+        SELECT gr.game_release_id, v.region_id, v.sales
+        FROM (VALUES %s) AS v(game_id, platform_id, region_id, sales)
+        JOIN game_releases gr ON gr.game_id = v.game_id AND gr.platform_id = v.platform_id
+        ON CONFLICT (game_release_id, region_id) DO UPDATE
+        SET sales_in_millions = EXCLUDED.sales_in_millions,
+            updated_at = CURRENT_TIMESTAMP
+        RETURNING 1
+    ''',
+}
+
+def _resolve_sales_updates(updates, mode):
+    """Ubah (game, platform, region, sales) menjadi ID; gabungkan key yang sama"""
+    dims = view_dimensions()
+    resolved = {}
+    unknown = set()
+    for game, platform, region, sales in updates:
+        game_id = dims.games.id_of(game)
+        platform_id = dims.platforms.id_of(platform)
+        region_id = dims.regions.id_of(region)
+        if game_id is None or platform_id is None or region_id is None:
+            unknown.add((game, platform, region))
+            continue
+        key = (game_id, platform_id, region_id)
+        # ON CONFLICT tidak boleh menyentuh baris yang sama dua kali dalam satu statement
+        if mode == "delta":
+            resolved[key] = resolved.get(key, 0) + sales
+        else:
+            resolved[key] = sales
+    if unknown:
+        raise ValueError(f"Game/platform/region tidak dikenal: {sorted(unknown)[:10]}")
+    return [key + (sales,) for key, sales in resolved.items()]
+
+def upsert_regional_sales(batch_id, updates, mode="delta"):
+    """Upsert batch penjualan (game, platform, region, sales) secara idempoten
+
+    `mode="delta"` menambahkan sales ke nilai lama, `mode="set"` menimpanya.
+    Batch dengan `batch_id` yang sudah pernah diterapkan dilewati (return 0);
+    selain itu return jumlah baris Regional_Sales yang di-insert/update.
+    """
+    if mode not in _UPSERT_SALES_SQL:
+        raise ValueError(f"mode harus 'delta' atau 'set', bukan {mode!r}")
+    rows = _resolve_sales_updates(updates, mode)
+
+    # Koneksi primary pinjaman dari pool, dipakai eksklusif selama satu batch:
+    # batch paralel tidak berbagi transaksi (koneksi modul `get_connection()`
+    # bersifat bersama). Pool autocommit, jadi transaksi dibuka manual di sini.
+    with get_pool().connection() as conn:
+        conn.autocommit = False
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    # Koneksi pool bisa membawa statement_timeout sesi dari query
+                    # baca sebelumnya (queries.py); tulis tidak dibatasi
+                    cur.execute("SET LOCAL statement_timeout = 0")
+                    cur.execute('''
+                        INSERT INTO sales_batches (batch_id, row_count)
+                        VALUES (%s, %s)
+                        ON CONFLICT (batch_id) DO NOTHING
+                        RETURNING batch_id
+                    ''', (batch_id, len(rows)))
+                    if cur.fetchone() is None:
+                        print(f"ℹ️ Batch {batch_id} sudah pernah diterapkan, dilewati.")
+                        return 0
+                    if not rows:
+                        return 0
+
+                    written = extras.execute_values(
+                        cur,
+                        _UPSERT_SALES_SQL[mode],
+                        rows,
+                        template="(%s::int, %s::int, %s::int, %s::numeric)",
+                        page_size=WRITE_PAGE_SIZE,
+                        fetch=True
+                    )
+                    if len(written) != len(rows):
+                        # Rollback otomatis oleh `with conn` saat exception
+                        raise ValueError(
+                            f"{len(rows) - len(written)} update tidak punya Game_Releases yang cocok"
+                        )
+        finally:
+            if not conn.closed:
+                conn.autocommit = True
+    return len(written)
 
 def close_connection():
-    """Menutup koneksi database"""
-    c.close()
-    conn.close()
+    """Menutup koneksi database (primary dan replica) dan thread refresh registry"""
+    global _conn, _cursor, _registry
+    if _registry is not None:
+        _registry.stop_background_refresh()
+        _registry = None
+    if _cursor is not None:
+        _cursor.close()
+    if _conn is not None:
+        queries.forget_prepared(_conn)
+        _conn.close()
+    _conn = _cursor = None
+    if _pool is not None:
+        _pool.close()
+    if _router is not None:
+        for replica in _router.replicas:
+            replica.pool.close()
     print("Koneksi database ditutup.")
\ No newline at end of file
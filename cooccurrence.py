@@ -0,0 +1,186 @@
+"""
+Matriks co-occurrence genre dan overlap platform dari tabel junction
+Game_Genres / Game_Releases memakai aljabar linear sparse.
+
+Incidence game x genre (G) dan game x platform (P) disimpan sebagai CSR,
+lalu semua matriks turunan adalah produk sparse kecil:
+
+    G.T @ G                co-occurrence genre (diagonal = jumlah game per genre)
+    P.T @ P                overlap platform (diagonal = jumlah game per platform)
+    G.T @ diag(w) @ G      co-occurrence genre berbobot sales game
+    G.T @ S                afinitas genre x platform (S = sales game x platform)
+
+Hasil disimpan per versi data (lihat analytics.ConcentrationEngine.sync).
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+import analytics
+import config
+import queries
+
+
+# ============================================================================
+# INCIDENCE MATRIX
+# ============================================================================
+def incidence(rows, cols, n_rows, n_cols, weights=None):
+    """Matriks CSR (n_rows x n_cols); pasangan duplikat dijumlahkan"""
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    data = np.ones(len(rows)) if weights is None else np.asarray(weights, dtype=np.float64)
+    matrix = sparse.csr_matrix((data, (rows, cols)), shape=(n_rows, n_cols))
+    matrix.sum_duplicates()
+    return matrix
+
+
+def jaccard(cooc):
+    """Similaritas Jaccard dari matriks co-occurrence (diagonal = ukuran set)"""
+    size = np.diag(cooc)
+    union = size[:, None] + size[None, :] - cooc
+    return np.divide(cooc, union, out=np.zeros_like(cooc, dtype=np.float64), where=union > 0)
+
+
+def lift(matrix):
+    """Observed / expected: > 1 berarti kombinasi lebih kuat dari proporsi marginalnya"""
+    total = matrix.sum()
+    expected = np.outer(matrix.sum(axis=1), matrix.sum(axis=0)) / (total or 1.0)
+    return np.divide(matrix, expected, out=np.zeros_like(matrix, dtype=np.float64), where=expected > 0)
+
+
+class JunctionMatrices:
+    """Incidence G, P, S dan produk sparse-nya untuk satu versi data"""
+
+    def __init__(self, facts, genre_pairs, platform_pairs):
+        """`genre_pairs` / `platform_pairs` = kolom hasil queries.fetch_columns"""
+        genre_game, genre = genre_pairs["game_id"], genre_pairs["genre_id"]
+        platform_game, platform = platform_pairs["game_id"], platform_pairs["platform_id"]
+        game_ids = [facts.game.max() if len(facts) else 0]
+        game_ids += [ids.max() for ids in (genre_game, platform_game) if len(ids)]
+        n_games = int(max(game_ids)) + 1
+        self.n_genres = int(genre.max() if len(genre) else 0) + 1
+        self.n_platforms = int(platform.max() if len(platform) else 0) + 1
+
+        self.G = incidence(genre_game, genre, n_games, self.n_genres)
+        self.P = incidence(platform_game, platform, n_games, self.n_platforms)
+        self.G.data[:] = 1.0
+        self.P.data[:] = 1.0
+        # Sales per (game, platform) langsung dari array fakta
+        self.S = incidence(facts.game, facts.platform, n_games, self.n_platforms, facts.sales)
+        self.game_sales = np.asarray(self.S.sum(axis=1)).ravel()
+
+        self.genre_cooc = (self.G.T @ self.G).toarray()
+        self.genre_cooc_sales = (self.G.T @ sparse.diags(self.game_sales) @ self.G).toarray()
+        self.platform_overlap = (self.P.T @ self.P).toarray()
+        self.genre_platform_sales = (self.G.T @ self.S).toarray()
+        # Game eksklusif: baris P dengan tepat satu platform
+        exclusive = (np.asarray(self.P.sum(axis=1)).ravel() == 1).astype(np.float64)
+        self.platform_exclusive = self.P.T @ exclusive
+
+
+# ============================================================================
+# ENGINE
+# ============================================================================
+class CooccurrenceEngine:
+    """Matriks junction per proses, dibangun ulang saat versi data berubah"""
+
+    def __init__(self):
+        self.version = None
+        self.matrices = None
+        self._lock = threading.Lock()
+
+    def _current(self):
+        concentration = analytics.engine()
+        version = concentration.version or concentration.sync()
+        with self._lock:
+            if self.version != version:
+                self.matrices = JunctionMatrices(
+                    concentration.facts,
+                    queries.fetch_columns("game_genre_pairs"),
+                    queries.fetch_columns("game_platform_pairs"),
+                )
+                self.version = version
+            return self.matrices
+
+    def _labels(self, kind, ids):
+        dims = config.view_dimensions()
+        if kind == "genre":
+            return [dims.genres.get(i).genre_name for i in ids]
+        return [dims.platforms.get(i).platform_name for i in ids]
+
+    def _frame(self, matrix, row_kind, col_kind):
+        """DataFrame berlabel; ID tanpa record dimensi atau tanpa data sama sekali dibuang"""
+        dims = config.view_dimensions()
+        table = {"genre": dims.genres, "platform": dims.platforms}
+        row_used = np.abs(matrix).sum(axis=1) > 0
+        col_used = np.abs(matrix).sum(axis=0) > 0
+        row_ids = [i for i in range(matrix.shape[0]) if row_used[i] and table[row_kind].get(i) is not None]
+        col_ids = [i for i in range(matrix.shape[1]) if col_used[i] and table[col_kind].get(i) is not None]
+        return pd.DataFrame(
+            matrix[np.ix_(row_ids, col_ids)],
+            index=self._labels(row_kind, row_ids),
+            columns=self._labels(col_kind, col_ids),
+        )
+
+    def genre_cooccurrence(self, metric="count"):
+        """Genre x genre: `count`, `jaccard` atau `sales` (berbobot sales game)"""
+        m = self._current()
+        if metric == "count":
+            matrix = m.genre_cooc
+        elif metric == "jaccard":
+            matrix = jaccard(m.genre_cooc)
+        elif metric == "sales":
+            matrix = m.genre_cooc_sales
+        else:
+            raise ValueError(f"metric harus 'count', 'jaccard' atau 'sales', bukan {metric!r}")
+        return self._frame(matrix, "genre", "genre")
+
+    def platform_overlap(self, normalize=True):
+        """Platform x platform: share game platform baris yang juga rilis di platform kolom"""
+        m = self._current()
+        matrix = m.platform_overlap
+        if normalize:
+            size = np.diag(matrix)[:, None]
+            matrix = np.divide(matrix, size, out=np.zeros_like(matrix), where=size > 0)
+        return self._frame(matrix, "platform", "platform")
+
+    def platform_exclusivity(self):
+        """Jumlah game, game eksklusif dan rasio eksklusivitas per platform"""
+        m = self._current()
+        dims = config.view_dimensions()
+        ids = [i for i in range(m.n_platforms) if dims.platforms.get(i) is not None]
+        games = np.diag(m.platform_overlap)[ids]
+        exclusive = m.platform_exclusive[ids]
+        frame = pd.DataFrame({
+            "Platform": self._labels("platform", ids),
+            "Games": games.astype(np.int64),
+            "Exclusive Games": exclusive.astype(np.int64),
+            "Exclusivity": np.divide(exclusive, games, out=np.zeros_like(exclusive), where=games > 0),
+        })
+        return frame[frame["Games"] > 0].sort_values("Exclusivity", ascending=False, ignore_index=True)
+
+    def genre_platform_affinity(self, metric="lift"):
+        """Genre x platform: `sales` (M$) atau `lift` terhadap proporsi marginal"""
+        m = self._current()
+        if metric == "sales":
+            matrix = m.genre_platform_sales
+        elif metric == "lift":
+            matrix = lift(m.genre_platform_sales)
+        else:
+            raise ValueError(f"metric harus 'sales' atau 'lift', bukan {metric!r}")
+        return self._frame(matrix, "genre", "platform")
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def engine():
+    """Engine co-occurrence per proses"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = CooccurrenceEngine()
+    return _engine
@@ -7,6 +7,8 @@
 -- ============================================================================
 
 -- Drop tables if they exist (in reverse order of dependencies)
+DROP TABLE IF EXISTS Data_Versions CASCADE; -- Versi data fakta (trigger)
+DROP TABLE IF EXISTS Sales_Batches CASCADE; -- Log batch write path
 DROP TABLE IF EXISTS Regional_Sales CASCADE;
 DROP TABLE IF EXISTS Regions CASCADE; -- Tabel baru
 DROP TABLE IF EXISTS Game_Releases CASCADE; -- Tabel baru
@@ -157,10 +159,58 @@ CREATE TABLE Regional_Sales (
 );
 COMMENT ON TABLE Regional_Sales IS 'Stores regional sales data (millions) per game release.';
 
+-- ============================================================================
+-- 9. SALES_BATCHES TABLE (IDEMPOTENSI WRITE PATH)
+-- ============================================================================
+-- Records every applied sales update batch so a retried batch is not applied twice
+CREATE TABLE Sales_Batches (
+    batch_id VARCHAR(64) PRIMARY KEY,
+    row_count INT NOT NULL DEFAULT 0,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+COMMENT ON TABLE Sales_Batches IS 'Log of applied sales update batches (idempotency key).';
+
+-- ============================================================================
+-- 10. DATA_VERSIONS TABLE (VERSI DATA FAKTA, DIPELIHARA TRIGGER)
+-- ============================================================================
+-- Query `sales_version` (queries.py) cukup membaca satu baris ini, bukan
+-- memindai Regional_Sales. Trigger per statement menaikkan versi setiap kali
+-- tabel yang membentuk fakta analitik berubah (ikut tereplikasi ke replica).
+-- Database lama: jalankan bagian ini sekali untuk menambahkan tabel + trigger.
+CREATE TABLE IF NOT EXISTS Data_Versions (
+    name VARCHAR(32) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+COMMENT ON TABLE Data_Versions IS 'Change counters maintained by triggers (cheap data version probe).';
+INSERT INTO Data_Versions (name) VALUES ('sales') ON CONFLICT (name) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_sales_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE Data_Versions SET version = version + 1, changed_at = CURRENT_TIMESTAMP WHERE name = 'sales';
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_sales_version ON Regional_Sales;
+CREATE TRIGGER trg_sales_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON Regional_Sales
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_sales_version();
+DROP TRIGGER IF EXISTS trg_sales_version ON Game_Releases;
+CREATE TRIGGER trg_sales_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON Game_Releases
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_sales_version();
+DROP TRIGGER IF EXISTS trg_sales_version ON Game_Genres;
+CREATE TRIGGER trg_sales_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON Game_Genres
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_sales_version();
+DROP TRIGGER IF EXISTS trg_sales_version ON Games;
+CREATE TRIGGER trg_sales_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON Games
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_sales_version();
+
 -- ============================================================================
 -- INDEXES
 -- ============================================================================
 CREATE INDEX idx_game_name ON Games(game_name);
 CREATE INDEX idx_gr_game_platform ON Game_Releases(game_id, platform_id);
-CREATE INDEX idx_rs_sales_region ON Regional_Sales(region_id, sales_in_millions DESC);
+CREATE INDEX idx_rs_sales_region ON Regional_Sales(region_id, sales_in_millions DESC, sale_id DESC);
+-- Keyset pagination detail penjualan semua region (scan maju/mundur untuk urutan asc/desc)
+CREATE INDEX idx_rs_sales_keyset ON Regional_Sales(sales_in_millions, sale_id);
 CREATE INDEX idx_rs_sales_game_release ON Regional_Sales(game_release_id);
\ No newline at end of file
@@ -0,0 +1,320 @@
+import threading
+import time
+
+import numpy as np
+
+# ============================================================================
+# REGISTRY DIMENSI
+# ============================================================================
+# Tabel dimensi (genres, platforms, publishers, regions, games) kecil dan
+# hampir statis, jadi dimuat sekali per proses lalu disimpan sebagai record
+# ringkas (__slots__) dengan indeks array ID -> record dan dict nama -> ID
+# per atribut nama.
+# Versi data dicek lewat satu query checksum murah; registry hanya dimuat
+# ulang jika checksum berubah.
+
+
+class MissingDimension(LookupError):
+    """ID fakta yang tidak ada di registry yang sedang dimuat (mis. game baru sebelum refresh)"""
+
+    def __init__(self, table, ids):
+        self.table = table
+        self.ids = sorted({int(i) for i in ids})
+        shown = ", ".join(map(str, self.ids[:5])) + (", ..." if len(self.ids) > 5 else "")
+        super().__init__(f"ID {shown} tidak ada di registry {table}")
+
+
+class Genre:
+    __slots__ = ("genre_id", "genre_name", "description")
+
+    def __init__(self, genre_id, genre_name, description):
+        self.genre_id = genre_id
+        self.genre_name = genre_name
+        self.description = description
+
+
+class Platform:
+    __slots__ = ("platform_id", "platform_code", "platform_name", "manufacturer", "release_year")
+
+    def __init__(self, platform_id, platform_code, platform_name, manufacturer, release_year):
+        self.platform_id = platform_id
+        self.platform_code = platform_code
+        self.platform_name = platform_name
+        self.manufacturer = manufacturer
+        self.release_year = release_year
+
+
+class Publisher:
+    __slots__ = ("publisher_id", "publisher_name", "country", "founded_year")
+
+    def __init__(self, publisher_id, publisher_name, country, founded_year):
+        self.publisher_id = publisher_id
+        self.publisher_name = publisher_name
+        self.country = country
+        self.founded_year = founded_year
+
+
+class Region:
+    __slots__ = ("region_id", "region_code", "region_name")
+
+    def __init__(self, region_id, region_code, region_name):
+        self.region_id = region_id
+        self.region_code = region_code
+        self.region_name = region_name
+
+
+class Game:
+    __slots__ = ("game_id", "game_name", "publisher_id")
+
+    def __init__(self, game_id, game_name, publisher_id):
+        self.game_id = game_id
+        self.game_name = game_name
+        self.publisher_id = publisher_id
+
+
+class DimensionTable:
+    """Satu tabel dimensi: array ID -> record dan dict nama -> ID per atribut nama
+
+    `record()` / `values()` melempar MissingDimension untuk ID tak dikenal;
+    salinan `with_placeholders()` memberi record placeholder sebagai gantinya.
+    """
+
+    __slots__ = (
+        "name", "records", "by_id", "by_name", "present", "_ambiguous", "_columns", "_id_attr", "_name_attrs",
+        "_placeholders",
+    )
+
+    def __init__(self, records, id_attr, name_attrs, name=None):
+        self.name = name
+        self.records = records
+        self._columns = {}
+        self._id_attr = id_attr
+        self._name_attrs = name_attrs
+        self._placeholders = None
+        max_id = max((getattr(r, id_attr) for r in records), default=0)
+        self.by_id = [None] * (max_id + 1)
+        # Indeks terpisah per atribut: kode satu platform boleh sama dengan nama platform lain
+        self.by_name = {attr: {} for attr in name_attrs}
+        self._ambiguous = set()
+        for record in records:
+            record_id = getattr(record, id_attr)
+            self.by_id[record_id] = record
+            for attr in name_attrs:
+                index = self.by_name[attr]
+                value = getattr(record, attr)
+                if index.setdefault(value, record_id) != record_id:
+                    self._ambiguous.add((attr, value))
+        self.present = np.array([r is not None for r in self.by_id], dtype=bool)
+
+    def __len__(self):
+        return len(self.records)
+
+    def get(self, record_id):
+        """Record untuk ID tertentu (None jika tidak ada)"""
+        if record_id is None or not 0 <= record_id < len(self.by_id):
+            return None
+        return self.by_id[record_id]
+
+    def record(self, record_id):
+        """Record untuk ID tertentu; ID tak dikenal -> MissingDimension (atau placeholder)"""
+        record = self.get(record_id)
+        if record is None:
+            if self._placeholders is None:
+                raise MissingDimension(self.name, [record_id])
+            return self._placeholder(record_id)
+        return record
+
+    def values(self, attr, ids):
+        """Array atribut per ID; ID tak dikenal -> MissingDimension (atau nilai placeholder)"""
+        ids = np.asarray(ids, dtype=np.int64)
+        column = self.column(attr)
+        known = (ids >= 0) & (ids < len(column))
+        known[known] = self.present[ids[known]]
+        if known.all():
+            return column[ids]
+        if self._placeholders is None:
+            raise MissingDimension(self.name, ids[~known])
+        values = np.empty(len(ids), dtype=object)
+        values[known] = column[ids[known]]
+        values[~known] = [getattr(self._placeholder(i), attr) for i in ids[~known]]
+        return values
+
+    def with_placeholders(self, record_cls):
+        """Salinan tabel yang memberi record placeholder `record_cls` untuk ID tak dikenal"""
+        table = DimensionTable.__new__(DimensionTable)
+        for slot in DimensionTable.__slots__:
+            setattr(table, slot, getattr(self, slot))
+        table._placeholders = record_cls
+        return table
+
+    def _placeholder(self, record_id):
+        # Label "(tidak dikenal #ID)", ID relasi 0 (ikut placeholder), atribut lain None
+        record_id = int(record_id)
+        values = []
+        for attr in self._placeholders.__slots__:
+            if attr == self._id_attr:
+                values.append(record_id)
+            elif attr in self._name_attrs:
+                values.append(f"(tidak dikenal #{record_id})")
+            elif attr.endswith("_id"):
+                values.append(0)
+            else:
+                values.append(None)
+        return self._placeholders(*values)
+
+    def id_of(self, name, attr=None):
+        """ID untuk nama/kode tertentu (None jika tidak ada)
+
+        Tanpa `attr` semua atribut nama dicari; nilai yang menunjuk ke ID
+        berbeda (antar atribut atau duplikat dalam satu atribut) ditolak
+        dengan ValueError, bukan diam-diam memilih salah satunya.
+        """
+        attrs = [attr] if attr is not None else list(self.by_name)
+        ambiguous = [a for a in attrs if (a, name) in self._ambiguous]
+        ids = {self.by_name[a][name] for a in attrs if name in self.by_name[a]}
+        if ambiguous or len(ids) > 1:
+            raise ValueError(f"{name!r} ambigu di {ambiguous or attrs}; cocok dengan lebih dari satu ID")
+        return ids.pop() if ids else None
+
+    def column(self, attr):
+        """Array atribut per ID (posisi = ID, None jika tidak ada record); dibuat sekali per tabel"""
+        values = self._columns.get(attr)
+        if values is None:
+            values = np.empty(len(self.by_id), dtype=object)
+            values[:] = [getattr(r, attr) if r is not None else None for r in self.by_id]
+            self._columns[attr] = values
+        return values
+
+
+# (nama tabel, kelas record, query, atribut ID, atribut nama yang diindeks)
+_DIMENSIONS = (
+    ("genres", Genre,
+     "SELECT genre_id, genre_name, description FROM genres ORDER BY genre_name",
+     "genre_id", ("genre_name",)),
+    ("platforms", Platform,
+     "SELECT platform_id, platform_code, platform_name, manufacturer, release_year "
+     "FROM platforms ORDER BY platform_name",
+     "platform_id", ("platform_code", "platform_name")),
+    ("publishers", Publisher,
+     "SELECT publisher_id, publisher_name, country, founded_year "
+     "FROM publishers ORDER BY publisher_name",
+     "publisher_id", ("publisher_name",)),
+    ("regions", Region,
+     "SELECT region_id, region_code, region_name FROM regions ORDER BY region_id",
+     "region_id", ("region_code", "region_name")),
+    ("games", Game,
+     "SELECT game_id, game_name, publisher_id FROM games ORDER BY game_name",
+     "game_id", ("game_name",)),
+)
+
+# Checksum murah: jumlah baris + jumlah hash seluruh baris per tabel dimensi
+# (row::text mencakup setiap kolom yang dimuat, mis. manufacturer, founded_year)
+VERSION_QUERY = '''
+    SELECT md5(concat_ws('|',
+        (SELECT COUNT(*) || ':' || COALESCE(SUM(hashtext(t::text)), 0) FROM genres t),
+        (SELECT COUNT(*) || ':' || COALESCE(SUM(hashtext(t::text)), 0) FROM platforms t),
+        (SELECT COUNT(*) || ':' || COALESCE(SUM(hashtext(t::text)), 0) FROM publishers t),
+        (SELECT COUNT(*) || ':' || COALESCE(SUM(hashtext(t::text)), 0) FROM regions t),
+        (SELECT COUNT(*) || ':' || COALESCE(SUM(hashtext(t::text)), 0) FROM games t)
+    ))
+'''
+
+
+class DimensionRegistry:
+    """Registry dimensi per proses dengan versi checksum dan refresh di background
+
+    `db` cukup punya `cursor()` yang bisa dipakai di `with`: koneksi psycopg2
+    atau pool.ConnectionPool (dashboard: koneksi dipinjam per query, jadi
+    koneksi yang diputus server diganti sendiri).
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.version = None
+        self.loaded_at = 0.0
+        self._tables = {}
+        self._lock = threading.Lock()
+        self._refresher = None
+        self._stop = threading.Event()
+
+    def __getattr__(self, name):
+        # registry.genres, registry.platforms, ... -> DimensionTable
+        tables = self.__dict__.get("_tables")
+        if tables and name in tables:
+            return tables[name]
+        raise AttributeError(name)
+
+    def fetch_version(self):
+        """Ambil checksum data dimensi saat ini"""
+        with self.db.cursor() as cur:
+            cur.execute(VERSION_QUERY)
+            return cur.fetchone()[0]
+
+    def load(self):
+        """Muat semua tabel dimensi lalu tukar secara atomik"""
+        with self._lock:
+            version = self.fetch_version()
+            tables = {}
+            with self.db.cursor() as cur:
+                for name, record_cls, query, id_attr, name_attrs in _DIMENSIONS:
+                    cur.execute(query)
+                    records = [record_cls(*row) for row in cur.fetchall()]
+                    tables[name] = DimensionTable(records, id_attr, name_attrs, name)
+            self._tables = tables
+            self.version = version
+            self.loaded_at = time.time()
+        return self
+
+    def with_placeholders(self):
+        """Tampilan registry yang memberi record placeholder untuk ID tak dikenal"""
+        return PlaceholderView({
+            name: self._tables[name].with_placeholders(record_cls) for name, record_cls, *_ in _DIMENSIONS
+        })
+
+    def ensure_loaded(self):
+        """Muat registry jika belum pernah dimuat"""
+        if not self._tables:
+            self.load()
+        return self
+
+    def refresh_if_changed(self):
+        """Muat ulang hanya jika checksum berubah; True jika dimuat ulang"""
+        if self._tables and self.fetch_version() == self.version:
+            return False
+        self.load()
+        return True
+
+    def start_background_refresh(self, interval=300):
+        """Jalankan thread daemon yang mengecek versi setiap `interval` detik"""
+        if self._refresher is not None or interval <= 0:
+            return
+
+        def _loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh_if_changed()
+                except Exception as e:
+                    print(f"⚠️ Refresh registry dimensi gagal: {e}")
+
+        self._refresher = threading.Thread(target=_loop, name="dimension-refresh", daemon=True)
+        self._refresher.start()
+
+    def stop_background_refresh(self):
+        """Hentikan thread refresh (dipanggil saat koneksi database ditutup)"""
+        self._stop.set()
+        if self._refresher is not None:
+            self._refresher.join(timeout=5)
+            self._refresher = None
+
+
+class PlaceholderView:
+    """Registry (read-only) dengan tabel with_placeholders(): resolve tidak pernah gagal karena ID baru"""
+
+    def __init__(self, tables):
+        self._tables = tables
+
+    def __getattr__(self, name):
+        tables = self.__dict__.get("_tables")
+        if tables and name in tables:
+            return tables[name]
+        raise AttributeError(name)
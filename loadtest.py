@@ -0,0 +1,290 @@
+"""
+Load/soak test untuk dashboard: mensimulasikan N sesi paralel yang berputar
+melalui 9 halaman main.py dengan think time realistis. Query dijalankan
+lewat jalur yang sama dengan dashboard: queries.run_query (fetch kolom
+terkemas) dengan pembatalan in-flight aktif di setiap thread sesi. Halaman
+analitik ikut menjalankan query muat ulang engine (PAGE_RELOAD_QUERIES);
+--steady-state hanya mengukur cek versinya.
+
+Contoh (PostgreSQL lokal):
+    SUPABASE_HOST=localhost SUPABASE_SSLMODE=disable \\
+        python loadtest.py --sessions 20 --duration 60 --mode pool
+
+Mode:
+    pool       query meminjam koneksi pool/replica per query (perilaku main.py)
+    shared     semua sesi memakai cursor bersama `config.c` (perilaku lama)
+    dedicated  setiap sesi membuka koneksi & cursor sendiri
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+
+import psycopg2
+
+import config
+import queries
+from queries import PAGE_QUERIES, PAGE_RELOAD_QUERIES, QUERIES
+
+CONNECTION_USAGE_SQL = '''
+    SELECT COUNT(*), COUNT(*) FILTER (WHERE state = 'active')
+    FROM pg_stat_activity
+    WHERE datname = current_database() AND pid <> pg_backend_pid()
+'''
+
+
+class CursorConflict(Exception):
+    """Hasil query tidak cocok dengan query yang dijalankan (cursor dipakai sesi lain)"""
+
+
+# ============================================================================
+# HASIL
+# ============================================================================
+class Results:
+    """Kumpulan latency, jumlah query dan error per halaman (thread-safe)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(int)
+        self.errors = defaultdict(lambda: defaultdict(int))
+        self.connections = []
+
+    def record(self, page, latency, queries, error=None):
+        with self.lock:
+            self.latencies[page].append(latency)
+            self.queries[page] += queries
+            if error:
+                self.errors[page][error] += 1
+
+
+def percentile(values, pct):
+    """Persentil nearest-rank dari list angka"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = math.ceil(pct / 100.0 * len(ordered)) - 1
+    return ordered[min(max(index, 0), len(ordered) - 1)]
+
+
+def classify_error(exc, shared=False):
+    """Kelompokkan exception menjadi kategori laporan
+
+    Konflik cursor hanya mungkin di mode shared; di mode lain error yang sama
+    adalah bug aplikasi (`app_error`), bukan masalah konkurensi.
+    """
+    if isinstance(exc, CursorConflict):
+        return "cursor_conflict"
+    if isinstance(exc, queries.QueryTimeout):
+        return "timeout"
+    if isinstance(exc, queries.QueryCancelled):
+        return "cancelled"
+    if shared and isinstance(exc, psycopg2.ProgrammingError) and "no results to fetch" in str(exc):
+        return "cursor_conflict"
+    if isinstance(exc, psycopg2.InterfaceError):
+        return "connection_error"
+    if isinstance(exc, psycopg2.Error):
+        return "db_error"
+    return "app_error"
+
+
+# ============================================================================
+# SESI
+# ============================================================================
+def page_queries(page, steady_state=False):
+    """Query satu kunjungan halaman; halaman analitik ikut memuat ulang engine kecuali `steady_state`"""
+    reload = [] if steady_state else PAGE_RELOAD_QUERIES.get(page, [])
+    return PAGE_QUERIES[page] + reload
+
+
+def run_page(cur, page, shared=False, steady_state=False):
+    """Jalankan semua query satu halaman seperti dashboard; kembalikan jumlah query
+
+    `cur` None = koneksi pinjaman dari pool/replica per query (mode pool).
+    """
+    count = 0
+    for name, params in page_queries(page, steady_state):
+        spec = QUERIES[name]
+        try:
+            df = queries.run_query(name, cursor=cur, **params)
+        except (ValueError, TypeError, AttributeError, KeyError, IndexError) as e:
+            if not shared:
+                raise
+            # Bentuk hasil tidak cocok: hasil milik query sesi lain di cursor bersama
+            raise CursorConflict(str(e))
+        if shared and len(df.columns) != len(spec.columns):
+            raise CursorConflict(f"expected {len(spec.columns)} columns")
+        count += 1
+    return count
+
+
+def session_worker(index, args, results, stop_at):
+    """Satu sesi dashboard: berputar melalui halaman dengan think time"""
+    rng = random.Random(args.seed + index)
+    pages = list(PAGE_QUERIES)
+    # Sama seperti main.py: wait callback pembatalan aktif selama query berjalan
+    queries.enable_cancellation(lambda: False)
+    if args.mode == "pool":
+        conn = cur = None
+    elif args.mode == "shared":
+        conn, cur = config.conn, config.c
+    else:
+        conn = psycopg2.connect(**config.DB_PARAMS)
+        cur = conn.cursor()
+
+    shared = args.mode == "shared"
+    step = index % len(pages)
+    try:
+        while time.monotonic() < stop_at:
+            page = pages[step % len(pages)]
+            step += 1
+            started = time.perf_counter()
+            error, n_queries = None, 0
+            try:
+                n_queries = run_page(cur, page, shared, args.steady_state)
+            except Exception as e:
+                error = classify_error(e, shared)
+                if conn is not None:
+                    try:
+                        conn.rollback()
+                    except psycopg2.Error:
+                        pass
+            results.record(page, time.perf_counter() - started, n_queries, error)
+            time.sleep(rng.uniform(args.think_min, args.think_max))
+    finally:
+        if args.mode == "dedicated":
+            cur.close()
+            conn.close()
+
+
+def connection_monitor(results, stop_event, interval):
+    """Sampling jumlah koneksi DB (total, aktif) selama tes berjalan"""
+    conn = psycopg2.connect(**config.DB_PARAMS)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            while not stop_event.is_set():
+                cur.execute(CONNECTION_USAGE_SQL)
+                results.connections.append(cur.fetchone())
+                stop_event.wait(interval)
+    finally:
+        conn.close()
+
+
+# ============================================================================
+# LAPORAN
+# ============================================================================
+def build_report(results, elapsed, args):
+    """Ringkasan per halaman dan keseluruhan dalam bentuk dict"""
+    pages = {}
+    all_latencies, total_errors = [], 0
+    for page in PAGE_QUERIES:
+        latencies = results.latencies.get(page, [])
+        errors = dict(results.errors.get(page, {}))
+        n = len(latencies)
+        n_errors = sum(errors.values())
+        all_latencies.extend(latencies)
+        total_errors += n_errors
+        pages[page] = {
+            "requests": n,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "queries_per_page": round(results.queries.get(page, 0) / n, 2) if n else 0,
+            "error_rate": round(n_errors / n, 4) if n else 0,
+            "errors": errors,
+        }
+    connections = results.connections or [(0, 0)]
+    total = len(all_latencies)
+    return {
+        "mode": args.mode,
+        "sessions": args.sessions,
+        "duration_s": round(elapsed, 1),
+        "pages": pages,
+        "overall": {
+            "requests": total,
+            "pages_per_s": round(total / elapsed, 2) if elapsed else 0,
+            "p50_ms": round(percentile(all_latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(all_latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(all_latencies, 99) * 1000, 1),
+            "error_rate": round(total_errors / total, 4) if total else 0,
+        },
+        "db_connections": {
+            "max_total": max(c[0] for c in connections),
+            "max_active": max(c[1] for c in connections),
+            "avg_total": round(sum(c[0] for c in connections) / len(connections), 1),
+        },
+    }
+
+
+def print_report(report):
+    print(f"\n📊 Load test: {report['sessions']} sesi, mode={report['mode']}, {report['duration_s']}s")
+    print(f"{'Halaman':<28}{'req':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'q/page':>8}{'err%':>8}")
+    for page, stats in report["pages"].items():
+        print(
+            f"{page:<28}{stats['requests']:>6}{stats['p50_ms']:>9}{stats['p95_ms']:>9}"
+            f"{stats['p99_ms']:>9}{stats['queries_per_page']:>8}{stats['error_rate'] * 100:>7.1f}%"
+        )
+        for kind, count in stats["errors"].items():
+            print(f"    ↳ {kind}: {count}")
+    overall = report["overall"]
+    db = report["db_connections"]
+    print(
+        f"\nTotal: {overall['requests']} halaman, {overall['pages_per_s']} halaman/s, "
+        f"p95={overall['p95_ms']}ms, p99={overall['p99_ms']}ms, error={overall['error_rate'] * 100:.1f}%"
+    )
+    print(f"Koneksi DB: max={db['max_total']} (aktif max={db['max_active']}), rata-rata={db['avg_total']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load/soak test sesi dashboard")
+    parser.add_argument("--sessions", type=int, default=10, help="jumlah sesi paralel")
+    parser.add_argument("--duration", type=float, default=30, help="durasi tes (detik)")
+    parser.add_argument("--think-min", type=float, default=0.5, help="think time minimum (detik)")
+    parser.add_argument("--think-max", type=float, default=3.0, help="think time maksimum (detik)")
+    parser.add_argument("--mode", choices=["pool", "shared", "dedicated"], default="pool")
+    parser.add_argument("--steady-state", action="store_true",
+                        help="halaman analitik hanya cek versi (tanpa memuat ulang fakta/matriks engine)")
+    parser.add_argument("--seed", type=int, default=42, help="seed agar hasil dapat direproduksi")
+    parser.add_argument("--json", help="simpan laporan JSON ke file ini")
+    parser.add_argument("--max-error-rate", type=float, default=None,
+                        help="exit code 1 jika error rate keseluruhan melebihi nilai ini")
+    args = parser.parse_args()
+
+    # Registry dimensi dimuat sekali per proses, sama seperti di dashboard
+    config.view_dimensions()
+    results = Results()
+    stop_event = threading.Event()
+    monitor = threading.Thread(target=connection_monitor, args=(results, stop_event, 1.0), daemon=True)
+    monitor.start()
+
+    started = time.monotonic()
+    stop_at = started + args.duration
+    workers = [
+        threading.Thread(target=session_worker, args=(i, args, results, stop_at), daemon=True)
+        for i in range(args.sessions)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.monotonic() - started
+    stop_event.set()
+    monitor.join(timeout=5)
+
+    report = build_report(results, elapsed, args)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"💾 Laporan disimpan ke {args.json}")
+
+    if args.max_error_rate is not None and report["overall"]["error_rate"] > args.max_error_rate:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
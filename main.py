@@ -1,16 +1,40 @@
+import functools
+import sys
+import time
+
+import numpy as np
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from config import (
-    view_regional_sales,
-    view_top_selling_games,
-    view_sales_by_genre,
-    view_sales_by_platform,
-    view_publishers,
-    conn,
-    c
+import queries
+from queries import (
+    QUERIES, GENRE_ATTRIBUTIONS, DEFAULT_GENRE_ATTRIBUTION, QueryCancelled, QueryTimeout, run_query
 )
+import analytics
+import config
+import memory
+import rendering
+import sampling
+
+def plotting():
+    """Import plotly saat halaman pertama kali membutuhkan grafik (bukan saat startup)"""
+    import plotly.express as px
+    import plotly.graph_objects as go
+    return px, go
+
+# Generasi run sesi ini: setiap run script menaikkan penghitung di session_state.
+# Dengan runner.fastReruns (default Streamlit) run baru (pindah halaman, klik
+# widget) langsung dimulai di thread lain selagi run lama masih menunggu query,
+# jadi run lama tahu dirinya sudah usang tanpa API internal Streamlit.
+RUN_GENERATION = "_run_generation"
+run_generation = st.session_state.get(RUN_GENERATION, 0) + 1
+st.session_state[RUN_GENERATION] = run_generation
+
+def rerun_requested():
+    """True jika sesi ini sudah memulai run baru (pindah halaman, klik widget) saat query berjalan"""
+    return st.session_state.get(RUN_GENERATION) != run_generation
+
+# Sesi terdaftar untuk laporan memori per sesi (memory.session_report)
+memory.register_session(st.session_state)
 
 # ============================================================================
 # KONFIGURASI HALAMAN
@@ -59,164 +83,279 @@ page = st.sidebar.radio(
         "📈 Tren Genre",
         "🖥️ Kinerja Platform",
         "🔗 Korelasi Genre-Platform",
-        "🏢 Kinerja Penerbit"
+        "🏢 Kinerja Penerbit",
+        "📐 Konsentrasi Pasar",
+        "🧩 Co-occurrence Genre & Platform"
     ]
 )
 
+# Atribusi penjualan game multi-genre (hanya halaman yang menjumlahkan per genre)
+attribution = DEFAULT_GENRE_ATTRIBUTION
+if page in ("📈 Tren Genre", "🔗 Korelasi Genre-Platform", "📐 Konsentrasi Pasar"):
+    attribution = st.sidebar.radio(
+        "Atribusi Penjualan Genre:",
+        GENRE_ATTRIBUTIONS,
+        index=GENRE_ATTRIBUTIONS.index(DEFAULT_GENRE_ATTRIBUTION),
+        format_func=lambda a: {"full": "Penuh (tiap genre)", "split": "Dibagi rata", "primary": "Genre utama"}[a],
+        help="Game dengan beberapa genre: 'Penuh' menghitung penjualan di setiap genre "
+             "(total genre > total global); 'Dibagi rata' dan 'Genre utama' menjaga total tetap sama."
+    )
+
+# Mode preview: estimasi dari sampel dulu, hasil exact menyusul (halaman eksploratif)
+preview_mode = False
+if page in ("🖥️ Kinerja Platform", "🔗 Korelasi Genre-Platform", "🏢 Kinerja Penerbit"):
+    preview_mode = st.sidebar.checkbox(
+        "⚡ Mode Preview (sampling)",
+        value=sampling.PREVIEW_MODE,
+        help=f"Tampilkan estimasi dari sampel {sampling.PREVIEW_SAMPLE_PERCENT:g}% data penjualan "
+             "beserta margin 95%, lalu ganti otomatis dengan hasil exact setelah selesai dihitung."
+    )
+
+show_memory = st.sidebar.checkbox("🧠 Tampilkan pemakaian memori", value=False)
+
 # ============================================================================
 # FUNGSI HELPER - FETCH DATA
 # ============================================================================
-@st.cache_data
-def get_regional_sales_data():
-    """Ambil data penjualan regional"""
+# Query in-flight dibatalkan di server begitu sesi ini pindah halaman / rerun
+queries.enable_cancellation(rerun_requested)
+
+@st.cache_resource
+def last_good_results():
+    """Hasil sukses terakhir per fetcher (seluruh proses) untuk mode degradasi"""
+    return {}
+
+VIEWED_DATASETS = "_viewed_datasets"
+
+def load_data(fetcher, label, *args):
+    """Panggil fetcher ter-cache; saat query timeout sajikan hasil terakhir dengan badge basi
+
+    Fetcher memakai st.cache_resource: DataFrame yang sama dibagi semua sesi
+    tanpa salinan per render, jadi halaman tidak boleh memodifikasinya.
+    Error tidak di-cache (fetcher melempar exception), jadi rerun berikutnya
+    langsung mencoba lagi ke database.
+    """
+    key = (fetcher.__name__, args)
+    store = last_good_results()
+    # Dataset yang dirender sesi ini (untuk panel pemakaian memori per sesi)
+    st.session_state.setdefault(VIEWED_DATASETS, set()).add(key)
     try:
-        c.execute('''
-            SELECT 
-                r.region_name,
-                ROUND(SUM(rs.sales_in_millions)::numeric, 2) AS total_sales
-            FROM regional_sales rs
-            JOIN regions r ON rs.region_id = r.region_id
-            WHERE r.region_id IS NOT NULL
-            GROUP BY r.region_id, r.region_name
-            ORDER BY total_sales DESC
-        ''')
-        data = c.fetchall()
-        df = pd.DataFrame(data, columns=['Region', 'Total Sales (Millions)'])
-        df['Total Sales (Millions)'] = pd.to_numeric(df['Total Sales (Millions)'], errors='coerce')
-        return df
+        df = fetcher(*args)
+    except QueryCancelled:
+        # Sesi sudah pindah halaman / rerun; Streamlit menghentikan run ini di elemen berikutnya
+        return pd.DataFrame()
+    except QueryTimeout as e:
+        if key in store:
+            df, fetched_at = store[key]
+            age = int((time.time() - fetched_at) // 60)
+            st.warning(
+                f"🕰️ **Data basi** — {label} melebihi batas waktu query; menampilkan hasil terakhir "
+                f"({time.strftime('%H:%M', time.localtime(fetched_at))}, {age} menit lalu)."
+            )
+            return df
+        st.error(f"⏱️ {label} melebihi batas waktu dan belum ada hasil tersimpan: {e}")
+        return pd.DataFrame()
     except Exception as e:
-        st.error(f"Error fetching regional sales: {e}")
+        st.error(f"Error fetching {label}: {e}")
         return pd.DataFrame()
+    store[key] = (df, time.time())
+    return df
+
+@st.cache_resource
+def snapshot_bundle():
+    """Bundle snapshot aktif (dimuat sekali per proses via memory map) jika USE_SNAPSHOT=1"""
+    import snapshot
+    if not snapshot.USE_SNAPSHOT:
+        return None
+    try:
+        bundle = snapshot.load_latest()
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Bundle snapshot tidak bisa dimuat, memakai query live: {e}")
+        return None
+    if bundle is not None:
+        print(f"📦 Snapshot {bundle.label} dimuat dari {bundle.path}")
+    return bundle
+
+def snapshot_first(name, *param_names):
+    """Sajikan dataset dari bundle snapshot bila ada (tanpa beban DB); selain itu fetcher live"""
+    def decorate(fetcher):
+        @functools.wraps(fetcher)
+        def fetch(*args):
+            bundle = snapshot_bundle()
+            if bundle is not None:
+                df = bundle.get(name, **dict(zip(param_names, args)))
+                if df is not None:
+                    return df
+            return fetcher(*args)
+        return fetch
+    return decorate
+
+@snapshot_first("overview_metrics")
+@st.cache_resource(ttl=QUERIES["overview_metrics"].ttl)
+def get_overview_metrics():
+    """Ambil metrik ringkasan (total penjualan, games, publishers, platforms)"""
+    return run_query("overview_metrics")
 
-@st.cache_data
+@snapshot_first("regional_sales")
+@st.cache_resource(ttl=QUERIES["regional_sales"].ttl)
+def get_regional_sales_data():
+    """Ambil data penjualan regional"""
+    return run_query("regional_sales")
+
+@snapshot_first("top_games", "limit")
+@st.cache_resource(ttl=QUERIES["top_games"].ttl)
 def get_top_games_data(limit=15):
     """Ambil data top N games terlaris"""
-    try:
-        c.execute('''
-            SELECT 
-                g.game_name,
-                p.publisher_name,
-                ROUND(SUM(rs.sales_in_millions)::numeric, 2) AS total_sales
-            FROM regional_sales rs
-            JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
-            JOIN games g ON gr.game_id = g.game_id
-            JOIN publishers p ON g.publisher_id = p.publisher_id
-            GROUP BY g.game_id, g.game_name, p.publisher_id, p.publisher_name
-            ORDER BY total_sales DESC
-            LIMIT %s
-        ''', (limit,))
-        data = c.fetchall()
-        df = pd.DataFrame(data, columns=['Game', 'Publisher', 'Total Sales (Millions)'])
-        df['Total Sales (Millions)'] = pd.to_numeric(df['Total Sales (Millions)'], errors='coerce')
-        return df
-    except Exception as e:
-        st.error(f"Error fetching top games: {e}")
-        return pd.DataFrame()
+    return run_query("top_games", limit=limit)
 
-@st.cache_data
-def get_genre_sales_data():
+@snapshot_first("genre_sales", "attribution")
+@st.cache_resource(ttl=QUERIES["genre_sales"].ttl)
+def get_genre_sales_data(attribution=DEFAULT_GENRE_ATTRIBUTION):
     """Ambil data penjualan per genre"""
-    try:
-        c.execute('''
-            SELECT 
-                ge.genre_name,
-                COUNT(DISTINCT g.game_id) AS game_count,
-                ROUND(SUM(rs.sales_in_millions)::numeric, 2) AS total_sales
-            FROM regional_sales rs
-            JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
-            JOIN games g ON gr.game_id = g.game_id
-            JOIN game_genres gg ON g.game_id = gg.game_id
-            JOIN genres ge ON gg.genre_id = ge.genre_id
-            GROUP BY ge.genre_id, ge.genre_name
-            ORDER BY total_sales DESC
-        ''')
-        data = c.fetchall()
-        df = pd.DataFrame(data, columns=['Genre', 'Game Count', 'Total Sales (Millions)'])
-        df['Total Sales (Millions)'] = pd.to_numeric(df['Total Sales (Millions)'], errors='coerce')
-        df['Game Count'] = pd.to_numeric(df['Game Count'], errors='coerce')
-        return df
-    except Exception as e:
-        st.error(f"Error fetching genre sales: {e}")
-        return pd.DataFrame()
+    return run_query("genre_sales", attribution=attribution)
 
-@st.cache_data
+@snapshot_first("platform_sales")
+@st.cache_resource(ttl=QUERIES["platform_sales"].ttl)
 def get_platform_sales_data():
     """Ambil data penjualan per platform"""
-    try:
-        c.execute('''
-            SELECT 
-                pl.platform_name,
-                pl.platform_code,
-                COUNT(DISTINCT gr.game_id) AS game_count,
-                ROUND(SUM(rs.sales_in_millions)::numeric, 2) AS total_sales
-            FROM regional_sales rs
-            JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
-            JOIN platforms pl ON gr.platform_id = pl.platform_id
-            GROUP BY pl.platform_id, pl.platform_name, pl.platform_code
-            ORDER BY total_sales DESC
-        ''')
-        data = c.fetchall()
-        df = pd.DataFrame(data, columns=['Platform', 'Code', 'Game Count', 'Total Sales (Millions)'])
-        df['Total Sales (Millions)'] = pd.to_numeric(df['Total Sales (Millions)'], errors='coerce')
-        df['Game Count'] = pd.to_numeric(df['Game Count'], errors='coerce')
-        return df
-    except Exception as e:
-        st.error(f"Error fetching platform sales: {e}")
-        return pd.DataFrame()
+    return run_query("platform_sales")
 
-@st.cache_data
-def get_genre_platform_sales_data():
+@snapshot_first("genre_platform_sales", "attribution")
+@st.cache_resource(ttl=QUERIES["genre_platform_sales"].ttl)
+def get_genre_platform_sales_data(attribution=DEFAULT_GENRE_ATTRIBUTION):
     """Ambil data penjualan genre per platform"""
-    try:
-        c.execute('''
-            SELECT 
-                pl.platform_name,
-                ge.genre_name,
-                ROUND(SUM(rs.sales_in_millions)::numeric, 2) AS total_sales
-            FROM regional_sales rs
-            JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
-            JOIN games g ON gr.game_id = g.game_id
-            JOIN platforms pl ON gr.platform_id = pl.platform_id
-            JOIN game_genres gg ON g.game_id = gg.game_id
-            JOIN genres ge ON gg.genre_id = ge.genre_id
-            GROUP BY pl.platform_id, pl.platform_name, ge.genre_id, ge.genre_name
-            ORDER BY pl.platform_name, total_sales DESC
-        ''')
-        data = c.fetchall()
-        df = pd.DataFrame(data, columns=['Platform', 'Genre', 'Total Sales (Millions)'])
-        df['Total Sales (Millions)'] = pd.to_numeric(df['Total Sales (Millions)'], errors='coerce')
-        return df
-    except Exception as e:
-        st.error(f"Error fetching genre-platform sales: {e}")
-        return pd.DataFrame()
+    return run_query("genre_platform_sales", attribution=attribution)
 
-@st.cache_data
+@snapshot_first("publisher_sales", "limit")
+@st.cache_resource(ttl=QUERIES["publisher_sales"].ttl)
 def get_publisher_sales_data(limit=15):
     """Ambil data penjualan per penerbit"""
+    return run_query("publisher_sales", limit=limit)
+
+@st.cache_resource(ttl=QUERIES["platform_sales_preview"].ttl)
+def get_preview_data(name, params):
+    """Ambil estimasi dari sampel TABLESAMPLE (kolom tambahan 'Margin (95%)')"""
+    return sampling.preview(name, **dict(params))
+
+# Job exact yang ditunggu di akhir halaman sebelum rerun
+pending_refinements = []
+
+def load_progressive(fetcher, label, name, **params):
+    """load_data dengan mode preview: estimasi sampel sekarang, hasil exact dari background
+
+    Setelah job exact selesai hasilnya langsung dipakai (dan disimpan untuk
+    mode degradasi) sampai TTL query aslinya habis.
+    """
+    bundle = snapshot_bundle()
+    if not preview_mode or (bundle is not None and bundle.has(name, **params)):
+        return load_data(fetcher, label, *params.values())
+    job = sampling.refinement(name, **params)
+    finished = job.done.is_set()
+    if finished and job.error is None:
+        last_good_results()[(fetcher.__name__, tuple(params.values()))] = (job.result, time.time())
+        st.caption("✅ Hasil exact (mode preview sudah diperbarui).")
+        return job.result
+    df = load_data(get_preview_data, f"{label} (preview)", name, tuple(sorted(params.items())))
+    if finished:
+        st.warning(f"⚠️ Hasil exact {label} gagal dihitung ({job.error}); menampilkan estimasi sampel.")
+    else:
+        st.info(
+            f"⚡ **Preview** — estimasi dari sampel {sampling.PREVIEW_SAMPLE_PERCENT:g}% data penjualan "
+            "(error bar = margin 95%; Game Count juga estimasi). "
+            "Hasil exact sedang dihitung dan akan menggantikannya otomatis."
+        )
+        pending_refinements.append(job)
+    return df
+
+def error_bar(df):
+    """Nama kolom margin jika df adalah hasil preview, untuk error_x/error_y Plotly"""
+    return queries.MARGIN if queries.MARGIN in df.columns else None
+
+def paged_dataframe(df, key, sort_by=None, ascending=False):
+    """st.dataframe dengan pagination server di atas TABLE_PAGINATE_ABOVE baris
+
+    Sort dan potong halaman dilakukan di server (rendering.page_slice), jadi
+    browser hanya menerima TABLE_PAGE_SIZE baris per rerun.
+    """
+    if len(df) <= rendering.TABLE_PAGINATE_ABOVE:
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        return
+    columns = list(df.columns)
+    pages = rendering.page_count(len(df))
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        sort_by = st.selectbox(
+            "Urutkan berdasarkan:", columns, index=columns.index(sort_by) if sort_by in columns else 0,
+            key=f"{key}_sort"
+        )
+    with col2:
+        ascending = st.radio(
+            "Arah:", [False, True], index=int(ascending), horizontal=True, key=f"{key}_ascending",
+            format_func=lambda a: "⬆️ Naik" if a else "⬇️ Turun"
+        )
+    with col3:
+        # Key ikut jumlah halaman agar nomor halaman kembali ke 1 saat ukuran data berubah
+        page_no = st.number_input(f"Halaman (dari {pages:,}):", 1, pages, 1, key=f"{key}_page_{pages}")
+    view = rendering.page_slice(df, sort_by, ascending, page_no)
+    st.dataframe(view, use_container_width=True, hide_index=True)
+    start = (page_no - 1) * rendering.TABLE_PAGE_SIZE
+    st.caption(f"Baris {start + 1:,}–{start + len(view):,} dari {len(df):,} (diurutkan dan dipaginasi di server).")
+
+def scatter_chart(df, x, y, size=None, text=None, **options):
+    """px.scatter dengan payload terbatas untuk data besar (ambang di rendering.py)
+
+    Di atas SCATTER_WEBGL_ABOVE titik trace memakai WebGL tanpa label teks; di
+    atas SCATTER_MAX_POINTS titik data di-decimate atau diagregasi menjadi
+    heatmap di server (SCATTER_MODE). Styling label sebaiknya memakai
+    `selector=dict(mode='markers+text')` karena trace-nya bisa berbeda.
+    """
+    px, go = plotting()
+    points = len(df)
+    if points > rendering.SCATTER_MAX_POINTS and rendering.SCATTER_MODE == "bin":
+        labels = options.get('labels', {})
+        x_centers, y_centers, z = rendering.bin2d(df, x, y, weight=size)
+        fig = go.Figure(go.Heatmap(
+            x=x_centers, y=y_centers, z=z,
+            colorscale=options.get('color_continuous_scale'),
+            colorbar=dict(title=labels.get(size, size) if size else 'Jumlah')
+        ))
+        fig.update_layout(title=options.get('title'), xaxis_title=labels.get(x, x), yaxis_title=labels.get(y, y))
+        st.caption(
+            f"🧮 {points:,} titik diagregasi di server ke grid {rendering.SCATTER_BINS}×{rendering.SCATTER_BINS} "
+            f"(warna = total {size or 'titik'} per sel)."
+        )
+        return fig
+    if points > rendering.SCATTER_MAX_POINTS:
+        df = rendering.decimate(df, x, y, size=size)
+        st.caption(f"🔻 Menampilkan {len(df):,} dari {points:,} titik (decimation grid, titik terbesar per sel).")
+    if points > rendering.SCATTER_WEBGL_ABOVE:
+        # Ribuan label teks tidak terbaca dan membengkakkan payload; WebGL untuk titik saja
+        text = None
+        options['render_mode'] = 'webgl'
+    return px.scatter(df, x=x, y=y, size=size, text=text, **options)
+
+@st.cache_resource(ttl=QUERIES["sales_detail_page_desc"].ttl)
+def get_sales_page(direction, after, region_id):
+    """Satu halaman detail penjualan (keyset), dibagi antar sesi"""
+    return rendering.sales_page(direction, after, region_id)
+
+@st.cache_data(ttl=QUERIES["sales_version"].ttl)
+def get_sales_version():
+    """Versi data fakta; engine analitik memuat ulang fakta hanya saat versi berubah"""
+    return analytics.engine().sync()
+
+def sync_sales_version():
+    """Sinkronkan engine analitik; saat timeout pakai fakta yang sudah dimuat (badge basi)"""
     try:
-        c.execute('''
-            SELECT 
-                p.publisher_name,
-                p.country,
-                COUNT(DISTINCT g.game_id) AS game_count,
-                ROUND(SUM(rs.sales_in_millions)::numeric, 2) AS total_sales
-            FROM regional_sales rs
-            JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
-            JOIN games g ON gr.game_id = g.game_id
-            JOIN publishers p ON g.publisher_id = p.publisher_id
-            WHERE p.publisher_id IS NOT NULL
-            GROUP BY p.publisher_id, p.publisher_name, p.country
-            ORDER BY total_sales DESC
-            LIMIT %s
-        ''', (limit,))
-        data = c.fetchall()
-        df = pd.DataFrame(data, columns=['Publisher', 'Country', 'Game Count', 'Total Sales (Millions)'])
-        df['Total Sales (Millions)'] = pd.to_numeric(df['Total Sales (Millions)'], errors='coerce')
-        df['Game Count'] = pd.to_numeric(df['Game Count'], errors='coerce')
-        return df
-    except Exception as e:
-        st.error(f"Error fetching publisher sales: {e}")
-        return pd.DataFrame()
+        return get_sales_version()
+    except QueryTimeout:
+        engine = analytics.engine()
+        if engine.facts is None:
+            raise
+        st.warning("🕰️ **Data basi** — cek versi data melebihi batas waktu; analisis memakai fakta terakhir yang dimuat.")
+        return engine.version
+
+if snapshot_bundle() is not None:
+    st.sidebar.caption(f"📦 Data dari snapshot {snapshot_bundle().label}")
 
 # ============================================================================
 # HALAMAN 1: RINGKASAN KESELURUHAN
@@ -225,18 +364,15 @@ if page == "🏠 Ringkasan Keseluruhan":
     st.header("📊 Ringkasan Keseluruhan")
     
     try:
-        # Key Metrics
-        c.execute('SELECT SUM(sales_in_millions) FROM regional_sales')
-        total_sales = c.fetchone()[0] or 0
-        
-        c.execute('SELECT COUNT(DISTINCT game_id) FROM games')
-        total_games = c.fetchone()[0] or 0
-        
-        c.execute('SELECT COUNT(DISTINCT publisher_id) FROM publishers')
-        total_publishers = c.fetchone()[0] or 0
-        
-        c.execute('SELECT COUNT(DISTINCT platform_id) FROM platforms')
-        total_platforms = c.fetchone()[0] or 0
+        # Key Metrics (satu query untuk keempat angka)
+        metrics = load_data(get_overview_metrics, "overview metrics").fillna(0)
+        if metrics.empty:
+            raise RuntimeError("metrik ringkasan tidak tersedia")
+        metrics = metrics.iloc[0]
+        total_sales = metrics['total_sales']
+        total_games = int(metrics['total_games'])
+        total_publishers = int(metrics['total_publishers'])
+        total_platforms = int(metrics['total_platforms'])
         
         # Display Metrics
         col1, col2, col3, col4 = st.columns(4)
@@ -276,13 +412,13 @@ if page == "🏠 Ringkasan Keseluruhan":
         
         with col1:
             st.subheader("🎯 Top 5 Games Terlaris")
-            top5_games = get_top_games_data(5)
+            top5_games = load_data(get_top_games_data, "top games", 5)
             if not top5_games.empty:
                 st.dataframe(top5_games, use_container_width=True, hide_index=True)
         
         with col2:
             st.subheader("🌍 Top 5 Region Penjualan")
-            regional_data = get_regional_sales_data()
+            regional_data = load_data(get_regional_sales_data, "regional sales")
             if not regional_data.empty:
                 top5_regions = regional_data.head(5)
                 st.dataframe(top5_regions, use_container_width=True, hide_index=True)
@@ -294,13 +430,14 @@ if page == "🏠 Ringkasan Keseluruhan":
 # HALAMAN 2: PENJUALAN REGIONAL
 # ============================================================================
 elif page == "🌍 Penjualan Regional":
+    px, go = plotting()
     st.header("🌍 Analisis Penjualan Regional")
     st.markdown("**Pertanyaan:** Bagaimana distribusi total penjualan antar benua?")
     st.markdown("**Narasi Kunci:** Menyoroti wilayah dominan dan wilayah yang memiliki potensi pertumbuhan.")
     
     st.markdown("---")
     
-    regional_data = get_regional_sales_data()
+    regional_data = load_data(get_regional_sales_data, "regional sales")
     
     if not regional_data.empty:
         col1, col2 = st.columns(2)
@@ -340,7 +477,10 @@ elif page == "🌍 Penjualan Regional":
         fig_sunburst = go.Figure(go.Sunburst(
             labels=['Total'] + regional_data['Region'].tolist(),
             parents=[''] + ['Total'] * len(regional_data),
-            values=[regional_data['Total Sales (Millions)'].sum()] + regional_data['Total Sales (Millions)'].tolist(),
+            # Array NumPy (bukan list) -> di-encode biner saat figure diserialisasi
+            values=np.concatenate((
+                [regional_data['Total Sales (Millions)'].sum()], regional_data['Total Sales (Millions)'].to_numpy()
+            )),
             marker=dict(
                 colorscale='Blues',
                 cmid=regional_data['Total Sales (Millions)'].median()
@@ -353,13 +493,52 @@ elif page == "🌍 Penjualan Regional":
         
         # Data Table
         st.subheader("📋 Detail Data Penjualan Regional")
-        regional_data_sorted = regional_data.sort_values('Total Sales (Millions)', ascending=False)
-        regional_data_sorted['Persentase'] = (
-            regional_data_sorted['Total Sales (Millions)'] / 
-            regional_data_sorted['Total Sales (Millions)'].sum() * 100
-        ).round(2)
+        regional_data_sorted = regional_data.sort_values('Total Sales (Millions)', ascending=False).assign(
+            Persentase=lambda d: (d['Total Sales (Millions)'] / d['Total Sales (Millions)'].sum() * 100).round(2)
+        )
         st.dataframe(regional_data_sorted, use_container_width=True, hide_index=True)
         
+        # Detail transaksi: keyset pagination langsung dari database (fakta tidak pernah dimuat utuh)
+        with st.expander("📋 Detail Transaksi Penjualan", expanded=False):
+            regions = {"Semua Region": 0}
+            regions.update((r.region_name, r.region_id) for r in config.view_dimensions().regions.records)
+            col1, col2 = st.columns(2)
+            with col1:
+                detail_region = st.selectbox("Region:", list(regions), key="sales_detail_region")
+            with col2:
+                detail_direction = st.radio(
+                    "Urutan:", ["desc", "asc"], horizontal=True, key="sales_detail_direction",
+                    format_func=lambda d: "⬇️ Penjualan tertinggi" if d == "desc" else "⬆️ Penjualan terendah"
+                )
+            # Stack cursor halaman yang sudah dilewati; di-reset saat filter/urutan berubah
+            filters = (detail_region, detail_direction)
+            if st.session_state.get("sales_detail_filters") != filters:
+                st.session_state["sales_detail_filters"] = filters
+                st.session_state["sales_detail_cursors"] = [None]
+            cursors = st.session_state["sales_detail_cursors"]
+            try:
+                detail_page, next_cursor = get_sales_page(detail_direction, cursors[-1], regions[detail_region])
+            except QueryCancelled:
+                detail_page, next_cursor = pd.DataFrame(), None
+            except Exception as e:
+                st.error(f"Error fetching sales detail: {e}")
+                detail_page, next_cursor = pd.DataFrame(), None
+            st.dataframe(detail_page, use_container_width=True, hide_index=True)
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col1:
+                if st.button("⬅️ Sebelumnya", disabled=len(cursors) == 1, key="sales_detail_prev"):
+                    cursors.pop()
+                    st.rerun()
+            with col2:
+                st.caption(
+                    f"Halaman {len(cursors):,} · {rendering.TABLE_PAGE_SIZE} baris per halaman "
+                    "(keyset pagination: biaya per halaman tetap berapa pun jauhnya halaman)."
+                )
+            with col3:
+                if st.button("Berikutnya ➡️", disabled=next_cursor is None, key="sales_detail_next"):
+                    cursors.append(next_cursor)
+                    st.rerun()
+        
         # Insights
         st.markdown("---")
         st.subheader("💡 Key Insights")
@@ -377,13 +556,14 @@ elif page == "🌍 Penjualan Regional":
 # HALAMAN 3: GAME PALING LARIS
 # ============================================================================
 elif page == "🎯 Game Paling Laris":
+    px, go = plotting()
     st.header("🎯 Game Paling Laris Secara Global")
     st.markdown("**Pertanyaan:** Game mana yang menghasilkan pendapatan global tertinggi?")
     st.markdown("**Narasi Kunci:** Menampilkan juara penjualan, memberikan fokus pada nama game dan angka penjualan.")
     
     st.markdown("---")
     
-    top_games = get_top_games_data(20)
+    top_games = load_data(get_top_games_data, "top games", 20)
     
     if not top_games.empty:
         # Lollipop Chart (OPTIMAL untuk ranking) - Urutkan descending
@@ -442,8 +622,7 @@ elif page == "🎯 Game Paling Laris":
         
         # Data Table
         st.subheader("📋 Detail Top 20 Games")
-        top_games_display = top_games.copy()
-        top_games_display['Ranking'] = range(1, len(top_games_display) + 1)
+        top_games_display = top_games.assign(Ranking=range(1, len(top_games) + 1))
         st.dataframe(
             top_games_display[['Ranking', 'Game', 'Publisher', 'Total Sales (Millions)']],
             use_container_width=True,
@@ -468,13 +647,14 @@ elif page == "🎯 Game Paling Laris":
 # HALAMAN 4: TREN GENRE
 # ============================================================================
 elif page == "📈 Tren Genre":
+    px, go = plotting()
     st.header("📈 Analisis Tren Genre")
     st.markdown("**Pertanyaan:** Genre mana yang paling populer dan menghasilkan penjualan tertinggi secara global?")
     st.markdown("**Narasi Kunci:** Menunjukkan porsi pasar setiap genre dalam total penjualan.")
     
     st.markdown("---")
     
-    genre_data = get_genre_sales_data()
+    genre_data = load_data(get_genre_sales_data, "genre sales", attribution)
     
     if not genre_data.empty:
         col1, col2 = st.columns(2)
@@ -496,7 +676,7 @@ elif page == "📈 Tren Genre":
             fig_treemap = go.Figure(go.Treemap(
                 labels=genre_data['Genre'].tolist(),
                 parents=[''] * len(genre_data),
-                values=genre_data['Total Sales (Millions)'].tolist(),
+                values=genre_data['Total Sales (Millions)'].to_numpy(),
                 marker=dict(
                     colorscale='RdYlGn',
                     cmid=genre_data['Total Sales (Millions)'].median(),
@@ -534,12 +714,10 @@ elif page == "📈 Tren Genre":
         
         # Data Table
         st.subheader("📋 Detail Penjualan per Genre")
-        genre_data_sorted = genre_data.sort_values('Total Sales (Millions)', ascending=False)
-        genre_data_sorted['Persentase'] = (
-            genre_data_sorted['Total Sales (Millions)'] / 
-            genre_data_sorted['Total Sales (Millions)'].sum() * 100
-        ).round(2)
-        st.dataframe(genre_data_sorted, use_container_width=True, hide_index=True)
+        genre_data_sorted = genre_data.sort_values('Total Sales (Millions)', ascending=False).assign(
+            Persentase=lambda d: (d['Total Sales (Millions)'] / d['Total Sales (Millions)'].sum() * 100).round(2)
+        )
+        paged_dataframe(genre_data_sorted, 'genre_table', sort_by='Total Sales (Millions)')
         
         # Insights
         st.markdown("---")
@@ -559,13 +737,14 @@ elif page == "📈 Tren Genre":
 # HALAMAN 5: KINERJA PLATFORM
 # ============================================================================
 elif page == "🖥️ Kinerja Platform":
+    px, go = plotting()
     st.header("🖥️ Analisis Kinerja Platform")
     st.markdown("**Pertanyaan:** Platform mana yang mendominasi pasar saat ini atau selama periode tertentu?")
     st.markdown("**Narasi Kunci:** Membandingkan kekuatan pasar antar konsol/PC.")
     
     st.markdown("---")
     
-    platform_data = get_platform_sales_data()
+    platform_data = load_progressive(get_platform_sales_data, "platform sales", "platform_sales")
     
     if not platform_data.empty:
         col1, col2 = st.columns(2)
@@ -581,7 +760,8 @@ elif page == "🖥️ Kinerja Platform":
                 text='Total Sales (Millions)',
                 title='📊 Platform Market Performance',
                 labels={'Total Sales (Millions)': 'Penjualan (M$)'},
-                hover_data=['Code', 'Game Count']
+                hover_data=['Code', 'Game Count'],
+                error_x=error_bar(platform_data)
             )
             fig_bar.update_traces(textposition='outside', texttemplate='$%{x:.2f}M')
             fig_bar.update_layout(height=600, showlegend=False)
@@ -589,7 +769,7 @@ elif page == "🖥️ Kinerja Platform":
         
         # Bubble Chart (Games Count vs Sales) - lebih informatif
         with col2:
-            fig_bubble = px.scatter(
+            fig_bubble = scatter_chart(
                 platform_data,
                 x='Game Count',
                 y='Total Sales (Millions)',
@@ -599,9 +779,10 @@ elif page == "🖥️ Kinerja Platform":
                 text='Platform',
                 title='🔵 Platform Efficiency: Games Count vs Sales',
                 labels={'Game Count': 'Jumlah Game', 'Total Sales (Millions)': 'Total Sales (M$)'},
+                error_y=error_bar(platform_data),
                 size_max=60
             )
-            fig_bubble.update_traces(textposition='top center', textfont_size=10)
+            fig_bubble.update_traces(textposition='top center', textfont_size=10, selector=dict(mode='markers+text'))
             fig_bubble.update_layout(height=500, hovermode='closest')
             st.plotly_chart(fig_bubble, use_container_width=True)
         
@@ -609,12 +790,10 @@ elif page == "🖥️ Kinerja Platform":
         
         # Data Table
         st.subheader("📋 Detail Kinerja Platform")
-        platform_data_sorted = platform_data.sort_values('Total Sales (Millions)', ascending=False)
-        platform_data_sorted['Persentase'] = (
-            platform_data_sorted['Total Sales (Millions)'] / 
-            platform_data_sorted['Total Sales (Millions)'].sum() * 100
-        ).round(2)
-        st.dataframe(platform_data_sorted, use_container_width=True, hide_index=True)
+        platform_data_sorted = platform_data.sort_values('Total Sales (Millions)', ascending=False).assign(
+            Persentase=lambda d: (d['Total Sales (Millions)'] / d['Total Sales (Millions)'].sum() * 100).round(2)
+        )
+        paged_dataframe(platform_data_sorted, 'platform_table', sort_by='Total Sales (Millions)')
         
         # Insights
         st.markdown("---")
@@ -622,7 +801,7 @@ elif page == "🖥️ Kinerja Platform":
         top_platform = platform_data.loc[platform_data['Total Sales (Millions)'].idxmax()]
         st.markdown(f"""
         - **Platform Dominan:** {top_platform['Platform']} dengan penjualan ${top_platform['Total Sales (Millions)']:,.2f}M
-        - **Jumlah Game:** {int(top_platform['Game Count'])} game
+        - **Jumlah Game:** {"≈" if error_bar(platform_data) else ""}{int(top_platform['Game Count'])} game
         - **Total Penjualan Semua Platform:** ${platform_data['Total Sales (Millions)'].sum():,.2f}M
         - **Rata-rata Penjualan per Platform:** ${platform_data['Total Sales (Millions)'].mean():,.2f}M
         """)
@@ -634,17 +813,19 @@ elif page == "🖥️ Kinerja Platform":
 # HALAMAN 6: KORELASI GENRE-PLATFORM
 # ============================================================================
 elif page == "🔗 Korelasi Genre-Platform":
+    px, go = plotting()
     st.header("🔗 Analisis Korelasi Genre-Platform")
     st.markdown("**Pertanyaan:** Genre apa yang paling laris di Platform tertentu?")
     st.markdown("**Narasi Kunci:** Mengidentifikasi kecocokan pasar (misalnya, Sports mendominasi di PS5, Strategy di PC).")
     
     st.markdown("---")
     
-    genre_platform_data = get_genre_platform_sales_data()
+    genre_platform_data = load_progressive(
+        get_genre_platform_sales_data, "genre-platform sales", "genre_platform_sales", attribution=attribution
+    )
     
     if not genre_platform_data.empty:
-        # Get top platforms - convert to numeric first
-        genre_platform_data['Total Sales (Millions)'] = pd.to_numeric(genre_platform_data['Total Sales (Millions)'], errors='coerce')
+        # Get top platforms (kolom sales sudah numerik dari registry query)
         top_platforms = genre_platform_data.groupby('Platform')['Total Sales (Millions)'].sum().nlargest(10).index.tolist()
         
         col1, col2 = st.columns([1, 1])
@@ -677,6 +858,7 @@ elif page == "🔗 Korelasi Genre-Platform":
             color='Genre',
             title=f'📊 Genre Sales Distribution - {title_suffix}',
             labels={'Total Sales (Millions)': 'Penjualan (M$)'},
+            error_y=error_bar(filtered_data),
             barmode='group',
             height=600
         )
@@ -701,7 +883,8 @@ elif page == "🔗 Korelasi Genre-Platform":
                     color_continuous_scale='Purples',
                     text='Total Sales (Millions)',
                     title=f'📊 Genre Ranking di {selected_platform}',
-                    labels={'Total Sales (Millions)': 'Penjualan (M$)'}
+                    labels={'Total Sales (Millions)': 'Penjualan (M$)'},
+                    error_x=error_bar(selected_data)
                 )
                 fig_bar.update_traces(textposition='outside', texttemplate='$%{x:.2f}M')
                 fig_bar.update_layout(height=500, showlegend=False)
@@ -724,7 +907,7 @@ elif page == "🔗 Korelasi Genre-Platform":
         # Data Table
         st.subheader("📋 Detail Genre-Platform Sales")
         display_data = genre_platform_data.sort_values('Total Sales (Millions)', ascending=False)
-        st.dataframe(display_data, use_container_width=True, hide_index=True)
+        paged_dataframe(display_data, 'genre_platform_table', sort_by='Total Sales (Millions)')
         
         # Insights
         st.markdown("---")
@@ -745,13 +928,14 @@ elif page == "🔗 Korelasi Genre-Platform":
 # HALAMAN 7: KINERJA PENERBIT
 # ============================================================================
 elif page == "🏢 Kinerja Penerbit":
+    px, go = plotting()
     st.header("🏢 Analisis Kinerja Penerbit")
     st.markdown("**Pertanyaan:** Publisher mana yang paling sukses dalam hal volume penjualan?")
     st.markdown("**Narasi Kunci:** Membandingkan performa publisher secara langsung.")
     
     st.markdown("---")
     
-    publisher_data = get_publisher_sales_data(20)
+    publisher_data = load_progressive(get_publisher_sales_data, "publisher sales", "publisher_sales", limit=20)
     
     if not publisher_data.empty:
         # Bar Chart (PRIMARY - untuk ranking)
@@ -764,7 +948,8 @@ elif page == "🏢 Kinerja Penerbit":
             text='Total Sales (Millions)',
             title='📊 Top 20 Publishers by Sales Volume',
             labels={'Total Sales (Millions)': 'Penjualan (M$)'},
-            hover_data=['Country', 'Game Count']
+            hover_data=['Country', 'Game Count'],
+            error_x=error_bar(publisher_data)
         )
         fig_bar.update_traces(textposition='outside', texttemplate='$%{x:.2f}M')
         fig_bar.update_layout(height=700, showlegend=False)
@@ -776,7 +961,7 @@ elif page == "🏢 Kinerja Penerbit":
         
         with col1:
             # Bubble Chart: Games Count vs Sales (untuk efficiency analysis)
-            fig_bubble = px.scatter(
+            fig_bubble = scatter_chart(
                 publisher_data,
                 x='Game Count',
                 y='Total Sales (Millions)',
@@ -787,9 +972,10 @@ elif page == "🏢 Kinerja Penerbit":
                 title='🔵 Publisher Efficiency: Games vs Sales',
                 labels={'Game Count': 'Jumlah Game Dirilis', 'Total Sales (Millions)': 'Total Sales (M$)'},
                 hover_data=['Country'],
+                error_y=error_bar(publisher_data),
                 size_max=50
             )
-            fig_bubble.update_traces(textposition='top center', textfont_size=9)
+            fig_bubble.update_traces(textposition='top center', textfont_size=9, selector=dict(mode='markers+text'))
             fig_bubble.update_layout(height=500, hovermode='closest')
             st.plotly_chart(fig_bubble, use_container_width=True)
         
@@ -817,17 +1003,17 @@ elif page == "🏢 Kinerja Penerbit":
         
         # Data Table
         st.subheader("📋 Detail Top 20 Publishers")
-        pub_display = publisher_data.copy()
-        pub_display['Ranking'] = range(1, len(pub_display) + 1)
-        pub_display_sorted = pub_display.sort_values('Total Sales (Millions)', ascending=False)
-        pub_display_sorted['Persentase'] = (
-            pub_display_sorted['Total Sales (Millions)'] / 
-            pub_display_sorted['Total Sales (Millions)'].sum() * 100
-        ).round(2)
-        st.dataframe(
-            pub_display_sorted[['Ranking', 'Publisher', 'Country', 'Game Count', 'Total Sales (Millions)', 'Persentase']],
-            use_container_width=True,
-            hide_index=True
+        pub_display_sorted = publisher_data.assign(
+            Ranking=range(1, len(publisher_data) + 1),
+            Persentase=lambda d: (d['Total Sales (Millions)'] / d['Total Sales (Millions)'].sum() * 100).round(2)
+        ).sort_values('Total Sales (Millions)', ascending=False)
+        paged_dataframe(
+            pub_display_sorted[
+                ['Ranking', 'Publisher', 'Country', 'Game Count', 'Total Sales (Millions)', 'Persentase']
+                + ([queries.MARGIN] if error_bar(pub_display_sorted) else [])
+            ],
+            'publisher_table',
+            sort_by='Total Sales (Millions)'
         )
         
         # Insights
@@ -836,7 +1022,7 @@ elif page == "🏢 Kinerja Penerbit":
         top_pub = publisher_data.iloc[0]
         st.markdown(f"""
         - **Publisher Terbaik:** {top_pub['Publisher']} ({top_pub['Country']}) dengan penjualan ${top_pub['Total Sales (Millions)']:,.2f}M
-        - **Jumlah Game:** {int(top_pub['Game Count'])} game
+        - **Jumlah Game:** {"≈" if error_bar(publisher_data) else ""}{int(top_pub['Game Count'])} game
         - **Total Penjualan Top 5 Publishers:** ${publisher_data.head(5)['Total Sales (Millions)'].sum():,.2f}M
         - **Rata-rata Penjualan per Publisher:** ${publisher_data['Total Sales (Millions)'].mean():,.2f}M
         - **Efisiensi Tertinggi:** {publisher_data.assign(efficiency=publisher_data['Total Sales (Millions)']/publisher_data['Game Count']).nlargest(1, 'efficiency')['Publisher'].values[0]}
@@ -845,6 +1031,261 @@ elif page == "🏢 Kinerja Penerbit":
     else:
         st.warning("Tidak ada data publisher yang ditemukan.")
 
+# ============================================================================
+# HALAMAN 8: KONSENTRASI PASAR
+# ============================================================================
+elif page == "📐 Konsentrasi Pasar":
+    px, go = plotting()
+    st.header("📐 Analisis Konsentrasi Pasar")
+    st.markdown("**Pertanyaan:** Seberapa terkonsentrasi penjualan pada segelintir publisher, platform, genre atau game?")
+    st.markdown("**Narasi Kunci:** HHI, CR4/CR8, kurva Pareto/Lorenz dan Gini dihitung dari seluruh data penjualan.")
+    
+    st.markdown("---")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        dimension = st.selectbox(
+            "Dimensi:", list(analytics.DIMENSIONS),
+            format_func=lambda d: {"publisher": "Publisher", "platform": "Platform", "genre": "Genre", "game": "Game"}[d]
+        )
+    with col2:
+        by = st.radio(
+            "Kelompokkan per:", list(analytics.GROUPINGS), horizontal=True,
+            format_func=lambda b: {"total": "Global", "region": "Region", "year": "Tahun Rilis"}[b]
+        )
+    
+    try:
+        sync_sales_version()
+        engine = analytics.engine()
+        summary = engine.summary(dimension, by, attribution)
+    except Exception as e:
+        st.error(f"Error computing concentration metrics: {e}")
+        summary = pd.DataFrame()
+    
+    if not summary.empty:
+        group = st.selectbox("Grup untuk kurva:", summary['Group'].tolist()) if by != "total" else None
+        row = summary.iloc[summary['Group'].tolist().index(group) if group else 0]
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("📊 HHI", f"{row['HHI']:,.0f}", analytics.hhi_level(row['HHI']), delta_color="off")
+        with col2:
+            st.metric("🥇 CR4", f"{row['CR4'] * 100:.1f}%")
+        with col3:
+            st.metric("🏅 CR8", f"{row['CR8'] * 100:.1f}%")
+        with col4:
+            st.metric("⚖️ Gini", f"{row['Gini']:.3f}")
+        
+        st.markdown("---")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Kurva Pareto: bar sales + garis share kumulatif
+            pareto = engine.pareto(dimension, by, group, attribution)
+            fig_pareto = go.Figure()
+            fig_pareto.add_trace(go.Bar(
+                x=pareto['Entity'], y=pareto['Total Sales (Millions)'], name='Penjualan (M$)',
+                marker_color='#667eea'
+            ))
+            fig_pareto.add_trace(go.Scatter(
+                x=pareto['Entity'], y=pareto['Cumulative Share'] * 100, name='Kumulatif (%)',
+                yaxis='y2', mode='lines+markers', line=dict(color='#e45756')
+            ))
+            fig_pareto.add_hline(y=analytics.PARETO_SHARE * 100, line_dash='dash', line_color='gray', yref='y2')
+            fig_pareto.update_layout(
+                title='📈 Kurva Pareto',
+                yaxis=dict(title='Penjualan (M$)'),
+                yaxis2=dict(title='Share Kumulatif (%)', overlaying='y', side='right', range=[0, 105]),
+                height=500, xaxis_tickangle=-45, legend=dict(orientation='h', y=1.1)
+            )
+            st.plotly_chart(fig_pareto, use_container_width=True)
+        
+        with col2:
+            # Kurva Lorenz vs garis kesetaraan sempurna
+            lorenz = engine.lorenz(dimension, by, group, attribution)
+            fig_lorenz = go.Figure()
+            fig_lorenz.add_trace(go.Scatter(
+                x=lorenz['Entity Share'], y=lorenz['Sales Share'], name='Lorenz',
+                mode='lines', fill='tozeroy', line=dict(color='#764ba2')
+            ))
+            fig_lorenz.add_trace(go.Scatter(
+                x=[0, 1], y=[0, 1], name='Kesetaraan', mode='lines', line=dict(color='gray', dash='dash')
+            ))
+            fig_lorenz.update_layout(
+                title=f'🌀 Kurva Lorenz (Gini {row["Gini"]:.3f})',
+                xaxis=dict(title='Share Entitas', tickformat='.0%'),
+                yaxis=dict(title='Share Penjualan', tickformat='.0%'),
+                height=500, legend=dict(orientation='h', y=1.1)
+            )
+            st.plotly_chart(fig_lorenz, use_container_width=True)
+        
+        if by != "total":
+            st.markdown("---")
+            fig_hhi = px.bar(
+                summary, x='Group', y='HHI', color='Gini', color_continuous_scale='Purples',
+                title='📊 HHI per Grup', labels={'Group': 'Grup'}, hover_data=['CR4', 'CR8', 'Entities']
+            )
+            fig_hhi.update_layout(height=450)
+            st.plotly_chart(fig_hhi, use_container_width=True)
+        
+        st.markdown("---")
+        
+        # Data Table
+        st.subheader("📋 Metrik Konsentrasi")
+        paged_dataframe(
+            summary.round({'Total Sales (Millions)': 2, 'HHI': 0, 'CR4': 3, 'CR8': 3, 'Pareto 80% (Share)': 3, 'Gini': 3}),
+            'concentration_table'
+        )
+        
+        # Insights
+        st.markdown("---")
+        st.subheader("💡 Key Insights")
+        st.markdown(f"""
+        - **Tingkat Konsentrasi:** {analytics.hhi_level(row['HHI'])} (HHI {row['HHI']:,.0f})
+        - **Dominasi Top 4:** {row['CR4'] * 100:.1f}% penjualan dikuasai 4 {dimension} teratas
+        - **Aturan 80/20:** {int(row['Pareto 80% (Entities)'])} dari {int(row['Entities'])} {dimension} ({row['Pareto 80% (Share)'] * 100:.0f}%) menghasilkan 80% penjualan
+        - **Ketimpangan (Gini):** {row['Gini']:.3f}
+        """)
+    
+    else:
+        st.warning("Tidak ada data penjualan untuk analisis konsentrasi.")
+
+# ============================================================================
+# HALAMAN 9: CO-OCCURRENCE GENRE & PLATFORM
+# ============================================================================
+elif page == "🧩 Co-occurrence Genre & Platform":
+    px, go = plotting()
+    st.header("🧩 Co-occurrence Genre & Overlap Platform")
+    st.markdown("**Pertanyaan:** Genre apa yang sering muncul bersama, dan seberapa eksklusif katalog tiap platform?")
+    st.markdown("**Narasi Kunci:** Matriks dihitung dari incidence game×genre dan game×platform dengan produk matriks sparse.")
+    
+    st.markdown("---")
+    
+    try:
+        sync_sales_version()
+        # scipy.sparse hanya dimuat saat halaman ini dibuka (lihat startup_profile.py)
+        import cooccurrence
+        engine = cooccurrence.engine()
+    except Exception as e:
+        st.error(f"Error building co-occurrence matrices: {e}")
+        engine = None
+    
+    if engine is not None:
+        # Genre co-occurrence heatmap
+        metric = st.radio(
+            "Ukuran co-occurrence genre:", ["count", "jaccard", "sales"], horizontal=True,
+            format_func=lambda m: {"count": "Jumlah Game", "jaccard": "Jaccard", "sales": "Berbobot Sales (M$)"}[m]
+        )
+        genre_cooc = engine.genre_cooccurrence(metric)
+        fig_genre = px.imshow(
+            genre_cooc,
+            text_auto='.2f' if metric == "jaccard" else '.0f',
+            color_continuous_scale='Purples',
+            title='🧬 Genre Co-occurrence',
+            labels={'x': 'Genre', 'y': 'Genre', 'color': 'Nilai'},
+            aspect='auto'
+        )
+        fig_genre.update_layout(height=550)
+        st.plotly_chart(fig_genre, use_container_width=True)
+        
+        st.markdown("---")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Overlap platform: share game baris yang juga ada di platform kolom
+            overlap = engine.platform_overlap()
+            fig_overlap = px.imshow(
+                overlap * 100,
+                text_auto='.0f',
+                color_continuous_scale='Blues',
+                title='🔀 Platform Overlap (% game baris juga rilis di kolom)',
+                labels={'x': 'Platform', 'y': 'Platform', 'color': '%'},
+                aspect='auto'
+            )
+            fig_overlap.update_layout(height=550)
+            st.plotly_chart(fig_overlap, use_container_width=True)
+        
+        with col2:
+            exclusivity = engine.platform_exclusivity()
+            fig_excl = px.bar(
+                exclusivity.sort_values('Exclusivity', ascending=True),
+                y='Platform',
+                x='Exclusivity',
+                color='Exclusivity',
+                color_continuous_scale='Oranges',
+                text='Exclusive Games',
+                title='🔒 Rasio Game Eksklusif per Platform',
+                labels={'Exclusivity': 'Rasio Eksklusif'},
+                hover_data=['Games', 'Exclusive Games']
+            )
+            fig_excl.update_layout(height=550, showlegend=False, xaxis_tickformat='.0%')
+            st.plotly_chart(fig_excl, use_container_width=True)
+        
+        st.markdown("---")
+        
+        # Afinitas genre x platform berbobot sales
+        affinity = engine.genre_platform_affinity("lift")
+        fig_affinity = px.imshow(
+            affinity,
+            text_auto='.2f',
+            color_continuous_scale='RdBu',
+            color_continuous_midpoint=1.0,
+            title='🎯 Afinitas Genre × Platform (lift penjualan, 1.0 = sesuai proporsi)',
+            labels={'x': 'Platform', 'y': 'Genre', 'color': 'Lift'},
+            aspect='auto'
+        )
+        fig_affinity.update_layout(height=550)
+        st.plotly_chart(fig_affinity, use_container_width=True)
+        
+        # Data Table
+        st.subheader("📋 Detail Eksklusivitas Platform")
+        paged_dataframe(exclusivity, 'exclusivity_table')
+        
+        # Insights
+        st.markdown("---")
+        st.subheader("💡 Key Insights")
+        pairs = genre_cooc.stack()
+        pairs = pairs[[a < b for a, b in pairs.index]]  # tiap pasangan sekali, tanpa diagonal
+        top_pair = pairs.idxmax() if not pairs.empty and pairs.max() > 0 else None
+        best_affinity = affinity.stack().idxmax()
+        most_exclusive = exclusivity.iloc[0] if not exclusivity.empty else None
+        st.markdown(f"""
+        - **Pasangan Genre Terkuat:** {f"{top_pair[0]} + {top_pair[1]}" if top_pair else "-"}
+        - **Afinitas Genre-Platform Tertinggi:** {best_affinity[0]} di {best_affinity[1]} (lift {affinity.stack().max():.2f})
+        - **Platform Paling Eksklusif:** {most_exclusive['Platform'] if most_exclusive is not None else "-"}
+        """)
+
+# ============================================================================
+# PEMAKAIAN MEMORI
+# ============================================================================
+if show_memory:
+    st.markdown("---")
+    st.subheader("🧠 Pemakaian Memori")
+    cached = {key: df for key, (df, _) in last_good_results().items()}
+    # Modul co-occurrence belum di-import = matriksnya belum pernah dibangun di proses ini
+    cooccurrence = sys.modules.get("cooccurrence")
+    shared_sizes = {key: memory.deep_size(df) for key, df in cached.items()}
+    datasets = memory.frame_report({f"{name}{args if args else ''}": df for (name, args), df in cached.items()})
+    engines = memory.frame_report({
+        label: obj for label, obj in [
+            ("analytics: fakta penjualan", analytics.engine().facts),
+            ("co-occurrence: matriks junction", cooccurrence.engine().matrices if cooccurrence else None),
+            ("snapshot bundle", snapshot_bundle()),
+        ] if obj is not None
+    })
+    sessions = memory.session_report(shared_sizes, VIEWED_DATASETS)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Dataset ter-cache", f"{datasets['Memory (KiB)'].sum():,.1f} KiB", f"{len(datasets)} entri", delta_color="off")
+    col2.metric("Engine & snapshot", f"{engines['Memory (KiB)'].sum():,.1f} KiB", delta_color="off")
+    col3.metric("State sesi", f"{sessions['Own State (KiB)'].sum():,.1f} KiB", f"{len(sessions)} sesi", delta_color="off")
+    st.markdown("**Per entri cache** (dibagi semua sesi)")
+    st.dataframe(pd.concat([datasets, engines], ignore_index=True), use_container_width=True, hide_index=True)
+    st.markdown("**Per sesi**")
+    st.dataframe(sessions, use_container_width=True, hide_index=True)
+
 # ============================================================================
 # FOOTER
 # ============================================================================
@@ -855,3 +1296,11 @@ st.markdown("""
     <p>Built with Streamlit & Plotly | Last Updated: December 2025</p>
 </div>
 """, unsafe_allow_html=True)
+
+# Progressive refinement: setelah halaman preview tampil, tunggu hasil exact lalu rerun
+# (dihentikan lebih awal jika user sudah pindah halaman / klik widget)
+if pending_refinements:
+    with st.spinner("⏳ Menghitung hasil exact di background..."):
+        refined = sampling.wait(pending_refinements, rerun_requested)
+    if refined:
+        st.rerun()
@@ -0,0 +1,149 @@
+"""
+Akuntansi memori hasil ter-cache dan representasi DataFrame yang ringkas.
+
+`compact()` dipakai queries.run_query agar setiap DataFrame hasil query
+langsung memakai dtype hemat memori:
+
+    float64 -> float32      jika nilai tetap sama sampai 3 desimal
+    int64   -> int32        jika rentang nilainya muat
+    object  -> category     jika banyak nilai berulang (<= CATEGORY_RATIO unik)
+            -> string[pyarrow] selain itu
+
+`deep_size()` dan fungsi laporan di bawah dipakai panel "🧠 Pemakaian
+Memori" di main.py (per entri cache dan per sesi Streamlit).
+"""
+import sys
+import uuid
+import weakref
+
+import numpy as np
+import pandas as pd
+
+CATEGORY_RATIO = 0.5
+SESSION_MARKER = "_memory_session"
+FLOAT32_TOLERANCE = 5e-4
+_INT32 = np.iinfo(np.int32)
+
+
+# ============================================================================
+# DTYPE RINGKAS
+# ============================================================================
+def compact(df, category_ratio=CATEGORY_RATIO):
+    """DataFrame dengan kolom di-downcast; nilai yang tampil di dashboard tidak berubah"""
+    columns = {}
+    for name, col in df.items():
+        kind = col.dtype.kind
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            # Sudah ringkas (mis. kolom label dictionary dari columnar.py); kind-nya juga "O"
+            continue
+        if kind == "f":
+            small = col.astype(np.float32)
+            if np.allclose(small, col, rtol=0, atol=FLOAT32_TOLERANCE, equal_nan=True):
+                columns[name] = small
+        elif kind in "iu" and col.dtype.itemsize > 4:
+            if col.empty or (col.min() >= _INT32.min and col.max() <= _INT32.max):
+                columns[name] = col.astype(np.int32)
+        elif kind == "O" or pd.api.types.is_string_dtype(col.dtype):
+            if len(col) and col.nunique() <= len(col) * category_ratio:
+                columns[name] = col.astype("category")
+            elif kind == "O":
+                columns[name] = col.astype(pd.StringDtype("pyarrow"))
+    return df.assign(**columns) if columns else df
+
+
+# ============================================================================
+# UKURAN MEMORI
+# ============================================================================
+def deep_size(obj, _seen=None):
+    """Perkiraan byte yang ditahan obj (DataFrame, tabel Arrow, array, container, record)"""
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        usage = obj.memory_usage(deep=True, index=True)
+        return int(usage.sum() if isinstance(obj, pd.DataFrame) else usage)
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes if obj.base is None or id(obj.base) not in seen else 0
+    if hasattr(obj, "nbytes") and hasattr(obj, "schema"):
+        # pyarrow.Table / RecordBatch (buffer memory-mapped ikut dihitung)
+        return obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif not isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        for attr in getattr(type(obj), "__slots__", ()):
+            size += deep_size(getattr(obj, attr, None), seen)
+        if hasattr(obj, "__dict__") and not isinstance(obj, type):
+            size += deep_size(vars(obj), seen)
+    return size
+
+
+def frame_report(frames):
+    """Satu baris per entri {label: DataFrame}: baris, byte dalam, ringkasan dtype"""
+    rows = []
+    for label, df in frames.items():
+        dtypes = df.dtypes.astype(str).value_counts() if isinstance(df, pd.DataFrame) else None
+        rows.append({
+            "Entry": label,
+            "Rows": len(df) if hasattr(df, "__len__") else None,
+            "Memory (KiB)": deep_size(df) / 1024,
+            "Dtypes": ", ".join(f"{n}×{t}" for t, n in dtypes.items()) if dtypes is not None else type(df).__name__,
+        })
+    return pd.DataFrame(rows, columns=["Entry", "Rows", "Memory (KiB)", "Dtypes"]).astype({"Rows": "Int64"})
+
+
+class SessionMarker:
+    """Penanda satu sesi Streamlit, disimpan di session_state sesi itu sendiri
+
+    Hidup selama state sesi hidup, jadi WeakSet _SESSIONS berisi tepat sesi
+    yang state-nya masih ditahan server (tanpa API internal Streamlit).
+    """
+
+    __slots__ = ("id", "values", "__weakref__")
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:8]
+        self.values = {}
+
+
+_SESSIONS = weakref.WeakSet()
+
+
+def register_session(state):
+    """Daftarkan sesi pemilik `state` (st.session_state); dipanggil di awal setiap run
+
+    Rujukan (bukan salinan) nilai state run terakhir disimpan di penanda agar
+    session_report bisa membacanya dari thread sesi lain.
+    """
+    marker = state.get(SESSION_MARKER)
+    if marker is None:
+        marker = state[SESSION_MARKER] = SessionMarker()
+        _SESSIONS.add(marker)
+    marker.values = {key: value for key, value in state.items() if key != SESSION_MARKER}
+    return marker
+
+
+def session_report(shared_sizes, viewed_key):
+    """Satu baris per sesi Streamlit aktif: state sesi sendiri + dataset bersama yang dipakainya
+
+    `shared_sizes` = {kunci dataset: byte}; `viewed_key` = kunci session_state
+    berisi set kunci dataset yang dirender sesi itu. Hanya sesi yang terdaftar
+    lewat register_session yang dilaporkan.
+    """
+    rows = []
+    for marker in list(_SESSIONS):
+        values = marker.values
+        viewed = values.get(viewed_key, ())
+        rows.append({
+            "Session": marker.id,
+            "State Keys": len(values),
+            "Own State (KiB)": deep_size(values) / 1024,
+            "Datasets": len(viewed),
+            "Shared Datasets (KiB)": sum(shared_sizes.get(key, 0) for key in viewed) / 1024,
+        })
+    return pd.DataFrame(
+        rows, columns=["Session", "State Keys", "Own State (KiB)", "Datasets", "Shared Datasets (KiB)"]
+    )
@@ -0,0 +1,308 @@
+"""
+Query-plan regression guard: menjalankan setiap query di registry
+queries.QUERIES (halaman, preview, analitik, laporan, detail keyset) dengan
+EXPLAIN (ANALYZE, BUFFERS) pada beberapa skala data, menyimpan pohon plan
+yang dinormalisasi, lalu membandingkannya dengan snapshot baseline.
+
+Query kolumnar di-EXPLAIN dalam bentuk yang benar-benar dikirim ke server:
+SQL terkemas `<nama>_packed` (dashboard) dan SELECT di dalam COPY (tool CLI),
+kunci snapshot diberi akhiran [packed] / [copy].
+
+Data diskalakan di schema sementara (`plan_guard_s<N>`) dengan menggandakan
+games/releases/sales dari schema public sebanyak N kali, jadi jalankan pada
+PostgreSQL lokal yang sudah diisi dbrev.sql + data1.sql.
+
+    python plan_guard.py --update          # tulis baseline baru
+    python plan_guard.py                   # bandingkan, exit 1 jika ada regresi
+    python plan_guard.py --scales 1,10,50  # skala kustom
+"""
+import argparse
+import json
+import os
+
+import psycopg2
+
+import columnar
+import config
+import queries
+import rendering
+import sampling
+from queries import PAGE_QUERIES, QUERIES
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plan_snapshots", "baseline.json")
+
+DIMENSION_TABLES = ["genres", "platforms", "publishers", "regions"]
+# Disalin apa adanya bersama tabel dimensi (baris versi untuk query sales_version)
+VERSION_TABLES = ["data_versions"]
+
+# Tabel fakta digandakan dengan offset ID per salinan k (0..N-1)
+_SCALE_SQL = '''
+    INSERT INTO {s}.games (game_id, game_name, publisher_id)
+    SELECT g.game_id + k * m.g, g.game_name || CASE WHEN k = 0 THEN '' ELSE ' #' || k END, g.publisher_id
+    FROM public.games g, generate_series(0, %(n)s - 1) k, (SELECT MAX(game_id) AS g FROM public.games) m;
+
+    INSERT INTO {s}.game_genres (game_id, genre_id)
+    SELECT gg.game_id + k * m.g, gg.genre_id
+    FROM public.game_genres gg, generate_series(0, %(n)s - 1) k, (SELECT MAX(game_id) AS g FROM public.games) m;
+
+    INSERT INTO {s}.game_releases (game_release_id, game_id, platform_id, release_year)
+    SELECT gr.game_release_id + k * m.r, gr.game_id + k * m.g, gr.platform_id, gr.release_year
+    FROM public.game_releases gr, generate_series(0, %(n)s - 1) k,
+         (SELECT (SELECT MAX(game_id) FROM public.games) AS g,
+                 (SELECT MAX(game_release_id) FROM public.game_releases) AS r) m;
+
+    INSERT INTO {s}.regional_sales (sale_id, game_release_id, region_id, sales_in_millions)
+    SELECT rs.sale_id + k * m.s, rs.game_release_id + k * m.r, rs.region_id,
+           ROUND((rs.sales_in_millions * (0.5 + random()))::numeric, 2)
+    FROM public.regional_sales rs, generate_series(0, %(n)s - 1) k,
+         (SELECT (SELECT MAX(game_release_id) FROM public.game_releases) AS r,
+                 (SELECT MAX(sale_id) FROM public.regional_sales) AS s) m;
+'''
+
+FACT_TABLES = ["games", "game_genres", "game_releases", "regional_sales"]
+
+
+# ============================================================================
+# SEED DATA PER SKALA
+# ============================================================================
+def seed_scale(conn, scale):
+    """Buat schema plan_guard_s<scale> berisi data public yang digandakan"""
+    schema = f"plan_guard_s{scale}"
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        cur.execute(f"CREATE SCHEMA {schema}")
+        for table in DIMENSION_TABLES + VERSION_TABLES + FACT_TABLES:
+            cur.execute(f"CREATE TABLE {schema}.{table} (LIKE public.{table} INCLUDING ALL)")
+        for table in DIMENSION_TABLES + VERSION_TABLES:
+            cur.execute(f"INSERT INTO {schema}.{table} SELECT * FROM public.{table}")
+        cur.execute("SELECT setseed(0.42)")
+        cur.execute(_SCALE_SQL.format(s=schema), {"n": scale})
+        for table in DIMENSION_TABLES + FACT_TABLES:
+            cur.execute(f"VACUUM ANALYZE {schema}.{table}")
+    return schema
+
+
+def drop_scale(conn, schema):
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+
+
+# ============================================================================
+# CAPTURE & NORMALISASI PLAN
+# ============================================================================
+def normalize(node):
+    """Pohon plan tanpa biaya/estimasi; hanya struktur + statistik aktual"""
+    normalized = {
+        "node": node["Node Type"],
+        "relation": node.get("Relation Name"),
+        "index": node.get("Index Name"),
+        "join": node.get("Join Type"),
+        "strategy": node.get("Strategy"),
+        "rows": node.get("Actual Rows", 0) * node.get("Actual Loops", 1),
+        "loops": node.get("Actual Loops", 1),
+        "time_ms": node.get("Actual Total Time", 0.0),
+        "shared_hit": node.get("Shared Hit Blocks", 0),
+        "shared_read": node.get("Shared Read Blocks", 0),
+    }
+    children = [normalize(child) for child in node.get("Plans", [])]
+    if children:
+        normalized["children"] = children
+    return normalized
+
+
+def example_params():
+    """Parameter contoh untuk query registry yang tidak punya default lengkap"""
+    sample = {"pct": sampling.PREVIEW_SAMPLE_PERCENT, "seed": sampling.PREVIEW_SEED}
+    examples = {preview: dict(sample) for preview in sampling.PREVIEW_QUERIES.values()}
+    # Halaman pertama detail penjualan, semua region dan satu region
+    for direction in queries.SALES_PAGE_DIRECTIONS:
+        for region_id in (0, 1):
+            name, params = rendering.sales_page_query(direction, region_id=region_id)
+            examples[name] = params
+    return examples
+
+
+def guarded_queries():
+    """Pasangan (nama query, parameter) unik: seluruh registry + parameter halaman dashboard"""
+    examples = example_params()
+    seen = {}
+    for name in QUERIES:
+        params = examples.get(name, {})
+        seen.setdefault(query_key(name, params), (name, params))
+    for page_queries in PAGE_QUERIES.values():
+        for name, params in page_queries:
+            seen.setdefault(query_key(name, params), (name, params))
+            if name in sampling.PREVIEW_QUERIES:
+                preview = sampling.PREVIEW_QUERIES[name]
+                params = {**examples[preview], **params}
+                seen.setdefault(query_key(preview, params), (preview, params))
+    return list(seen.values())
+
+
+def executed_sql(spec):
+    """[(varian, SQL)] bentuk query `spec` yang dikirim ke server
+
+    Spec ber-`wire` dijalankan dashboard sebagai SQL terkemas (wait callback
+    pembatalan aktif) dan oleh tool CLI lewat COPY BINARY; COPY tidak bisa
+    di-EXPLAIN, jadi SELECT di dalamnya yang di-capture.
+    """
+    if spec.packed is None:
+        return [(None, spec.sql)]
+    variants = [("packed", spec.packed.sql), ("copy", columnar.copy_select(spec.sql, spec.wire))]
+    if not queries.COLUMNAR_FETCH:
+        # run_query tanpa jalur kolumnar memakai SQL asli (fetch_rows)
+        variants.append((None, spec.sql))
+    return variants
+
+
+def query_key(name, params, variant=None):
+    key = name
+    if params:
+        key += f"({', '.join(f'{k}={v}' for k, v in sorted(params.items()))})"
+    return f"{key} [{variant}]" if variant else key
+
+
+def capture(conn, schema, repeat=3):
+    """EXPLAIN (ANALYZE, BUFFERS) untuk setiap query registry dalam schema
+
+    Setiap query dijalankan `repeat` kali dan run tercepat yang disimpan,
+    agar noise cache/CPU tidak terbaca sebagai regresi.
+    """
+    plans = {}
+    with conn.cursor() as cur:
+        cur.execute(f"SET search_path TO {schema}")
+        for name, params in guarded_queries():
+            spec = QUERIES[name]
+            values = spec.bind(params)
+            for variant, sql in executed_sql(spec):
+                runs = []
+                for _ in range(repeat):
+                    cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, values)
+                    runs.append(cur.fetchone()[0][0])
+                result = min(runs, key=lambda r: r["Execution Time"])
+                plans[query_key(name, params, variant)] = {
+                    "execution_ms": result["Execution Time"],
+                    "planning_ms": result["Planning Time"],
+                    # Jumlah blok kumulatif di node root: stabil antar run, tidak seperti waktu
+                    "buffers": result["Plan"].get("Shared Hit Blocks", 0) + result["Plan"].get("Shared Read Blocks", 0),
+                    "plan": normalize(result["Plan"]),
+                }
+        cur.execute("RESET search_path")
+    return plans
+
+
+def walk(plan):
+    yield plan
+    for child in plan.get("children", []):
+        yield from walk(child)
+
+
+# ============================================================================
+# DETEKSI REGRESI
+# ============================================================================
+def compare(baseline, current, time_threshold, buffer_threshold, min_ms, large_rows):
+    """Daftar regresi antara dua capture query yang sama"""
+    issues = []
+    base_nodes = list(walk(baseline["plan"]))
+    cur_nodes = list(walk(current["plan"]))
+
+    base_seq = {n["relation"] for n in base_nodes if n["node"] == "Seq Scan"}
+    for n in cur_nodes:
+        if n["node"] == "Seq Scan" and n["relation"] not in base_seq:
+            issues.append(f"seq scan baru pada {n['relation']} ({n['rows']} baris)")
+
+    base_nested = any(
+        n["node"] == "Nested Loop" and max((ch["rows"] for ch in n.get("children", [])), default=0) >= large_rows
+        for n in base_nodes
+    )
+    for n in cur_nodes:
+        if n["node"] != "Nested Loop" or base_nested:
+            continue
+        biggest = max((ch["rows"] for ch in n.get("children", [])), default=0)
+        if biggest >= large_rows:
+            issues.append(f"nested loop atas input besar ({biggest} baris)")
+
+    cur_index_only = {n["index"] for n in cur_nodes if n["node"] == "Index Only Scan"}
+    for n in base_nodes:
+        if n["node"] == "Index Only Scan" and n["index"] not in cur_index_only:
+            issues.append(f"index-only scan hilang: {n['index']}")
+
+    before, after = baseline["execution_ms"], current["execution_ms"]
+    if after > min_ms and after > before * (1 + time_threshold):
+        issues.append(f"waktu eksekusi naik {before:.2f}ms -> {after:.2f}ms")
+
+    before, after = baseline.get("buffers", 0), current["buffers"]
+    if before and after > before * (1 + buffer_threshold):
+        issues.append(f"blok buffer naik {before} -> {after}")
+    return issues
+
+
+def run_capture(scales, keep, repeat):
+    conn = psycopg2.connect(**config.DB_PARAMS)
+    conn.autocommit = True
+    snapshots = {}
+    try:
+        for scale in scales:
+            schema = seed_scale(conn, scale)
+            try:
+                snapshots[str(scale)] = capture(conn, schema, repeat)
+            finally:
+                if not keep:
+                    drop_scale(conn, schema)
+            print(f"📸 Skala x{scale}: {len(snapshots[str(scale)])} query di-capture")
+    finally:
+        conn.close()
+    return snapshots
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Guard regresi query plan registry query")
+    parser.add_argument("--scales", default="1,10,100", help="faktor skala data, dipisah koma")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="file snapshot baseline")
+    parser.add_argument("--update", action="store_true", help="tulis ulang baseline dari capture ini")
+    parser.add_argument("--time-threshold", type=float, default=1.0,
+                        help="kenaikan waktu relatif yang dianggap regresi (1.0 = +100%%)")
+    parser.add_argument("--buffer-threshold", type=float, default=0.25,
+                        help="kenaikan blok buffer relatif yang dianggap regresi (0.25 = +25%%)")
+    parser.add_argument("--min-ms", type=float, default=5.0,
+                        help="abaikan kenaikan waktu untuk query di bawah durasi ini")
+    parser.add_argument("--large-rows", type=int, default=10000,
+                        help="ambang baris input untuk nested loop yang dianggap besar")
+    parser.add_argument("--repeat", type=int, default=3, help="jumlah run per query (diambil yang tercepat)")
+    parser.add_argument("--keep", action="store_true", help="jangan hapus schema skala setelah selesai")
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    snapshots = run_capture(scales, args.keep, args.repeat)
+
+    if args.update or not os.path.exists(args.baseline):
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(snapshots, f, indent=2, ensure_ascii=False, sort_keys=True)
+        print(f"💾 Baseline disimpan ke {args.baseline}")
+        return
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = 0
+    for scale, plans in snapshots.items():
+        for key, current in plans.items():
+            base = baseline.get(scale, {}).get(key)
+            if base is None:
+                print(f"ℹ️ x{scale} {key}: belum ada di baseline")
+                continue
+            for issue in compare(
+                base, current, args.time_threshold, args.buffer_threshold, args.min_ms, args.large_rows
+            ):
+                regressions += 1
+                print(f"❌ x{scale} {key}: {issue}")
+
+    if regressions:
+        print(f"\n{regressions} regresi plan terdeteksi.")
+        raise SystemExit(1)
+    print("✅ Tidak ada regresi plan.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Pool koneksi baca per server (primary dan setiap read replica).
+
+Setiap query meminjam satu koneksi selama query berjalan, jadi dua sesi
+Streamlit tidak pernah memakai koneksi yang sama: pembatalan (pg_cancel),
+statement_timeout dan rollback satu sesi hanya mengenai koneksinya sendiri.
+Koneksi dibuat saat dibutuhkan sampai `size`; peminjam berikutnya menunggu
+sampai ada koneksi yang dikembalikan.
+
+    DB_POOL_SIZE=8      # koneksi maksimum per server
+"""
+import contextlib
+import threading
+
+import psycopg2
+import psycopg2.extensions
+
+
+class ConnectionPool:
+    """Pool koneksi autocommit yang dibuat lazy, maksimal `size` koneksi"""
+
+    def __init__(self, params, size, readonly=False):
+        if size < 1:
+            raise ValueError(f"ukuran pool minimal 1, bukan {size}")
+        self.params = params
+        self.size = size
+        self.readonly = readonly
+        self.opened = 0
+        self._idle = []
+        self._in_use = 0
+        self._generation = 0
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = psycopg2.connect(**self.params)
+        # Query baca tidak meninggalkan transaksi "idle in transaction" di server
+        conn.set_session(readonly=self.readonly, autocommit=True)
+        with self._lock:
+            self.opened += 1
+        return conn
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Pinjam satu koneksi; koneksi putus / bertransaksi tidak dikembalikan ke pool"""
+        self._slots.acquire()
+        conn = None
+        try:
+            with self._lock:
+                self._in_use += 1
+                generation = self._generation
+                conn = self._idle.pop() if self._idle else None
+            if conn is None or conn.closed:
+                conn = self._connect()
+            yield conn
+        finally:
+            with self._lock:
+                self._in_use -= 1
+                reusable = (
+                    conn is not None and not conn.closed and generation == self._generation
+                    and conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+                )
+                if reusable:
+                    self._idle.append(conn)
+            if conn is not None and not reusable:
+                conn.close()
+            self._slots.release()
+
+    @contextlib.contextmanager
+    def cursor(self):
+        """Cursor di atas koneksi pinjaman (ditutup saat selesai)"""
+        with self.connection() as conn, conn.cursor() as cur:
+            yield cur
+
+    def close(self):
+        """Tutup koneksi idle; koneksi yang sedang dipinjam ditutup saat dikembalikan"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._generation += 1
+        for conn in idle:
+            conn.close()
+
+    def status(self):
+        with self._lock:
+            return {"size": self.size, "idle": len(self._idle), "in_use": self._in_use, "opened": self.opened}
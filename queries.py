@@ -0,0 +1,967 @@
+import io
+import os
+import re
+import select
+import threading
+import time
+import weakref
+
+import pandas as pd
+import psycopg2
+
+import columnar
+import config
+import memory
+import replicas
+from dimensions import MissingDimension
+
+# ============================================================================
+# QUERY REGISTRY
+# ============================================================================
+# Setiap query dideklarasikan sekali: SQL (parameter bernama `%(nama)s`),
+# nilai default parameter, kolom hasil + dtype, fungsi resolve label dari
+# registry dimensi dan kebijakan cache (TTL). Semua eksekusi (config.view_*,
+# fetcher main.py, loadtest.py, plan_guard.py) melewati jalur yang sama:
+# prepared statement, instrumentasi, lalu typing hasil.
+
+USE_PREPARED_STATEMENTS = os.getenv("USE_PREPARED_STATEMENTS", "1") == "1"
+DEFAULT_TTL = int(os.getenv("QUERY_CACHE_TTL", "600"))
+# statement_timeout default per query (ms, 0 = tanpa batas); spec bisa menimpa lewat `timeout=`
+DEFAULT_TIMEOUT_MS = int(os.getenv("QUERY_TIMEOUT_MS", "15000"))
+# DataFrame hasil run_query memakai dtype ringkas (float32/int32/category), lihat memory.compact
+COMPACT_FRAMES = os.getenv("COMPACT_FRAMES", "1") == "1"
+# Spec dengan deklarasi `wire` diambil sebagai kolom biner -> tabel Arrow, lihat columnar.py
+COLUMNAR_FETCH = os.getenv("COLUMNAR_FETCH", "1") == "1"
+# Interval cek pembatalan selama menunggu hasil query (detik)
+CANCEL_POLL_INTERVAL = 0.1
+
+_PARAM_PATTERN = re.compile(r"%\((\w+)\)s")
+
+
+class QuerySpec:
+    """Deklarasi satu query dashboard"""
+
+    __slots__ = (
+        "name", "sql", "params", "columns", "dtypes", "resolve", "sort", "ttl", "timeout", "param_order",
+        "wire", "resolve_columns", "packed",
+    )
+
+    def __init__(self, name, sql, columns, params=None, dtypes=None, resolve=None, sort=None, ttl=DEFAULT_TTL,
+                 timeout=DEFAULT_TIMEOUT_MS, wire=None, resolve_columns=None):
+        self.name = name
+        self.sql = sql
+        self.params = params or {}
+        self.columns = columns
+        self.dtypes = dtypes or {}
+        self.resolve = resolve
+        self.sort = sort
+        self.ttl = ttl
+        self.timeout = timeout
+        # Urutan parameter untuk PREPARE ... AS (%(nama)s -> $n)
+        self.param_order = list(dict.fromkeys(_PARAM_PATTERN.findall(sql)))
+        # Jalur kolumnar: (kolom SQL, tipe wire) + resolver label atas array
+        self.wire = wire
+        self.resolve_columns = resolve_columns
+        self.packed = None
+        if wire:
+            self.packed = QuerySpec(
+                f"{name}_packed", columnar.packed_sql(sql, wire), [column for column, _ in wire],
+                params=params, ttl=ttl, timeout=timeout,
+            )
+
+    def bind(self, params):
+        """Gabungkan parameter panggilan dengan default spec"""
+        values = dict(self.params)
+        values.update(params)
+        missing = [p for p in self.param_order if p not in values]
+        if missing:
+            raise ValueError(f"Query {self.name} butuh parameter: {missing}")
+        return values
+
+    def prepared_sql(self):
+        """SQL dengan placeholder $1..$n untuk PREPARE"""
+        return _PARAM_PATTERN.sub(lambda m: f"${self.param_order.index(m.group(1)) + 1}", self.sql)
+
+
+QUERIES = {}
+
+
+def register(name, sql, columns, **options):
+    QUERIES[name] = QuerySpec(name, sql, columns, **options)
+    return QUERIES[name]
+
+
+# ============================================================================
+# FUNGSI RESOLVE LABEL (ID -> nama dari registry dimensi)
+# ============================================================================
+def _resolve_region(rows, dims):
+    return [(dims.regions.record(region_id).region_name, total) for region_id, total in rows]
+
+
+def _resolve_game_publisher(rows, dims):
+    resolved = []
+    for game_id, total in rows:
+        game = dims.games.record(game_id)
+        resolved.append((game.game_name, dims.publishers.record(game.publisher_id).publisher_name, total))
+    return resolved
+
+
+def _resolve_genre(rows, dims):
+    return [(dims.genres.record(genre_id).genre_name, count, total) for genre_id, count, total in rows]
+
+# Resolver di bawah meneruskan kolom tambahan di belakang (mis. margin CI query preview)
+
+
+def _resolve_platform(rows, dims):
+    resolved = []
+    for platform_id, count, total, *extra in rows:
+        platform = dims.platforms.record(platform_id)
+        resolved.append((platform.platform_name, platform.platform_code, count, total, *extra))
+    return resolved
+
+
+def _resolve_genre_platform(rows, dims):
+    return [
+        (dims.platforms.record(platform_id).platform_name, dims.genres.record(genre_id).genre_name, total, *extra)
+        for platform_id, genre_id, total, *extra in rows
+    ]
+
+
+def _resolve_publisher(rows, dims):
+    resolved = []
+    for publisher_id, count, total, *extra in rows:
+        publisher = dims.publishers.record(publisher_id)
+        resolved.append((publisher.publisher_name, publisher.country, count, total, *extra))
+    return resolved
+
+
+def _resolve_game_releases(rows, dims):
+    games, platforms, publishers = dims.games, dims.platforms, dims.publishers
+    resolved = []
+    for release_id, game_id, platform_id, release_year in rows:
+        game = games.record(game_id)
+        platform = platforms.record(platform_id)
+        resolved.append((
+            release_id, game.game_name, platform.platform_name, platform.platform_code,
+            release_year, publishers.record(game.publisher_id).publisher_name
+        ))
+    # Sama dengan ORDER BY release_year DESC (NULLS FIRST), game_name ASC
+    resolved.sort(key=lambda r: (r[4] is not None, -(r[4] or 0), r[1]))
+    return resolved
+
+
+def _resolve_regional_detail(rows, dims):
+    games, platforms, regions = dims.games, dims.platforms, dims.regions
+    return [
+        (
+            sale_id, games.record(game_id).game_name, platforms.record(platform_id).platform_code,
+            regions.record(region_id).region_name, sales, year
+        )
+        for sale_id, game_id, platform_id, region_id, sales, year in rows
+    ]
+
+
+def resolve_labels(resolve, data):
+    """`resolve(data, dims)` dengan registry dimensi saat ini
+
+    ID yang belum ada di registry (data baru sebelum refresh background)
+    memicu satu refresh lalu resolve diulang; jika masih belum ada, label
+    placeholder dipakai agar halaman tetap tampil.
+    """
+    try:
+        return resolve(data, config.view_dimensions())
+    except MissingDimension:
+        pass
+    dims = config.view_dimensions(refresh=True)
+    try:
+        return resolve(data, dims)
+    except MissingDimension as e:
+        print(f"⚠️ {e}; memakai label placeholder")
+        return resolve(data, dims.with_placeholders())
+
+
+def _columns(*sources):
+    """Resolver kolumnar: satu sumber per kolom output, berurutan seperti `columns` spec
+
+    Sumber berupa nama kolom wire, atau (kolom ID, "tabel.atribut", ...) untuk
+    label dimensi; hop di tengah mengikuti ID lain, mis. game -> publisher.
+    """
+    def resolve(cols, dims):
+        arrays = []
+        for source in sources:
+            if isinstance(source, str):
+                arrays.append(cols[source])
+                continue
+            ids, *path = source
+            ids = cols[ids]
+            for hop in path[:-1]:
+                table, attr = hop.split(".")
+                ids = columnar.lookup(ids, getattr(dims, table), attr)
+            table, attr = path[-1].split(".")
+            arrays.append(columnar.labels(ids, getattr(dims, table), attr))
+        return arrays
+    return resolve
+
+
+# ============================================================================
+# DEKLARASI QUERY
+# ============================================================================
+SALES = 'Total Sales (Millions)'
+
+# Atribusi penjualan game multi-genre:
+#   full     setiap genre menerima penjualan penuh (total genre > total global)
+#   split    penjualan dibagi rata ke semua genre game
+#   primary  hanya genre utama (genre_id terkecil, Game_Genres tidak punya flag primary)
+GENRE_ATTRIBUTIONS = ("full", "split", "primary")
+DEFAULT_GENRE_ATTRIBUTION = os.getenv("GENRE_ATTRIBUTION", "split")
+
+# Bobot per (game, genre) dari satu window atas Game_Genres; menggantikan
+# join Game_Genres biasa, jadi tidak ada fan-out tambahan.
+GENRE_WEIGHTS_SQL = '''
+            SELECT
+                game_id,
+                genre_id,
+                CASE %(attribution)s::text
+                    WHEN 'full' THEN 1.0
+                    WHEN 'split' THEN 1.0 / COUNT(*) OVER (PARTITION BY game_id)
+                    ELSE (ROW_NUMBER() OVER (PARTITION BY game_id ORDER BY genre_id) = 1)::int
+                END AS weight
+            FROM game_genres'''
+
+
+def genre_attribution(mode=None):
+    """Validasi mode atribusi genre (None -> default dari GENRE_ATTRIBUTION)"""
+    mode = mode or DEFAULT_GENRE_ATTRIBUTION
+    if mode not in GENRE_ATTRIBUTIONS:
+        raise ValueError(f"atribusi genre harus salah satu dari {list(GENRE_ATTRIBUTIONS)}, bukan {mode!r}")
+    return mode
+
+register(
+    "overview_metrics",
+    '''
+        SELECT
+            (SELECT SUM(sales_in_millions) FROM regional_sales) AS total_sales,
+            (SELECT COUNT(DISTINCT game_id) FROM games) AS total_games,
+            (SELECT COUNT(DISTINCT publisher_id) FROM publishers) AS total_publishers,
+            (SELECT COUNT(DISTINCT platform_id) FROM platforms) AS total_platforms
+    ''',
+    ['total_sales', 'total_games', 'total_publishers', 'total_platforms'],
+    dtypes={'total_sales': 'float64', 'total_games': 'int64',
+            'total_publishers': 'int64', 'total_platforms': 'int64'},
+    wire=[('total_sales', 'float8'), ('total_games', 'int8'),
+          ('total_publishers', 'int8'), ('total_platforms', 'int8')],
+)
+
+register(
+    "regional_sales",
+    '''
+        SELECT
+            rs.region_id,
+            ROUND(SUM(rs.sales_in_millions)::numeric, 2) AS total_sales
+        FROM regional_sales rs
+        GROUP BY rs.region_id
+        ORDER BY total_sales DESC
+    ''',
+    ['Region', SALES],
+    dtypes={SALES: 'float64'},
+    resolve=_resolve_region,
+    wire=[('region_id', 'int4'), ('total_sales', 'float8')],
+    resolve_columns=_columns(('region_id', 'regions.region_name'), 'total_sales'),
+)
+
+register(
+    "top_games",
+    '''
+        SELECT
+            gr.game_id,
+            ROUND(SUM(rs.sales_in_millions)::numeric, 2) AS total_sales
+        FROM regional_sales rs
+        JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
+        GROUP BY gr.game_id
+        ORDER BY total_sales DESC
+        LIMIT %(limit)s
+    ''',
+    ['Game', 'Publisher', SALES],
+    params={'limit': 15},
+    dtypes={SALES: 'float64'},
+    resolve=_resolve_game_publisher,
+    wire=[('game_id', 'int4'), ('total_sales', 'float8')],
+    resolve_columns=_columns(
+        ('game_id', 'games.game_name'), ('game_id', 'games.publisher_id', 'publishers.publisher_name'), 'total_sales'
+    ),
+)
+
+register(
+    "genre_sales",
+    '''
+        WITH genre_weights AS (''' + GENRE_WEIGHTS_SQL + '''
+        )
+        SELECT
+            gw.genre_id,
+            COUNT(DISTINCT gr.game_id) AS game_count,
+            ROUND(SUM(rs.sales_in_millions * gw.weight)::numeric, 2) AS total_sales
+        FROM regional_sales rs
+        JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
+        JOIN genre_weights gw ON gr.game_id = gw.game_id
+        WHERE gw.weight > 0
+        GROUP BY gw.genre_id
+        ORDER BY total_sales DESC
+    ''',
+    ['Genre', 'Game Count', SALES],
+    params={'attribution': DEFAULT_GENRE_ATTRIBUTION},
+    dtypes={'Game Count': 'int64', SALES: 'float64'},
+    resolve=_resolve_genre,
+    wire=[('genre_id', 'int4'), ('game_count', 'int8'), ('total_sales', 'float8')],
+    resolve_columns=_columns(('genre_id', 'genres.genre_name'), 'game_count', 'total_sales'),
+)
+
+register(
+    "platform_sales",
+    '''
+        SELECT
+            gr.platform_id,
+            COUNT(DISTINCT gr.game_id) AS game_count,
+            ROUND(SUM(rs.sales_in_millions)::numeric, 2) AS total_sales
+        FROM regional_sales rs
+        JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
+        GROUP BY gr.platform_id
+        ORDER BY total_sales DESC
+    ''',
+    ['Platform', 'Code', 'Game Count', SALES],
+    dtypes={'Game Count': 'int64', SALES: 'float64'},
+    resolve=_resolve_platform,
+    wire=[('platform_id', 'int4'), ('game_count', 'int8'), ('total_sales', 'float8')],
+    resolve_columns=_columns(
+        ('platform_id', 'platforms.platform_name'), ('platform_id', 'platforms.platform_code'),
+        'game_count', 'total_sales',
+    ),
+)
+
+register(
+    "genre_platform_sales",
+    '''
+        WITH genre_weights AS (''' + GENRE_WEIGHTS_SQL + '''
+        )
+        SELECT
+            gr.platform_id,
+            gw.genre_id,
+            ROUND(SUM(rs.sales_in_millions * gw.weight)::numeric, 2) AS total_sales
+        FROM regional_sales rs
+        JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
+        JOIN genre_weights gw ON gr.game_id = gw.game_id
+        WHERE gw.weight > 0
+        GROUP BY gr.platform_id, gw.genre_id
+    ''',
+    ['Platform', 'Genre', SALES],
+    params={'attribution': DEFAULT_GENRE_ATTRIBUTION},
+    dtypes={SALES: 'float64'},
+    resolve=_resolve_genre_platform,
+    wire=[('platform_id', 'int4'), ('genre_id', 'int4'), ('total_sales', 'float8')],
+    resolve_columns=_columns(
+        ('platform_id', 'platforms.platform_name'), ('genre_id', 'genres.genre_name'), 'total_sales'
+    ),
+    # Sama dengan ORDER BY platform_name, total_sales DESC
+    sort=(['Platform', SALES], [True, False]),
+)
+
+register(
+    "publisher_sales",
+    '''
+        SELECT
+            g.publisher_id,
+            COUNT(DISTINCT g.game_id) AS game_count,
+            ROUND(SUM(rs.sales_in_millions)::numeric, 2) AS total_sales
+        FROM regional_sales rs
+        JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
+        JOIN games g ON gr.game_id = g.game_id
+        GROUP BY g.publisher_id
+        ORDER BY total_sales DESC
+        LIMIT %(limit)s
+    ''',
+    ['Publisher', 'Country', 'Game Count', SALES],
+    params={'limit': 15},
+    dtypes={'Game Count': 'int64', SALES: 'float64'},
+    resolve=_resolve_publisher,
+    wire=[('publisher_id', 'int4'), ('game_count', 'int8'), ('total_sales', 'float8')],
+    resolve_columns=_columns(
+        ('publisher_id', 'publishers.publisher_name'), ('publisher_id', 'publishers.country'),
+        'game_count', 'total_sales',
+    ),
+)
+
+# --- Query preview (sampling) untuk halaman eksploratif, lihat sampling.py ---
+# Estimator Horvitz-Thompson untuk sampel Bernoulli dengan peluang p:
+#   total = SUM(y) / p,  margin 95% = 1.96 * SQRT((1 - p) * SUM(y^2)) / p
+# (pada SYSTEM baris diambil per blok, sehingga margin ini cenderung terlalu sempit)
+PREVIEW_SAMPLE_METHOD = os.getenv("PREVIEW_SAMPLE_METHOD", "BERNOULLI").upper()
+if PREVIEW_SAMPLE_METHOD not in ("BERNOULLI", "SYSTEM"):
+    raise ValueError(f"PREVIEW_SAMPLE_METHOD harus BERNOULLI atau SYSTEM, bukan {PREVIEW_SAMPLE_METHOD!r}")
+MARGIN = 'Margin (95%)'
+
+_SAMPLED_SALES = f"regional_sales rs TABLESAMPLE {PREVIEW_SAMPLE_METHOD} (%(pct)s::real) REPEATABLE (%(seed)s::int)"
+
+
+# Batas atas estimasi game_count per grup (tabel dimensi kecil, tanpa scan fakta)
+_PLATFORM_GAMES = "(SELECT COUNT(DISTINCT p.game_id) FROM game_releases p WHERE p.platform_id = gr.platform_id)"
+_PUBLISHER_GAMES = "(SELECT COUNT(*) FROM games p WHERE p.publisher_id = g.publisher_id)"
+
+
+def _estimate_count(value, bound):
+    """Kolom game_count estimasi: COUNT(DISTINCT) sampel diskalakan 1/p
+
+    Game dengan banyak baris penjualan hampir selalu ikut tersampel, jadi
+    skala 1/p cenderung berlebih; hasil dibatasi `bound` (jumlah game di
+    tabel dimensi untuk grup tersebut).
+    """
+    return f'''
+            LEAST(ROUND(COUNT(DISTINCT {value}) / (%(pct)s::float8 / 100)), {bound})::int8 AS game_count,'''
+
+
+def _estimate(value):
+    """Kolom (estimasi total, margin 95%) untuk ekspresi nilai per baris sampel"""
+    return f'''
+            ROUND((SUM({value}) / (%(pct)s::float8 / 100))::numeric, 2) AS total_sales,
+            ROUND((1.96 * SQRT((1 - %(pct)s::float8 / 100) * SUM(({value})::float8 ^ 2))
+                   / (%(pct)s::float8 / 100))::numeric, 2) AS margin'''
+
+
+register(
+    "platform_sales_preview",
+    f'''
+        SELECT
+            gr.platform_id,{_estimate_count("gr.game_id", _PLATFORM_GAMES)}{_estimate("rs.sales_in_millions")}
+        FROM {_SAMPLED_SALES}
+        JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
+        GROUP BY gr.platform_id
+        ORDER BY total_sales DESC
+    ''',
+    ['Platform', 'Code', 'Game Count', SALES, MARGIN],
+    dtypes={'Game Count': 'int64', SALES: 'float64', MARGIN: 'float64'},
+    resolve=_resolve_platform,
+    wire=[('platform_id', 'int4'), ('game_count', 'int8'), ('total_sales', 'float8'), ('margin', 'float8')],
+    resolve_columns=_columns(
+        ('platform_id', 'platforms.platform_name'), ('platform_id', 'platforms.platform_code'),
+        'game_count', 'total_sales', 'margin',
+    ),
+)
+
+register(
+    "genre_platform_sales_preview",
+    f'''
+        WITH genre_weights AS ({GENRE_WEIGHTS_SQL}
+        )
+        SELECT
+            gr.platform_id,
+            gw.genre_id,{_estimate("rs.sales_in_millions * gw.weight")}
+        FROM {_SAMPLED_SALES}
+        JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
+        JOIN genre_weights gw ON gr.game_id = gw.game_id
+        WHERE gw.weight > 0
+        GROUP BY gr.platform_id, gw.genre_id
+    ''',
+    ['Platform', 'Genre', SALES, MARGIN],
+    params={'attribution': DEFAULT_GENRE_ATTRIBUTION},
+    dtypes={SALES: 'float64', MARGIN: 'float64'},
+    resolve=_resolve_genre_platform,
+    wire=[('platform_id', 'int4'), ('genre_id', 'int4'), ('total_sales', 'float8'), ('margin', 'float8')],
+    resolve_columns=_columns(
+        ('platform_id', 'platforms.platform_name'), ('genre_id', 'genres.genre_name'), 'total_sales', 'margin'
+    ),
+    sort=(['Platform', SALES], [True, False]),
+)
+
+register(
+    "publisher_sales_preview",
+    f'''
+        SELECT
+            g.publisher_id,{_estimate_count("g.game_id", _PUBLISHER_GAMES)}{_estimate("rs.sales_in_millions")}
+        FROM {_SAMPLED_SALES}
+        JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
+        JOIN games g ON gr.game_id = g.game_id
+        GROUP BY g.publisher_id
+        ORDER BY total_sales DESC
+        LIMIT %(limit)s
+    ''',
+    ['Publisher', 'Country', 'Game Count', SALES, MARGIN],
+    params={'limit': 15},
+    dtypes={'Game Count': 'int64', SALES: 'float64', MARGIN: 'float64'},
+    resolve=_resolve_publisher,
+    wire=[('publisher_id', 'int4'), ('game_count', 'int8'), ('total_sales', 'float8'), ('margin', 'float8')],
+    resolve_columns=_columns(
+        ('publisher_id', 'publishers.publisher_name'), ('publisher_id', 'publishers.country'),
+        'game_count', 'total_sales', 'margin',
+    ),
+)
+
+# --- Query detail yang dipakai fungsi view_* di config.py ---
+register(
+    "games",
+    '''
+        SELECT
+            g.game_id,
+            g.game_name,
+            p.publisher_name
+        FROM games g
+        JOIN publishers p ON g.publisher_id = p.publisher_id
+        ORDER BY g.game_name ASC
+    ''',
+    ['game_id', 'game_name', 'publisher_name'],
+)
+
+register(
+    "games_with_genres",
+    '''
+        SELECT
+            g.game_id,
+            g.game_name,
+            STRING_AGG(ge.genre_name, ', ') AS genres,
+            p.publisher_name
+        FROM games g
+        JOIN publishers p ON g.publisher_id = p.publisher_id
+        LEFT JOIN game_genres gg ON g.game_id = gg.game_id
+        LEFT JOIN genres ge ON gg.genre_id = ge.genre_id
+        GROUP BY g.game_id, g.game_name, p.publisher_name
+        ORDER BY g.game_name ASC
+    ''',
+    ['game_id', 'game_name', 'genres', 'publisher_name'],
+)
+
+register(
+    "game_releases",
+    '''
+        SELECT
+            gr.game_release_id,
+            g.game_name,
+            pl.platform_name,
+            pl.platform_code,
+            gr.release_year,
+            p.publisher_name
+        FROM game_releases gr
+        JOIN games g ON gr.game_id = g.game_id
+        JOIN platforms pl ON gr.platform_id = pl.platform_id
+        JOIN publishers p ON g.publisher_id = p.publisher_id
+        ORDER BY gr.release_year DESC, g.game_name ASC
+    ''',
+    ['game_release_id', 'game_name', 'platform_name', 'platform_code', 'release_year', 'publisher_name'],
+)
+
+register(
+    "game_releases_compact",
+    '''
+        SELECT game_release_id, game_id, platform_id, release_year
+        FROM game_releases
+    ''',
+    ['game_release_id', 'game_name', 'platform_name', 'platform_code', 'release_year', 'publisher_name'],
+    resolve=_resolve_game_releases,
+)
+
+register(
+    "regional_sales_detail",
+    '''
+        SELECT
+            rs.sale_id,
+            g.game_name,
+            pl.platform_code,
+            r.region_name,
+            rs.sales_in_millions,
+            gr.release_year
+        FROM regional_sales rs
+        JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
+        JOIN games g ON gr.game_id = g.game_id
+        JOIN platforms pl ON gr.platform_id = pl.platform_id
+        JOIN regions r ON rs.region_id = r.region_id
+        ORDER BY rs.sales_in_millions DESC
+    ''',
+    ['sale_id', 'game_name', 'platform_code', 'region_name', 'sales_in_millions', 'release_year'],
+)
+
+register(
+    "regional_sales_detail_compact",
+    '''
+        SELECT rs.sale_id, gr.game_id, gr.platform_id, rs.region_id,
+               rs.sales_in_millions, gr.release_year
+        FROM regional_sales rs
+        JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
+        ORDER BY rs.sales_in_millions DESC
+    ''',
+    ['sale_id', 'game_name', 'platform_code', 'region_name', 'sales_in_millions', 'release_year'],
+    resolve=_resolve_regional_detail,
+)
+
+# --- Halaman detail penjualan (keyset pagination, rendering.py) ---
+# Halaman berikutnya dimulai setelah (sales, sale_id) baris terakhir halaman
+# sebelumnya, jadi biaya per halaman tetap ~LIMIT baris index scan (tanpa
+# OFFSET) berapa pun jauhnya halaman. Varian per region memakai index
+# (region_id, sales, sale_id); sale_id memutus seri agar urutan total.
+SALES_PAGE_DIRECTIONS = {"desc": "<", "asc": ">"}
+for _direction, _compare in SALES_PAGE_DIRECTIONS.items():
+    for _scope, _filter in (("", ""), ("_region", "rs.region_id = %(region_id)s AND ")):
+        register(
+            f"sales_detail_page{_scope}_{_direction}",
+            f'''
+        SELECT rs.sale_id, gr.game_id, gr.platform_id, rs.region_id,
+               rs.sales_in_millions, gr.release_year
+        FROM regional_sales rs
+        JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
+        WHERE {_filter}(rs.sales_in_millions, rs.sale_id) {_compare} (%(after_sales)s::numeric, %(after_id)s::int)
+        ORDER BY rs.sales_in_millions {_direction.upper()}, rs.sale_id {_direction.upper()}
+        LIMIT %(limit)s
+    ''',
+            ['sale_id', 'game_name', 'platform_code', 'region_name', 'sales_in_millions', 'release_year'],
+            resolve=_resolve_regional_detail,
+            ttl=60,
+        )
+
+# --- Query mesin analitik konsentrasi (analytics.py) ---
+# Versi data fakta: satu baris Data_Versions yang dinaikkan trigger (dbrev.sql)
+# setiap kali penjualan, rilis, genre game atau game berubah; tanpa scan tabel
+register(
+    "sales_version",
+    '''
+        SELECT md5(version || ':' || changed_at::text) FROM data_versions WHERE name = 'sales'
+    ''',
+    ['version'],
+    ttl=60,
+)
+
+register(
+    "sales_facts",
+    '''
+        SELECT rs.region_id, gr.release_year, gr.game_id, gr.platform_id, g.publisher_id, rs.sales_in_millions
+        FROM regional_sales rs
+        JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
+        JOIN games g ON gr.game_id = g.game_id
+    ''',
+    ['region_id', 'release_year', 'game_id', 'platform_id', 'publisher_id', 'sales_in_millions'],
+    # Memuat seluruh fakta (hanya saat versi data berubah), boleh lebih lama dari query halaman
+    timeout=max(DEFAULT_TIMEOUT_MS, 60000) if DEFAULT_TIMEOUT_MS else 0,
+    # Dimuat lewat fetch_columns; release_year NULL -> 0 (ditampilkan sebagai N/A)
+    wire=[('region_id', 'int4'), ('release_year', 'int4'), ('game_id', 'int4'), ('platform_id', 'int4'),
+          ('publisher_id', 'int4'), ('sales_in_millions', 'float8')],
+)
+
+register(
+    "game_genre_pairs",
+    '''
+        SELECT game_id, genre_id FROM game_genres ORDER BY game_id, genre_id
+    ''',
+    ['game_id', 'genre_id'],
+    wire=[('game_id', 'int4'), ('genre_id', 'int4')],
+)
+
+register(
+    "game_platform_pairs",
+    '''
+        SELECT game_id, platform_id FROM game_releases ORDER BY game_id, platform_id
+    ''',
+    ['game_id', 'platform_id'],
+    wire=[('game_id', 'int4'), ('platform_id', 'int4')],
+)
+
+# --- Laporan batch (report.py): semua breakdown dalam satu scan fakta ---
+# GROUPING(region, platform, publisher, genre) = bitmask dimensi yang TIDAK
+# dikelompokkan (8 = region, 4 = platform, 2 = publisher, 1 = genre); ID
+# dimensi yang tidak dikelompokkan dikirim sebagai 0. Grouping set bergenre
+# memakai bobot atribusi (genre_sales); set lain membagi rata penjualan game
+# ke semua baris genre-nya sehingga totalnya sama dengan query halaman.
+register(
+    "report_breakdowns",
+    '''
+        WITH genre_weights AS (''' + GENRE_WEIGHTS_SQL + '''
+        ),
+        weighted AS (
+            SELECT game_id, genre_id, weight, 1.0 / COUNT(*) OVER (PARTITION BY game_id) AS share
+            FROM genre_weights
+        )
+        SELECT
+            GROUPING(rs.region_id, gr.platform_id, g.publisher_id, w.genre_id) AS grouping_id,
+            rs.region_id,
+            gr.platform_id,
+            g.publisher_id,
+            w.genre_id,
+            COUNT(DISTINCT gr.game_id) FILTER (WHERE COALESCE(w.weight, 1) > 0) AS game_count,
+            ROUND(SUM(rs.sales_in_millions * COALESCE(w.share, 1))::numeric, 2) AS total_sales,
+            ROUND(SUM(rs.sales_in_millions * COALESCE(w.weight, 0))::numeric, 2) AS genre_sales
+        FROM regional_sales rs
+        JOIN game_releases gr ON rs.game_release_id = gr.game_release_id
+        JOIN games g ON gr.game_id = g.game_id
+        LEFT JOIN weighted w ON gr.game_id = w.game_id
+        GROUP BY GROUPING SETS (
+            (),
+            (rs.region_id), (gr.platform_id), (g.publisher_id), (w.genre_id),
+            (rs.region_id, gr.platform_id), (rs.region_id, g.publisher_id), (rs.region_id, w.genre_id),
+            (gr.platform_id, g.publisher_id), (gr.platform_id, w.genre_id), (g.publisher_id, w.genre_id)
+        )
+    ''',
+    ['grouping_id', 'region_id', 'platform_id', 'publisher_id', 'genre_id', 'game_count', 'total_sales',
+     'genre_sales'],
+    params={'attribution': DEFAULT_GENRE_ATTRIBUTION},
+    timeout=max(DEFAULT_TIMEOUT_MS, 60000) if DEFAULT_TIMEOUT_MS else 0,
+    wire=[('grouping_id', 'int4'), ('region_id', 'int4'), ('platform_id', 'int4'), ('publisher_id', 'int4'),
+          ('genre_id', 'int4'), ('game_count', 'int8'), ('total_sales', 'float8'), ('genre_sales', 'float8')],
+)
+
+# Query yang dijalankan setiap halaman main.py: halaman -> [(nama query, parameter)]
+PAGE_QUERIES = {
+    "🏠 Ringkasan Keseluruhan": [("overview_metrics", {}), ("top_games", {"limit": 5}), ("regional_sales", {})],
+    "🌍 Penjualan Regional": [("regional_sales", {})],
+    "🎯 Game Paling Laris": [("top_games", {"limit": 20})],
+    "📈 Tren Genre": [("genre_sales", {})],
+    "🖥️ Kinerja Platform": [("platform_sales", {})],
+    "🔗 Korelasi Genre-Platform": [("genre_platform_sales", {})],
+    "🏢 Kinerja Penerbit": [("publisher_sales", {"limit": 20})],
+    # Fakta hanya dimuat ulang saat versi berubah; kondisi tunak cukup cek versi
+    "📐 Konsentrasi Pasar": [("sales_version", {})],
+    "🧩 Co-occurrence Genre & Platform": [("sales_version", {})],
+}
+
+# Query tambahan halaman analitik saat versi data berubah: engine memuat ulang
+# fakta (analytics.py) / matriks junction (cooccurrence.py)
+PAGE_RELOAD_QUERIES = {
+    "📐 Konsentrasi Pasar": [("sales_facts", {}), ("game_genre_pairs", {})],
+    "🧩 Co-occurrence Genre & Platform": [("game_genre_pairs", {}), ("game_platform_pairs", {})],
+}
+
+
+# ============================================================================
+# EKSEKUSI
+# ============================================================================
+# objek koneksi -> (lock, set nama statement yang sudah di-PREPARE). Kunci objek
+# (bukan pid backend): koneksi baru hasil reconnect/failover selalu mulai
+# kosong, dan entri hilang sendiri saat koneksi lama dibuang. _prepare_lock
+# hanya melindungi dict; PREPARE (round-trip jaringan) berjalan di bawah lock
+# koneksi itu sendiri, jadi koneksi pool lain tidak ikut menunggu.
+_prepared = weakref.WeakKeyDictionary()
+_prepare_lock = threading.Lock()
+_stats_lock = threading.Lock()
+QUERY_STATS = {}
+
+
+def _record(name, elapsed, rows, outcome=None):
+    with _stats_lock:
+        stats = QUERY_STATS.setdefault(
+            name, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "timeouts": 0, "cancelled": 0}
+        )
+        stats["calls"] += 1
+        stats["total_ms"] += elapsed * 1000
+        stats["max_ms"] = max(stats["max_ms"], elapsed * 1000)
+        stats["rows"] += rows
+        if outcome:
+            stats[outcome] += 1
+
+
+def query_stats():
+    """Ringkasan instrumentasi per query (calls, total/avg/max ms, rows, timeouts, cancelled)"""
+    with _stats_lock:
+        return {
+            name: dict(stats, avg_ms=stats["total_ms"] / stats["calls"])
+            for name, stats in QUERY_STATS.items()
+        }
+
+
+def _ensure_prepared(cursor, spec):
+    """PREPARE statement sekali per koneksi"""
+    with _prepare_lock:
+        lock, names = _prepared.setdefault(cursor.connection, (threading.Lock(), set()))
+    if spec.name in names:
+        return
+    with lock:
+        if spec.name not in names:
+            cursor.execute(f"PREPARE q_{spec.name} AS {spec.prepared_sql()}")
+            names.add(spec.name)
+
+
+def forget_prepared(conn):
+    """Kosongkan cache PREPARE satu koneksi (dipanggil saat koneksi ditutup / dibuang)"""
+    with _prepare_lock:
+        _prepared.pop(conn, None)
+
+
+class QueryTimeout(Exception):
+    """Query dibatalkan server karena melebihi statement_timeout"""
+
+
+class QueryCancelled(Exception):
+    """Query dibatalkan karena sesi dashboard pindah halaman / rerun"""
+
+
+_cancel = threading.local()
+
+
+def _wait_cancellable(conn):
+    """Wait callback psycopg2: tunggu hasil sambil memeriksa permintaan pembatalan"""
+    check = getattr(_cancel, "check", None)
+    cancelled = False
+    while True:
+        state = conn.poll()
+        if state == psycopg2.extensions.POLL_OK:
+            return
+        try:
+            if state == psycopg2.extensions.POLL_READ:
+                select.select([conn.fileno()], [], [], CANCEL_POLL_INTERVAL)
+            elif state == psycopg2.extensions.POLL_WRITE:
+                select.select([], [conn.fileno()], [], CANCEL_POLL_INTERVAL)
+            else:
+                raise psycopg2.OperationalError(f"poll() mengembalikan state tidak dikenal: {state}")
+            if check is not None and not cancelled and check():
+                conn.cancel()
+                cancelled = True
+        except KeyboardInterrupt:
+            conn.cancel()
+
+
+def enable_cancellation(check):
+    """Aktifkan pembatalan query in-flight untuk thread ini
+
+    `check()` dipanggil berkala selama query menunggu hasil; jika True query
+    dibatalkan di server (pg_cancel) dan execute() melempar QueryCancelled.
+    Wait callback berlaku untuk semua koneksi proses, jadi hanya dipasang oleh
+    dashboard (tool CLI tetap memakai mode blocking biasa). Yang dibatalkan
+    hanya koneksi yang sedang ditunggu thread ini; execute() meminjam koneksi
+    pool per query sehingga koneksi itu tidak dipakai sesi lain.
+    """
+    if psycopg2.extensions.get_wait_callback() is not _wait_cancellable:
+        psycopg2.extensions.set_wait_callback(_wait_cancellable)
+    _cancel.check = check
+
+
+def _execute_on(cur, spec, values):
+    started = time.perf_counter()
+    # SET dikirim bersama statement dalam satu round-trip
+    set_timeout = f"SET statement_timeout = {int(spec.timeout)}; "
+    try:
+        if USE_PREPARED_STATEMENTS:
+            args = [values[p] for p in spec.param_order]
+            execute_sql = f"{set_timeout}EXECUTE q_{spec.name}" + (f" ({', '.join(['%s'] * len(args))})" if args else "")
+            _ensure_prepared(cur, spec)
+            try:
+                cur.execute(execute_sql, args)
+            except psycopg2.errors.InvalidSqlStatementName:
+                # Statement hilang di server (DISCARD ALL / pooler): lupakan cache koneksi lalu PREPARE ulang
+                cur.connection.rollback()
+                forget_prepared(cur.connection)
+                _ensure_prepared(cur, spec)
+                cur.execute(execute_sql, args)
+        else:
+            cur.execute(set_timeout + spec.sql, values)
+        rows = cur.fetchall()
+    except psycopg2.Error as e:
+        _failed(cur, spec, started, e)
+    _record(spec.name, time.perf_counter() - started, len(rows))
+    return rows
+
+
+def _copy_on(cur, spec, values):
+    """Kolom `wire` spec lewat COPY BINARY (tanpa prepared statement: COPY tidak bisa di-PREPARE)"""
+    started = time.perf_counter()
+    buffer = io.BytesIO()
+    try:
+        cur.execute(f"SET statement_timeout = {int(spec.timeout)}")
+        cur.copy_expert(columnar.copy_sql(cur.mogrify(spec.sql, values).decode(), spec.wire), buffer)
+    except psycopg2.Error as e:
+        _failed(cur, spec, started, e)
+    columns = columnar.decode_copy(buffer.getbuffer(), spec.wire)
+    _record(spec.name, time.perf_counter() - started, len(next(iter(columns.values()), ())))
+    return columns
+
+
+def _failed(cur, spec, started, e):
+    """Rollback transaksi yang gagal lalu lempar ulang error (timeout/batal -> exception sendiri)"""
+    # Transaksi yang gagal harus di-rollback agar query berikutnya bisa jalan
+    if not cur.connection.closed:
+        cur.connection.rollback()
+    if isinstance(e, psycopg2.extensions.QueryCanceledError):
+        timed_out = "statement timeout" in str(e)
+        _record(spec.name, time.perf_counter() - started, 0, "timeouts" if timed_out else "cancelled")
+        if timed_out:
+            raise QueryTimeout(f"{spec.name} melebihi batas {spec.timeout} ms") from e
+        raise QueryCancelled(spec.name) from e
+    raise
+
+
+def execute(spec, params=None, cursor=None, runner=_execute_on):
+    """Jalankan spec dan kembalikan baris mentah (tanpa resolve)
+
+    Tanpa `cursor` eksplisit query dirutekan ke read replica (lihat
+    replicas.py); replica yang putus ditandai mati dan query diulang di
+    kandidat berikutnya, lalu di primary. Konflik recovery hot standby tidak
+    membuat replica dianggap mati: query diulang di replica yang sama. Query memakai koneksi pinjaman
+    dari pool server terpilih (pool.py), tidak pernah koneksi milik sesi
+    lain. `runner` menentukan cara query dijalankan di cursor terpilih
+    (default: prepared statement + fetchall).
+    """
+    values = spec.bind(params or {})
+    if cursor is not None:
+        return runner(cursor, spec, values)
+    for replica in config.read_replicas():
+        for _ in range(replicas.CONFLICT_RETRIES + 1):
+            try:
+                with replica.cursor() as cur:
+                    rows = runner(cur, spec, values)
+            except psycopg2.extensions.TransactionRollbackError:
+                # SerializationFailure "conflict with recovery": replica sehat, ulangi
+                with replica.lock:
+                    replica.conflicts += 1
+                continue
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                if not replicas.connection_failed(e):
+                    raise
+                replica.mark_down(e)
+                break
+            with replica.lock:
+                replica.served += 1
+            return rows
+    if config.READ_REPLICAS:
+        config.get_router().record_fallback()
+    with config.get_pool().cursor() as cur:
+        return runner(cur, spec, values)
+
+
+def fetch_rows(name, cursor=None, **params):
+    """Baris hasil query dengan label dimensi sudah di-resolve"""
+    spec = QUERIES[name]
+    # Registry dimensi dimuat sebelum query karena bisa memakai koneksi yang sama
+    if spec.resolve:
+        config.view_dimensions()
+    rows = execute(spec, params, cursor)
+    return resolve_labels(spec.resolve, rows) if spec.resolve else rows
+
+
+def fetch_columns(name, cursor=None, **params):
+    """Hasil query `wire` sebagai {kolom SQL: array NumPy}
+
+    COPY BINARY jika bisa; selama wait callback pembatalan aktif (dashboard)
+    kolom dikemas server menjadi bytea lewat spec `<nama>_packed`.
+    """
+    spec = QUERIES[name]
+    if spec.packed is None:
+        raise ValueError(f"Query {name} tidak punya deklarasi wire")
+    if psycopg2.extensions.get_wait_callback() is None:
+        return execute(spec, params, cursor, runner=_copy_on)
+    rows = execute(spec.packed, params, cursor)
+    return columnar.decode_packed(rows[0], spec.wire)
+
+
+def fetch_arrow(name, cursor=None, **params):
+    """Hasil query `wire` sebagai tabel Arrow berkolom `columns` spec (label = dictionary)"""
+    spec = QUERIES[name]
+    if spec.resolve_columns:
+        config.view_dimensions()
+    cols = fetch_columns(name, cursor, **params)
+    arrays = resolve_labels(spec.resolve_columns, cols) if spec.resolve_columns else list(cols.values())
+    return columnar.to_table(spec.columns, arrays)
+
+
+def run_query(name, cursor=None, **params):
+    """Hasil query sebagai DataFrame bertipe sesuai deklarasi spec"""
+    spec = QUERIES[name]
+    if COLUMNAR_FETCH and spec.packed is not None:
+        df = fetch_arrow(name, cursor, **params).to_pandas().astype(spec.dtypes)
+    else:
+        df = pd.DataFrame(fetch_rows(name, cursor, **params), columns=spec.columns)
+        for column, dtype in spec.dtypes.items():
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype(dtype)
+    if spec.sort:
+        by, ascending = spec.sort
+        df = df.sort_values(by, ascending=ascending, ignore_index=True)
+    return memory.compact(df) if COMPACT_FRAMES else df
@@ -0,0 +1,132 @@
+"""
+Rendering berskala untuk tabel dan grafik besar: ukuran payload ke browser
+tetap terbatas berapa pun jumlah baris datanya.
+
+Tabel
+    page_slice()    sort + potong satu halaman di server; browser hanya
+                    menerima TABLE_PAGE_SIZE baris (main.paged_dataframe)
+    sales_page()    halaman detail penjualan langsung dari database dengan
+                    keyset pagination (queries.py: sales_detail_page_*)
+
+Scatter / bubble (main.scatter_chart)
+    <= SCATTER_WEBGL_ABOVE titik   SVG biasa (label teks per titik)
+    <= SCATTER_MAX_POINTS titik    trace WebGL (scattergl), tanpa label teks
+    >  SCATTER_MAX_POINTS titik    SCATTER_MODE=decimate: decimate() -> WebGL
+                                   SCATTER_MODE=bin: bin2d() -> heatmap
+"""
+import os
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+import queries
+
+TABLE_PAGE_SIZE = int(os.getenv("TABLE_PAGE_SIZE", "50"))
+# Tabel dengan baris lebih banyak dari ini dipaginasi di server
+TABLE_PAGINATE_ABOVE = int(os.getenv("TABLE_PAGINATE_ABOVE", "500"))
+SCATTER_WEBGL_ABOVE = int(os.getenv("SCATTER_WEBGL_ABOVE", "1000"))
+SCATTER_MAX_POINTS = int(os.getenv("SCATTER_MAX_POINTS", "5000"))
+SCATTER_MODE = os.getenv("SCATTER_MODE", "decimate")  # decimate | bin
+SCATTER_BINS = int(os.getenv("SCATTER_BINS", "60"))
+# Sel grid decimation per sumbu (~ resolusi piksel grafik yang masih bisa dibedakan)
+DECIMATE_GRID = 200
+
+
+# ============================================================================
+# TABEL
+# ============================================================================
+def page_count(rows, page_size=TABLE_PAGE_SIZE):
+    return max(1, -(-rows // page_size))
+
+
+def page_slice(df, sort_by, ascending, page, page_size=TABLE_PAGE_SIZE):
+    """Baris halaman `page` (mulai 1) dari df yang diurutkan `sort_by`
+
+    Halaman pertama (tampilan default) memakai nlargest/nsmallest tanpa sort
+    penuh; halaman lain mengurutkan stabil, jadi nilai seri mengikuti urutan asli.
+    """
+    page = min(max(1, page), page_count(len(df), page_size))
+    start = (page - 1) * page_size
+    stop = min(start + page_size, len(df))
+    if page == 1 and pd.api.types.is_numeric_dtype(df[sort_by]):
+        return df.nsmallest(stop, sort_by) if ascending else df.nlargest(stop, sort_by)
+    return df.sort_values(sort_by, ascending=ascending, kind="stable").iloc[start:stop]
+
+
+# Cursor sebelum baris pertama: sales_in_millions NUMERIC(10,2) selalu di dalam rentang ini
+_FIRST_CURSOR = {"desc": (Decimal("1e12"), 0), "asc": (Decimal("-1e12"), 0)}
+
+
+def sales_page_query(direction="desc", after=None, region_id=0, page_size=TABLE_PAGE_SIZE):
+    """(nama query, parameter) untuk satu halaman detail penjualan
+
+    Query mengambil satu baris ekstra hanya untuk tahu apakah masih ada
+    halaman berikutnya.
+    """
+    if direction not in queries.SALES_PAGE_DIRECTIONS:
+        raise ValueError(f"arah urutan harus salah satu dari {list(queries.SALES_PAGE_DIRECTIONS)}")
+    after_sales, after_id = after or _FIRST_CURSOR[direction]
+    name = f"sales_detail_page{'_region' if region_id else ''}_{direction}"
+    params = {"after_sales": after_sales, "after_id": after_id, "limit": page_size + 1}
+    if region_id:
+        params["region_id"] = region_id
+    return name, params
+
+
+def sales_page(direction="desc", after=None, region_id=0, page_size=TABLE_PAGE_SIZE):
+    """Satu halaman detail penjualan (DataFrame, cursor halaman berikutnya atau None)
+
+    `after` = (sales, sale_id) baris terakhir halaman sebelumnya (None = halaman
+    pertama).
+    """
+    name, params = sales_page_query(direction, after, region_id, page_size)
+    rows = queries.fetch_rows(name, **params)
+    spec = queries.QUERIES[name]
+    # Cursor memakai nilai Decimal asli (bukan float hasil DataFrame) agar batas halaman exact
+    following = (rows[page_size - 1][4], rows[page_size - 1][0]) if len(rows) > page_size else None
+    df = pd.DataFrame(rows[:page_size], columns=spec.columns)
+    df["sales_in_millions"] = pd.to_numeric(df["sales_in_millions"]).astype(float)
+    df["release_year"] = pd.to_numeric(df["release_year"]).astype("Int64")
+    return df, following
+
+
+# ============================================================================
+# SCATTER
+# ============================================================================
+def _cells(values, bins):
+    """Indeks sel grid per nilai (0..bins-1) dalam rentang min..max kolom"""
+    values = np.asarray(values, dtype=np.float64)
+    low, high = np.nanmin(values), np.nanmax(values)
+    span = high - low if high > low else 1.0
+    return np.minimum(((values - low) / span * bins).astype(np.int64), bins - 1)
+
+
+def decimate(df, x, y, max_points=SCATTER_MAX_POINTS, size=None, grid=DECIMATE_GRID):
+    """Subset df berisi paling banyak `max_points` titik yang menjaga bentuk sebaran
+
+    Bidang dibagi grid × grid sel; tiap sel terisi diwakili satu titik (yang
+    `size`-nya terbesar, jadi bubble dominan dan outlier tidak hilang). Jika
+    sel terisi masih lebih dari max_points, sisa titik diambil acak (seed tetap
+    agar grafik tidak berubah antar rerun).
+    """
+    if len(df) <= max_points:
+        return df
+    order = np.argsort(-df[size].to_numpy(dtype=np.float64), kind="stable") if size else np.arange(len(df))
+    cell = _cells(df[x], grid)[order] * grid + _cells(df[y], grid)[order]
+    _, first = np.unique(cell, return_index=True)
+    keep = order[first]
+    if len(keep) > max_points:
+        keep = np.random.default_rng(0).choice(keep, max_points, replace=False)
+    return df.iloc[np.sort(keep)]
+
+
+def bin2d(df, x, y, bins=SCATTER_BINS, weight=None):
+    """Agregasi 2D: (pusat bin x, pusat bin y, z[y, x]) = jumlah titik atau total `weight` per sel"""
+    z, x_edges, y_edges = np.histogram2d(
+        df[x].to_numpy(dtype=np.float64), df[y].to_numpy(dtype=np.float64), bins=bins,
+        weights=df[weight].to_numpy(dtype=np.float64) if weight else None,
+    )
+    # Sel kosong -> NaN agar tidak diwarnai seperti nilai nol
+    z[z == 0] = np.nan
+    return (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2, z.T
@@ -0,0 +1,191 @@
+"""
+Routing query baca ke read replica PostgreSQL.
+
+Primary tetap menangani semua tulis (config.get_connection); query baca dari
+queries.execute dikirim ke replica yang sehat dan cukup segar, dengan
+fallback ke primary jika tidak ada replica yang memenuhi syarat.
+
+    SUPABASE_READ_REPLICAS=replica1.example.com,replica2.example.com:6543
+    READ_ROUTING=round_robin        # atau least_latency
+    REPLICA_MAX_LAG=30              # detik; replica yang lebih tertinggal dilewati
+    REPLICA_CHECK_INTERVAL=10       # detik antar health check per replica
+"""
+import itertools
+import threading
+import time
+
+import psycopg2
+
+from pool import ConnectionPool
+
+ROUTING_POLICIES = ("round_robin", "least_latency")
+
+# Lag replay dalam detik; 0 jika bukan standby atau semua WAL yang diterima sudah di-replay
+# (tanpa cek LSN, replica dari primary yang idle akan terlihat makin tertinggal).
+LAG_QUERY = '''
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+'''
+
+# Bobot EWMA untuk latency health check (least_latency)
+LATENCY_SMOOTHING = 0.3
+
+# SQLSTATE yang berarti server tidak bisa melayani koneksi (selain class 08):
+# shutdown admin/crash, server masih startup, slot koneksi habis
+UNAVAILABLE_SQLSTATES = ("57P01", "57P02", "57P03", "53300")
+# Konflik recovery hot standby (40001) adalah kejadian normal di replica:
+# query diulang di replica yang sama sebanyak ini sebelum pindah kandidat
+CONFLICT_RETRIES = 2
+
+
+def connection_failed(error):
+    """True jika error berarti koneksi/server replica tidak bisa dipakai (bukan error per query)"""
+    if isinstance(error, psycopg2.InterfaceError):
+        return True
+    code = getattr(error, "pgcode", None)
+    # Koneksi putus / connect gagal dilaporkan libpq tanpa SQLSTATE
+    return code is None or code.startswith("08") or code in UNAVAILABLE_SQLSTATES
+
+
+def parse_replicas(value, base_params):
+    """'host[:port],host[:port]' -> list parameter koneksi (kredensial dari primary)"""
+    replicas = []
+    for entry in (value or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, _, port = entry.partition(":")
+        params = dict(base_params, host=host)
+        if port:
+            params["port"] = port
+        replicas.append(params)
+    return replicas
+
+
+class Replica:
+    """Satu read replica: pool koneksi read-only, status sehat, lag dan latency"""
+
+    def __init__(self, params, pool_size=1):
+        self.params = params
+        self.name = f"{params['host']}:{params['port']}"
+        self.pool = ConnectionPool(params, pool_size, readonly=True)
+        self.healthy = True
+        self.lag = 0.0
+        self.latency = None
+        self.checked_at = 0.0
+        self.served = 0
+        self.conflicts = 0
+        self.failures = 0
+        self.last_error = None
+        # Melindungi field status; query sendiri berjalan paralel di koneksi pool
+        self.lock = threading.Lock()
+
+    def cursor(self):
+        """Cursor di koneksi pool replica ini (context manager)"""
+        return self.pool.cursor()
+
+    def claim_check(self, interval):
+        """True untuk satu pemanggil saja per interval: dialah yang menjalankan check()"""
+        with self.lock:
+            now = time.monotonic()
+            if now - self.checked_at < interval:
+                return False
+            self.checked_at = now
+            return True
+
+    def check(self):
+        """Health check: ukur latency round-trip dan lag replay"""
+        try:
+            started = time.perf_counter()
+            with self.pool.cursor() as cur:
+                cur.execute(LAG_QUERY)
+                lag = float(cur.fetchone()[0])
+            elapsed = time.perf_counter() - started
+        except psycopg2.Error as e:
+            # Hanya kegagalan koneksi yang membuat replica mati (bukan mis. pembatalan query)
+            if connection_failed(e):
+                self.mark_down(e)
+            else:
+                with self.lock:
+                    self.last_error = str(e).strip()
+            return False
+        with self.lock:
+            self.lag = lag
+            self.latency = elapsed if self.latency is None else (
+                LATENCY_SMOOTHING * elapsed + (1 - LATENCY_SMOOTHING) * self.latency
+            )
+            self.healthy = True
+            self.checked_at = time.monotonic()
+            return True
+
+    def mark_down(self, error):
+        """Tandai replica mati (dipanggil saat query gagal karena koneksi)"""
+        with self.lock:
+            self._down(error)
+
+    def _down(self, error):
+        self.healthy = False
+        self.failures += 1
+        self.last_error = str(error).strip()
+        self.checked_at = time.monotonic()
+        self.pool.close()
+        print(f"⚠️ Replica {self.name} tidak tersedia: {self.last_error}")
+
+    def status(self):
+        return {
+            "replica": self.name,
+            "healthy": self.healthy,
+            "lag_s": round(self.lag, 3),
+            "latency_ms": round(self.latency * 1000, 2) if self.latency is not None else None,
+            "served": self.served,
+            "conflicts": self.conflicts,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+class ReplicaRouter:
+    """Pilih urutan replica untuk satu query baca; primary adalah fallback terakhir"""
+
+    def __init__(self, replica_params, policy="round_robin", max_lag=30.0, check_interval=10.0, pool_size=1):
+        if policy not in ROUTING_POLICIES:
+            raise ValueError(f"READ_ROUTING harus salah satu dari {list(ROUTING_POLICIES)}, bukan {policy!r}")
+        self.replicas = [Replica(params, pool_size) for params in replica_params]
+        self.policy = policy
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.primary_fallbacks = 0
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def candidates(self):
+        """Replica sehat dengan lag <= max_lag, diurutkan sesuai policy"""
+        for replica in self.replicas:
+            # Replica sehat dicek ulang per interval; replica mati dicoba lagi setelah interval yang sama.
+            # Check berjalan di thread background (satu per replica per interval), jadi query
+            # tidak ikut menunggu connect_timeout replica yang mati.
+            if replica.claim_check(self.check_interval):
+                threading.Thread(target=replica.check, name=f"replica-check-{replica.name}", daemon=True).start()
+        usable = [r for r in self.replicas if r.healthy and r.lag <= self.max_lag]
+        if not usable:
+            return []
+        if self.policy == "least_latency":
+            return sorted(usable, key=lambda r: r.latency if r.latency is not None else float("inf"))
+        start = next(self._counter) % len(usable)
+        return usable[start:] + usable[:start]
+
+    def record_fallback(self):
+        """Hitung satu query baca yang dilayani primary"""
+        with self._lock:
+            self.primary_fallbacks += 1
+
+    def status(self):
+        return {
+            "policy": self.policy,
+            "max_lag_s": self.max_lag,
+            "primary_fallbacks": self.primary_fallbacks,
+            "replicas": [r.status() for r in self.replicas],
+        }
@@ -0,0 +1,270 @@
+"""
+Generator laporan perbandingan batch: setiap breakdown per region, platform
+dan publisher (beserta genre) dihitung dalam satu query GROUPING SETS (satu
+scan regional_sales, lihat `report_breakdowns` di queries.py), lalu semua
+grafiknya dirender paralel per dimensi ke satu file HTML statis.
+
+    python report.py                              # reports/report-<tanggal>-<versi>.html
+    python report.py --attribution full --top 15 --workers 4
+    python report.py --plotlyjs cdn --out laporan.html
+
+HTML bisa dibuka offline (plotly.js disertakan, kecuali --plotlyjs cdn) dan
+punya stylesheet cetak: setiap bagian mulai di halaman baru, jadi versi PDF
+cukup lewat "Print -> Save as PDF" di browser.
+"""
+import argparse
+import html
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import columnar
+import config
+import queries
+from queries import GENRE_ATTRIBUTIONS, SALES
+
+REPORT_DIR = os.getenv(
+    "REPORT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports")
+)
+
+# dimensi -> (kolom ID, tabel registry, atribut label, bit GROUPING())
+DIMENSIONS = {
+    "Region": ("region_id", "regions", "region_name", 8),
+    "Platform": ("platform_id", "platforms", "platform_name", 4),
+    "Publisher": ("publisher_id", "publishers", "publisher_name", 2),
+    "Genre": ("genre_id", "genres", "genre_name", 1),
+}
+# Dimensi yang mendapat satu bagian laporan (satu blok grafik per anggota)
+SECTIONS = ("Region", "Platform", "Publisher")
+
+
+# ============================================================================
+# BREAKDOWN DARI SATU QUERY
+# ============================================================================
+def breakdowns(cols, dims):
+    """{tuple dimensi: DataFrame berlabel} untuk setiap grouping set hasil query"""
+    frames = {}
+    grouping = cols["grouping_id"]
+    for code in np.unique(grouping):
+        group = tuple(name for name, (*_, bit) in DIMENSIONS.items() if not code & bit)
+        mask = grouping == code
+        if "Genre" in group:
+            # Sama dengan WHERE weight > 0 di query halaman; genre_id 0 = game tanpa genre
+            mask &= (cols["genre_id"] > 0) & (cols["game_count"] > 0)
+        data = {}
+        for name in group:
+            id_column, table, attr, _ = DIMENSIONS[name]
+            data[name] = columnar.labels(cols[id_column][mask], getattr(dims, table), attr).to_pandas()
+        data["Game Count"] = cols["game_count"][mask]
+        data[SALES] = cols["genre_sales" if "Genre" in group else "total_sales"][mask]
+        frames[group] = pd.DataFrame(data).sort_values(SALES, ascending=False, ignore_index=True)
+    return frames
+
+
+def _key(*names):
+    """Kunci grouping set dengan urutan dimensi yang sama seperti DIMENSIONS"""
+    return tuple(name for name in DIMENSIONS if name in names)
+
+
+# ============================================================================
+# RENDER (DIJALANKAN PARALEL PER DIMENSI)
+# ============================================================================
+def _figure_html(fig):
+    # Array numerik tetap ter-encode biner (bdata) di JSON figure
+    return fig.to_html(full_html=False, include_plotlyjs=False, config={"displaylogo": False})
+
+
+def render_overview(frames, meta):
+    """Ringkasan total + sales per dimensi (satu grafik empat panel)"""
+    from plotly.subplots import make_subplots
+    import plotly.graph_objects as go
+
+    total = frames[()].iloc[0]
+    fig = make_subplots(rows=1, cols=len(DIMENSIONS), subplot_titles=[f"Per {name}" for name in DIMENSIONS])
+    for i, name in enumerate(DIMENSIONS, start=1):
+        df = frames[_key(name)].head(meta["top"]).iloc[::-1]
+        fig.add_trace(go.Bar(x=df[SALES].to_numpy(), y=df[name].astype(str), orientation="h", name=name), 1, i)
+    fig.update_layout(height=max(400, 28 * meta["top"]), showlegend=False, margin=dict(l=10, r=10, t=60, b=30))
+    return f'''
+    <section class="overview">
+        <h2>📊 Ringkasan</h2>
+        <div class="kpis">
+            <div><span>Total Sales</span><b>${total[SALES]:,.2f}M</b></div>
+            <div><span>Games</span><b>{int(total["Game Count"]):,}</b></div>
+            {"".join(f'<div><span>{name}</span><b>{len(frames[_key(name)])}</b></div>' for name in DIMENSIONS)}
+        </div>
+        {_figure_html(fig)}
+    </section>'''
+
+
+def render_section(dimension, frames, meta):
+    """Satu bagian laporan: tabel anggota dimensi + grafik breakdown per anggota"""
+    from plotly.subplots import make_subplots
+    import plotly.graph_objects as go
+
+    members = frames[_key(dimension)]
+    others = [name for name in DIMENSIONS if name != dimension]
+    grand_total = frames[()][SALES].iloc[0] or 1.0
+    table = members.assign(Share=members[SALES] / grand_total).to_html(
+        index=False, classes="data", float_format=lambda v: f"{v:,.4f}" if v < 1 else f"{v:,.2f}"
+    )
+    blocks = []
+    for member, member_sales, member_games in members[[dimension, SALES, "Game Count"]].itertuples(index=False):
+        fig = make_subplots(rows=1, cols=len(others), subplot_titles=[f"per {name}" for name in others])
+        for i, other in enumerate(others, start=1):
+            pair = frames[_key(dimension, other)]
+            df = pair[pair[dimension] == member].head(meta["top"]).iloc[::-1]
+            fig.add_trace(go.Bar(
+                x=df[SALES].to_numpy(), y=df[other].astype(str), orientation="h", name=other,
+                hovertemplate="%{y}: $%{x:.2f}M<extra></extra>",
+            ), 1, i)
+        fig.update_layout(height=max(320, 24 * meta["top"]), showlegend=False,
+                          margin=dict(l=10, r=10, t=50, b=30))
+        blocks.append(f'''
+        <div class="member">
+            <h3>{html.escape(str(member))}</h3>
+            <p class="meta">${member_sales:,.2f}M · {member_sales / grand_total:.1%} dari total · {member_games} game</p>
+            {_figure_html(fig)}
+        </div>''')
+    return f'''
+    <section>
+        <h2>{html.escape(dimension)} ({len(members)})</h2>
+        {table}
+        {"".join(blocks)}
+    </section>'''
+
+
+def _render_task(task):
+    name, frames, meta = task
+    started = time.perf_counter()
+    fragment = render_overview(frames, meta) if name is None else render_section(name, frames, meta)
+    return name, fragment, time.perf_counter() - started
+
+
+def render(frames, meta, workers):
+    """Fragment HTML ringkasan + setiap bagian; dirender paralel di proses terpisah"""
+    tasks = [(None, {(): frames[()], **{_key(n): frames[_key(n)] for n in DIMENSIONS}}, meta)]
+    for dimension in SECTIONS:
+        # Worker hanya menerima grouping set yang dipakai bagiannya
+        subset = {key: df for key, df in frames.items() if key == () or dimension in key}
+        tasks.append((dimension, subset, meta))
+    if workers <= 1:
+        return [_render_task(task) for task in tasks]
+    # spawn: proses worker tidak mewarisi koneksi database proses utama
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return list(pool.map(_render_task, tasks))
+
+
+PAGE_TEMPLATE = '''<!DOCTYPE html>
+<html lang="id">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+{plotlyjs}
+<style>
+    body {{ font-family: -apple-system, "Segoe UI", Roboto, sans-serif; color: #222; }}
+    body {{ margin: 2rem auto; max-width: 1400px; }}
+    header {{ border-bottom: 3px solid #667eea; margin-bottom: 1rem; }}
+    header p {{ color: #666; margin-top: 0; }}
+    h2 {{ color: #4b3f9e; border-bottom: 1px solid #ddd; padding-bottom: .3rem; }}
+    h3 {{ margin-bottom: 0; }}
+    .meta {{ color: #666; margin-top: .2rem; }}
+    .kpis {{ display: flex; gap: 1rem; flex-wrap: wrap; }}
+    .kpis div {{ background: #f4f3fb; border-radius: 8px; padding: .6rem 1rem; }}
+    .kpis span {{ display: block; color: #666; font-size: .85rem; }}
+    table.data {{ border-collapse: collapse; font-size: .9rem; margin: 1rem 0; }}
+    table.data th, table.data td {{ border: 1px solid #ddd; padding: .25rem .6rem; text-align: right; }}
+    table.data th:first-child, table.data td:first-child {{ text-align: left; }}
+    .member {{ break-inside: avoid; }}
+    @media print {{ section {{ break-before: page; }} section.overview {{ break-before: auto; }} }}
+</style>
+</head>
+<body>
+<header>
+    <h1>🎮 {title}</h1>
+    <p>Dibuat {created} · versi data {version} · atribusi genre: {attribution}</p>
+</header>
+{sections}
+</body>
+</html>
+'''
+
+
+def _plotlyjs(mode):
+    from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+    if mode == "cdn":
+        return f'<script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js" charset="utf-8"></script>'
+    return f'<script type="text/javascript">{get_plotlyjs()}</script>'
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+def build(out=None, attribution=None, top=10, workers=4, plotlyjs="inline"):
+    """Bangun laporan; return (path, durasi per fase dalam detik, breakdown per grouping set)"""
+    attribution = queries.genre_attribution(attribution)
+    timings = {}
+    started = time.perf_counter()
+    dims = config.view_dimensions()
+    version = queries.fetch_rows("sales_version")[0][0]
+    t = time.perf_counter()
+    cols = queries.fetch_columns("report_breakdowns", attribution=attribution)
+    timings["query"] = time.perf_counter() - t
+    t = time.perf_counter()
+    frames = breakdowns(cols, dims)
+    timings["breakdowns"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    rendered = render(frames, {"top": top}, workers)
+    timings["render"] = time.perf_counter() - t
+    for name, _, elapsed in rendered:
+        timings[f"render:{name or 'overview'}"] = elapsed
+
+    created = datetime.now(timezone.utc)
+    if out is None:
+        out = os.path.join(REPORT_DIR, f"report-{created.strftime('%Y%m%d')}-{version[:8]}.html")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    page = PAGE_TEMPLATE.format(
+        title="Laporan Perbandingan Penjualan Video Game",
+        plotlyjs=_plotlyjs(plotlyjs),
+        created=created.strftime("%Y-%m-%d %H:%M UTC"),
+        version=version[:8],
+        attribution=attribution,
+        sections="".join(fragment for _, fragment, _ in rendered),
+    )
+    with open(out, "w", encoding="utf-8") as f:
+        f.write(page)
+    timings["total"] = time.perf_counter() - started
+    return out, timings, frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Laporan HTML perbandingan per region/platform/publisher")
+    parser.add_argument("--out", help="file HTML tujuan (default: REPORT_DIR/report-<tanggal>-<versi>.html)")
+    parser.add_argument("--attribution", choices=GENRE_ATTRIBUTIONS, default=None,
+                        help="atribusi penjualan game multi-genre (default: GENRE_ATTRIBUTION)")
+    parser.add_argument("--top", type=int, default=10, help="jumlah entri teratas per grafik breakdown")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="jumlah proses render paralel (1 = tanpa proses tambahan)")
+    parser.add_argument("--plotlyjs", choices=["inline", "cdn"], default="inline",
+                        help="sertakan plotly.js di file (offline) atau muat dari CDN")
+    args = parser.parse_args()
+
+    path, timings, frames = build(args.out, args.attribution, args.top, args.workers, args.plotlyjs)
+    sets = len(frames)
+    members = sum(len(frames[_key(name)]) for name in SECTIONS)
+    print(f"🗂️ {sets} grouping set dari 1 query ({timings['query'] * 1000:.1f} ms), {members} anggota dimensi")
+    for phase, elapsed in timings.items():
+        print(f"  {phase:<22}{elapsed:>9.3f}s")
+    print(f"📄 Laporan ditulis ke {path} ({os.path.getsize(path) / 1024:.1f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
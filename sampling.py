@@ -0,0 +1,100 @@
+"""
+Mode preview untuk halaman eksploratif: estimasi dari sampel TABLESAMPLE
+ditampilkan dulu (dengan margin 95%), sementara hasil exact dihitung di
+thread background lalu menggantikan estimasi (progressive refinement).
+
+    PREVIEW_MODE=1                   # toggle preview aktif secara default
+    PREVIEW_SAMPLE_PERCENT=10        # persen baris regional_sales yang disampel
+    PREVIEW_SAMPLE_METHOD=BERNOULLI  # atau SYSTEM (per blok: lebih cepat, margin kurang akurat)
+    PREVIEW_SEED=42                  # REPEATABLE: estimasi stabil antar rerun
+
+Query preview terdaftar di queries.py (`<nama>_preview`); hasil exact
+disimpan per proses selama TTL query aslinya.
+"""
+import os
+import threading
+import time
+
+import queries
+
+PREVIEW_MODE = os.getenv("PREVIEW_MODE", "0") == "1"
+PREVIEW_SAMPLE_PERCENT = float(os.getenv("PREVIEW_SAMPLE_PERCENT", "10"))
+PREVIEW_SEED = int(os.getenv("PREVIEW_SEED", "42"))
+
+# query exact -> query estimasi dari sampel
+PREVIEW_QUERIES = {
+    "platform_sales": "platform_sales_preview",
+    "genre_platform_sales": "genre_platform_sales_preview",
+    "publisher_sales": "publisher_sales_preview",
+}
+
+# Job exact yang gagal baru dicoba lagi setelah jeda ini (detik), bukan di setiap rerun
+RETRY_AFTER = 60
+
+
+def preview(name, **params):
+    """Estimasi total + margin 95% (dan Game Count) untuk query `name` dari sampel tabel fakta"""
+    return queries.run_query(
+        PREVIEW_QUERIES[name], pct=PREVIEW_SAMPLE_PERCENT, seed=PREVIEW_SEED, **params
+    )
+
+
+# ============================================================================
+# REFINEMENT DI BACKGROUND
+# ============================================================================
+class Refinement:
+    """Hasil exact satu query, dihitung di thread sendiri
+
+    Koneksi dipinjam dari pool (replica/primary) seperti query biasa. Thread
+    ini tidak memasang pemeriksa pembatalan, jadi job tidak ikut dibatalkan
+    saat sesi pindah halaman dan hasilnya tetap dipakai ulang kunjungan
+    berikutnya.
+    """
+
+    def __init__(self, name, params):
+        self.name = name
+        self.params = params
+        self.result = None
+        self.error = None
+        self.finished_at = None
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f"refine-{name}", daemon=True)
+
+    def _run(self):
+        try:
+            self.result = queries.run_query(self.name, **self.params)
+        except Exception as e:
+            self.error = e
+            print(f"⚠️ Refinement {self.name} gagal: {e}")
+        self.finished_at = time.monotonic()
+        self.done.set()
+
+    def expired(self):
+        if not self.done.is_set():
+            return False
+        ttl = RETRY_AFTER if self.error is not None else queries.QUERIES[self.name].ttl
+        return ttl is not None and time.monotonic() - self.finished_at >= ttl
+
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def refinement(name, **params):
+    """Job exact untuk (query, parameter); dimulai jika belum ada atau sudah kedaluwarsa"""
+    key = (name, tuple(sorted(params.items())))
+    with _jobs_lock:
+        job = _jobs.get(key)
+        if job is None or job.expired():
+            job = _jobs[key] = Refinement(name, params)
+            job.thread.start()
+    return job
+
+
+def wait(jobs, interrupted, poll=0.1):
+    """Tunggu semua job selesai; berhenti lebih awal jika `interrupted()` True"""
+    for job in jobs:
+        while not job.done.wait(poll):
+            if interrupted():
+                return False
+    return True
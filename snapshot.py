@@ -0,0 +1,258 @@
+"""
+Snapshot builder: jalankan query dataset setiap halaman sekali (paralel,
+dalam satu snapshot transaksi PostgreSQL yang sama) lalu tulis bundle
+Parquet terkompresi berversi yang dibaca main.py saat startup.
+
+    python snapshot.py                      # bundle baru di SNAPSHOT_DIR
+    python snapshot.py --workers 8 --keep 3
+    python snapshot.py --list               # daftar bundle yang ada
+
+Layout bundle:
+
+    snapshots/
+        LATEST                                  # nama bundle aktif
+        20261019T020000Z-1a2b3c4d/              # <waktu UTC>-<sales_version>
+            manifest.json
+            regional_sales.parquet
+            top_games__limit-20.parquet
+            ...
+
+Dashboard memakai bundle jika USE_SNAPSHOT=1 (lihat main.py); dataset yang
+tidak ada di bundle tetap diambil live dari database.
+"""
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import psycopg2
+import psycopg2.extensions
+import pyarrow as pa
+
+import config
+import queries
+from queries import GENRE_ATTRIBUTIONS, PAGE_QUERIES
+
+SNAPSHOT_DIR = os.getenv(
+    "SNAPSHOT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots")
+)
+USE_SNAPSHOT = os.getenv("USE_SNAPSHOT", "0") == "1"
+LATEST_FILE = "LATEST"
+MANIFEST_FILE = "manifest.json"
+COMPRESSION = "zstd"
+FORMAT_VERSION = 1
+
+
+def datasets():
+    """Pasangan (query, parameter) unik dari PAGE_QUERIES, diperluas ke semua atribusi genre"""
+    seen = {}
+    for page_queries in PAGE_QUERIES.values():
+        for name, params in page_queries:
+            # sales_version hanya penanda versi; fakta halaman analitik dimuat engine sendiri
+            if name == "sales_version":
+                continue
+            variants = [params]
+            if "attribution" in queries.QUERIES[name].params:
+                variants = [dict(params, attribution=mode) for mode in GENRE_ATTRIBUTIONS]
+            for variant in variants:
+                seen.setdefault(dataset_key(name, variant), (name, variant))
+    return seen
+
+
+def dataset_key(name, params):
+    """Nama file dataset: query + parameter terurut"""
+    return name + "".join(f"__{k}-{v}" for k, v in sorted(params.items()))
+
+
+# ============================================================================
+# BUILD
+# ============================================================================
+def _worker_connection(snapshot_id, connections, lock):
+    """Koneksi worker yang memakai snapshot transaksi coordinator"""
+    conn = psycopg2.connect(**config.DB_PARAMS)
+    conn.set_session(isolation_level=psycopg2.extensions.ISOLATION_LEVEL_REPEATABLE_READ, readonly=True)
+    cur = conn.cursor()
+    cur.execute("SET TRANSACTION SNAPSHOT %s", (snapshot_id,))
+    with lock:
+        connections.append(conn)
+    return cur
+
+
+def build(out_dir=SNAPSHOT_DIR, workers=4):
+    """Bangun satu bundle; return path bundle yang ditulis"""
+    # Registry dimensi dimuat sekali sebelum worker mulai (resolver berbagi registry)
+    config.view_dimensions()
+    coordinator = psycopg2.connect(**config.DB_PARAMS)
+    coordinator.set_session(isolation_level=psycopg2.extensions.ISOLATION_LEVEL_REPEATABLE_READ, readonly=True)
+    connections, lock = [], threading.Lock()
+    local = threading.local()
+    started = time.perf_counter()
+    try:
+        with coordinator.cursor() as cur:
+            # Semua worker membaca snapshot yang sama -> dataset konsisten satu sama lain
+            cur.execute("SELECT pg_export_snapshot()")
+            snapshot_id = cur.fetchone()[0]
+            sales_version = queries.fetch_rows("sales_version", cur)[0][0]
+
+        def run(item):
+            key, (name, params) = item
+            if getattr(local, "cur", None) is None:
+                local.cur = _worker_connection(snapshot_id, connections, lock)
+            t = time.perf_counter()
+            df = queries.run_query(name, cursor=local.cur, **params)
+            return key, name, params, df, time.perf_counter() - t
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="snapshot") as pool:
+            results = list(pool.map(run, datasets().items()))
+    finally:
+        for conn in connections + [coordinator]:
+            conn.close()
+
+    created = datetime.now(timezone.utc)
+    bundle = f"{created.strftime('%Y%m%dT%H%M%SZ')}-{sales_version[:8]}"
+    os.makedirs(out_dir, exist_ok=True)
+    staging = os.path.join(out_dir, f".{bundle}.tmp")
+    os.makedirs(staging)
+    manifest = {
+        "format": FORMAT_VERSION,
+        "bundle": bundle,
+        "created_at": created.isoformat(timespec="seconds"),
+        "sales_version": sales_version,
+        "datasets": {},
+    }
+    # pyarrow.parquet dimuat saat dipakai: `import snapshot` ada di jalur startup dashboard
+    import pyarrow.parquet as pq
+
+    for key, name, params, df, elapsed in results:
+        filename = f"{key}.parquet"
+        pq.write_table(
+            pa.Table.from_pandas(df, preserve_index=False),
+            os.path.join(staging, filename),
+            compression=COMPRESSION,
+        )
+        manifest["datasets"][key] = {
+            "file": filename,
+            "query": name,
+            "params": params,
+            "rows": len(df),
+            "query_ms": round(elapsed * 1000, 2),
+        }
+    manifest["build_s"] = round(time.perf_counter() - started, 3)
+    with open(os.path.join(staging, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    # Bundle baru baru terlihat setelah lengkap: rename direktori lalu ganti LATEST secara atomik
+    path = os.path.join(out_dir, bundle)
+    os.rename(staging, path)
+    latest_tmp = os.path.join(out_dir, f".{LATEST_FILE}.tmp")
+    with open(latest_tmp, "w", encoding="utf-8") as f:
+        f.write(bundle + "\n")
+    os.replace(latest_tmp, os.path.join(out_dir, LATEST_FILE))
+    return path
+
+
+def bundles(out_dir=SNAPSHOT_DIR):
+    """Nama bundle yang lengkap, terlama dulu"""
+    if not os.path.isdir(out_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(out_dir)
+        if not name.startswith(".") and os.path.isfile(os.path.join(out_dir, name, MANIFEST_FILE))
+    )
+
+
+def prune(out_dir=SNAPSHOT_DIR, keep=5):
+    """Hapus bundle lama; bundle aktif (LATEST) tidak pernah dihapus"""
+    latest = _latest_name(out_dir)
+    removed = []
+    for name in bundles(out_dir)[:-keep] if keep > 0 else []:
+        if name != latest:
+            shutil.rmtree(os.path.join(out_dir, name))
+            removed.append(name)
+    return removed
+
+
+# ============================================================================
+# LOAD (DIPAKAI main.py)
+# ============================================================================
+class SnapshotBundle:
+    """Bundle yang dimuat: tabel Arrow per dataset, dibaca lewat memory map"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(f"format bundle {self.manifest.get('format')!r} tidak didukung")
+        import pyarrow.parquet as pq
+
+        self.tables = {
+            key: pq.read_table(os.path.join(path, entry["file"]), memory_map=True)
+            for key, entry in self.manifest["datasets"].items()
+        }
+        self._frames = {}
+
+    @property
+    def label(self):
+        return f"{self.manifest['created_at']} (versi {self.manifest['sales_version'][:8]})"
+
+    def has(self, name, **params):
+        return dataset_key(name, params) in self.tables
+
+    def get(self, name, **params):
+        """DataFrame dataset (dikonversi sekali, dibagi semua sesi; read-only), atau None"""
+        key = dataset_key(name, params)
+        frame = self._frames.get(key)
+        if frame is None and key in self.tables:
+            frame = self._frames.setdefault(key, self.tables[key].to_pandas())
+        return frame
+
+
+def _latest_name(out_dir):
+    try:
+        with open(os.path.join(out_dir, LATEST_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_latest(out_dir=SNAPSHOT_DIR):
+    """Bundle aktif, atau None jika belum pernah dibangun"""
+    name = _latest_name(out_dir)
+    if name is None:
+        return None
+    return SnapshotBundle(os.path.join(out_dir, name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bangun bundle snapshot dataset dashboard")
+    parser.add_argument("--out", default=SNAPSHOT_DIR, help="direktori bundle snapshot")
+    parser.add_argument("--workers", type=int, default=4, help="jumlah koneksi paralel")
+    parser.add_argument("--keep", type=int, default=5, help="jumlah bundle yang disimpan (0 = semua)")
+    parser.add_argument("--list", action="store_true", help="tampilkan bundle yang ada lalu keluar")
+    args = parser.parse_args()
+
+    if args.list:
+        latest = _latest_name(args.out)
+        for name in bundles(args.out):
+            print(f"{'➡️ ' if name == latest else '   '}{name}")
+        return
+
+    path = build(args.out, args.workers)
+    with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+    for key, entry in manifest["datasets"].items():
+        print(f"  {key:<45}{entry['rows']:>6} baris {entry['query_ms']:>9.2f} ms")
+    size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    print(f"📦 Bundle {manifest['bundle']}: {len(manifest['datasets'])} dataset, "
+          f"{size / 1024:.1f} KiB, {manifest['build_s']}s")
+    for name in prune(args.out, args.keep):
+        print(f"🗑️ Bundle lama dihapus: {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Laporan profil startup: biaya import modul berat dan biaya koneksi pertama.
+
+Setiap import diukur di proses Python baru agar cache modul tidak
+mempengaruhi hasil.
+
+Daftar modul dibaca langsung dari main.py: import di level modul dibayar
+setiap cold start, import di dalam fungsi/halaman baru saat dipakai.
+
+    python startup_profile.py              # import + koneksi
+    python startup_profile.py --no-connect # tanpa menyentuh database
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_FILE = os.path.join(BASE_DIR, "main.py")
+
+
+def main_imports(path=MAIN_FILE):
+    """(modul yang di-import main.py saat startup, modul yang di-import lazy)"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    eager, lazy = [], []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names = [node.module]
+        else:
+            continue
+        target = eager if node in tree.body else lazy
+        # Modul standar library tidak diukur (biayanya ~0 dan sudah dimuat interpreter)
+        target.extend(
+            name for name in names
+            if name.split(".")[0] not in sys.stdlib_module_names and name not in eager and name not in lazy
+        )
+    return eager, lazy
+
+_IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def measure_import(module):
+    """Waktu import satu modul (detik) di interpreter baru"""
+    result = subprocess.run(
+        [sys.executable, "-c", _IMPORT_SNIPPET.format(module=module)],
+        capture_output=True, text=True, cwd=BASE_DIR
+    )
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+    return float(result.stdout.strip().splitlines()[-1]), None
+
+
+def report_import(label, module):
+    seconds, error = measure_import(module)
+    if error:
+        print(f"  {label:<28} gagal: {error}")
+    else:
+        print(f"  {label:<28} {seconds * 1000:8.1f} ms")
+
+
+def measure_connect():
+    """Waktu koneksi pertama dan pemuatan registry dimensi (detik)"""
+    import config
+
+    started = time.perf_counter()
+    config.get_connection()
+    connected = time.perf_counter() - started
+
+    started = time.perf_counter()
+    config.view_dimensions()
+    registry = time.perf_counter() - started
+    return connected, registry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profil waktu startup dashboard")
+    parser.add_argument("--no-connect", action="store_true", help="lewati pengukuran koneksi")
+    args = parser.parse_args()
+
+    eager, lazy = main_imports()
+    for title, modules in (("saat startup main.py", eager), ("lazy (saat halaman/fungsi dipakai)", lazy)):
+        print(f"⏱️ Biaya import {title} (proses baru per modul)")
+        for module in modules:
+            report_import(module, module)
+        print()
+    # Dependensi bersama hanya dibayar sekali, jadi total != jumlah baris di atas
+    report_import("total startup", ", ".join(eager))
+
+    if not args.no_connect:
+        print("\n🔌 Biaya koneksi")
+        try:
+            connected, registry = measure_connect()
+            print(f"  {'koneksi pertama':<28} {connected * 1000:8.1f} ms")
+            print(f"  {'registry dimensi':<28} {registry * 1000:8.1f} ms")
+        except Exception as e:
+            print(f"  koneksi gagal: {e}")
+
+
+if __name__ == "__main__":
+    main()